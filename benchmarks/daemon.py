@@ -0,0 +1,61 @@
+"""Benchmark resolving node executables through the daemon against resolving in process"""
+import os
+import shutil
+import tempfile
+import threading
+import timeit
+from typing import Callable
+
+from nvshim.core.__main__ import (
+    get_nvm_aliases,
+    resolve_bin_path,
+)
+from nvshim.core.client import request_resolution
+from nvshim.core.daemon import ResolverDaemon
+from nvshim.utils.environment import get_nvm_dir
+
+
+def time_per_call(func: "Callable[[], object]", number: int) -> float:
+    """
+    Get the best average seconds per call over a few repeats
+
+    :param func: function to time
+    :param number: number of calls per repeat
+    :return: seconds per call
+    """
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    """Print the latency and throughput of each resolution strategy"""
+    nvm_dir = get_nvm_dir()
+    exec_dir = os.getcwd()
+    socket_dir = tempfile.mkdtemp(prefix="nvshim")
+    daemon = ResolverDaemon(os.path.join(socket_dir, "daemon.sock"), nvm_dir)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+
+    def in_process():
+        get_nvm_aliases.cache_clear()
+        return resolve_bin_path(exec_dir, "node", nvm_dir)
+
+    def from_daemon():
+        return request_resolution(daemon.socket_path, exec_dir, "node", nvm_dir)
+
+    os.environ["NVSHIM_CACHE"] = "false"
+    try:
+        print(f"in process: {in_process()}")
+        print(f"daemon:     {from_daemon()}")
+        before = time_per_call(in_process, number=200)
+        after = time_per_call(from_daemon, number=2000)
+    finally:
+        daemon.shutdown()
+        thread.join()
+        shutil.rmtree(socket_dir)
+    print(f"in process: {before * 1e3:8.3f} ms {1 / before:10.0f} resolutions/s")
+    print(f"daemon:     {after * 1e3:8.3f} ms {1 / after:10.0f} resolutions/s")
+    print(f"speedup:    {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Benchmark the latency the shim adds to each node call against synthetic nvm folders,
+timing each resolution phase and the full shim process against running node directly
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+import nvshim
+from nvshim.core.__main__ import (
+    get_bin_path,
+    get_node_versions,
+    get_node_versions_dir,
+    get_nvm_alias_mapping,
+    get_nvm_aliases,
+    get_nvmrc,
+    get_nvmrc_path,
+    get_nvmsh_path,
+    resolve_bin_path,
+    resolve_version,
+)
+from nvshim.utils.environment import (
+    EnvironmentVariable,
+    process_env,
+)
+
+RESOLVED_MAJOR = 18
+REPEAT = 3
+
+
+class Scenario(NamedTuple):
+    """Shape of a synthetic nvm folder and workspace"""
+
+    versions: int
+    alias_depth: int
+    nvmrc_depth: int
+
+
+SCENARIOS = {
+    "few_versions": Scenario(versions=10, alias_depth=1, nvmrc_depth=1),
+    "many_versions": Scenario(versions=3000, alias_depth=1, nvmrc_depth=1),
+    "deep_aliases": Scenario(versions=10, alias_depth=50, nvmrc_depth=1),
+    "deep_nvmrc": Scenario(versions=10, alias_depth=1, nvmrc_depth=40),
+    "worst_case": Scenario(versions=3000, alias_depth=50, nvmrc_depth=40),
+}
+
+
+def time_per_call(func: "Callable[[], object]", number: int) -> float:
+    """
+    Get the best average milliseconds per call over a few repeats
+
+    :param func: function to time
+    :param number: number of calls per repeat
+    :return: milliseconds per call
+    """
+    return min(timeit.repeat(func, number=number, repeat=REPEAT)) / number * 1e3
+
+
+def create_stub_node(bin_path: str):
+    """
+    Create a node executable that exits immediately so only launch cost is measured
+
+    :param bin_path: path to create the executable at
+    """
+    true_path = shutil.which("true")
+    if true_path:
+        shutil.copy(true_path, bin_path)
+    else:
+        with open(bin_path, "w", encoding="UTF-8") as bin_file:
+            bin_file.write("#!/bin/sh\n")
+    os.chmod(bin_path, 0o755)
+
+
+def create_nvm_dir(root_dir: str, scenario: "Scenario") -> str:
+    """
+    Create an nvm folder with the installed versions and a default alias resolved
+    through a chain of aliases to the latest installed version of a major release
+
+    :param root_dir: folder to create the nvm folder in
+    :param scenario: number of versions and aliases to create
+    :return: path to the nvm folder
+    """
+    nvm_dir = os.path.join(root_dir, "nvm")
+    node_versions_dir = get_node_versions_dir(nvm_dir)
+    versions = list(
+        itertools.islice(
+            itertools.product(range(10), range(50), range(14, 24)), scenario.versions
+        )
+    )
+    for patch, minor, major in versions:
+        os.makedirs(os.path.join(node_versions_dir, f"v{major}.{minor}.{patch}"))
+    _, minor, patch = max(
+        (major, minor, patch)
+        for patch, minor, major in versions
+        if major == RESOLVED_MAJOR
+    )
+    bin_dir = os.path.join(
+        node_versions_dir, f"v{RESOLVED_MAJOR}.{minor}.{patch}", "bin"
+    )
+    os.makedirs(bin_dir)
+    create_stub_node(os.path.join(bin_dir, "node"))
+
+    aliases_dir = os.path.join(nvm_dir, "alias")
+    os.makedirs(aliases_dir)
+    chain = ["default", *(f"chain-{depth}" for depth in range(1, scenario.alias_depth))]
+    for alias, target in zip(chain, [*chain[1:], str(RESOLVED_MAJOR)]):
+        with open(os.path.join(aliases_dir, alias), "w", encoding="UTF-8") as file:
+            file.write(f"{target}\n")
+    return nvm_dir
+
+
+def create_workspace(root_dir: str, scenario: "Scenario") -> str:
+    """
+    Create a workspace with a .nvmrc file the given number of folders up
+
+    :param root_dir: folder to create the workspace in
+    :param scenario: number of folders to search for the .nvmrc file
+    :return: path to the folder node is run from
+    """
+    workspace_dir = os.path.join(root_dir, "workspace")
+    exec_dir = os.path.join(
+        workspace_dir, *(f"nested-{depth}" for depth in range(1, scenario.nvmrc_depth))
+    )
+    os.makedirs(exec_dir)
+    with open(os.path.join(workspace_dir, ".nvmrc"), "w", encoding="UTF-8") as file:
+        file.write("default\n")
+    return exec_dir
+
+
+def create_shim(root_dir: str) -> str:
+    """
+    Create a node shim like the installed console script
+
+    :param root_dir: folder to create the shim in
+    :return: path to the shim executable
+    """
+    shim_dir = os.path.join(root_dir, "shim")
+    os.makedirs(shim_dir)
+    shim_path = os.path.join(shim_dir, "node")
+    with open(shim_path, "w", encoding="UTF-8") as shim_file:
+        shim_file.write(
+            f"#!{sys.executable}\nfrom nvshim.core.shim import main\nmain()\n"
+        )
+    os.chmod(shim_path, 0o755)
+    return shim_path
+
+
+def time_phases(nvm_dir: str, exec_dir: str, number: int) -> "Dict[str, float]":
+    """
+    Time each phase of resolving the node executable in process with caches cleared
+
+    :param nvm_dir: the path to .nvm installation
+    :param exec_dir: the folder node is run from
+    :param number: number of calls per repeat
+    :return: mapping of phase to milliseconds per call
+    """
+    node_versions_dir = get_node_versions_dir(nvm_dir)
+    rc_version = get_nvmrc(get_nvmrc_path(exec_dir))
+    nvm_aliases = get_nvm_alias_mapping(nvm_dir)
+    node_versions = get_node_versions(node_versions_dir)
+
+    def clear_caches():
+        get_nvm_aliases.cache_clear()
+
+    def resolve():
+        clear_caches()
+        return resolve_version(
+            version_alias=rc_version,
+            nvm_aliases=nvm_aliases,
+            node_versions=node_versions,
+        )
+
+    version, version_installed = resolve()
+
+    def bin_path():
+        return get_bin_path(
+            version_alias=rc_version,
+            version=version,
+            version_installed=version_installed,
+            bin_file="node",
+            node_versions_dir=node_versions_dir,
+            nvm_sh_path=get_nvmsh_path(nvm_dir),
+        )
+
+    def resolve_bin():
+        clear_caches()
+        return resolve_bin_path(exec_dir, "node", nvm_dir)
+
+    phases = {
+        "get_nvmrc_path": lambda: get_nvmrc_path(exec_dir),
+        "get_nvm_alias_mapping": lambda: get_nvm_alias_mapping(nvm_dir),
+        "get_node_versions": lambda: get_node_versions(node_versions_dir),
+        "resolve_version": resolve,
+        "get_bin_path": bin_path,
+    }
+    timings = {phase: time_per_call(func, number) for phase, func in phases.items()}
+    with process_env({**os.environ, EnvironmentVariable.CACHE.value: "false"}):
+        timings["resolve_bin_path"] = time_per_call(resolve_bin, number)
+    resolve_bin()
+    timings["resolve_bin_path_cached"] = time_per_call(resolve_bin, number)
+    return timings
+
+
+def time_launches(
+    bin_path: str, shim_path: str, exec_dir: str, number: int
+) -> "Dict[str, float]":
+    """
+    Time running node directly and through the shim process
+
+    :param bin_path: path to the node executable
+    :param shim_path: path to the node shim
+    :param exec_dir: the folder node is run from
+    :param number: number of launches per repeat
+    :return: mapping of launch to milliseconds per launch
+    """
+
+    def launch(path: str) -> "Callable[[], object]":
+        return lambda: subprocess.run([path], cwd=exec_dir, check=True)
+
+    timings = {"launch": time_per_call(launch(bin_path), number)}
+    with process_env({**os.environ, EnvironmentVariable.CACHE.value: "false"}):
+        timings["shim"] = time_per_call(launch(shim_path), number)
+    launch(shim_path)()
+    timings["shim_cached"] = time_per_call(launch(shim_path), number)
+    timings["shim_overhead"] = timings["shim"] - timings["launch"]
+    timings["shim_cached_overhead"] = timings["shim_cached"] - timings["launch"]
+    return timings
+
+
+def run_scenario(
+    scenario: "Scenario", number: int, launches: int
+) -> "Dict[str, object]":
+    """
+    Benchmark resolving and running node in a synthetic nvm folder and workspace
+
+    :param scenario: shape of the nvm folder and workspace to create
+    :param number: number of in process resolutions per repeat
+    :param launches: number of process launches per repeat
+    :return: scenario parameters with the timings in milliseconds
+    """
+    root_dir = tempfile.mkdtemp(prefix="nvshim")
+    try:
+        nvm_dir = create_nvm_dir(root_dir, scenario)
+        exec_dir = create_workspace(root_dir, scenario)
+        shim_path = create_shim(root_dir)
+        env = {
+            **os.environ,
+            EnvironmentVariable.CACHE_DIR.value: os.path.join(root_dir, "cache"),
+            EnvironmentVariable.DAEMON_SOCKET.value: os.path.join(root_dir, "none"),
+            EnvironmentVariable.NVM_DIR.value: nvm_dir,
+            EnvironmentVariable.VERBOSE.value: "false",
+            "PYTHONPATH": os.pathsep.join(
+                filter(
+                    None,
+                    (
+                        os.path.dirname(os.path.dirname(nvshim.__file__)),
+                        os.environ.get("PYTHONPATH"),
+                    ),
+                )
+            ),
+        }
+        with process_env(env):
+            bin_path = resolve_bin_path(exec_dir, "node", nvm_dir)[0]
+            phases = time_phases(nvm_dir, exec_dir, number)
+            launch = time_launches(bin_path, shim_path, exec_dir, launches)
+    finally:
+        shutil.rmtree(root_dir)
+    return {"parameters": scenario._asdict(), "phases": phases, "launch": launch}
+
+
+def get_parser() -> "argparse.ArgumentParser":
+    """Get the benchmark argument parser"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run, can be repeated, defaults to all",
+    )
+    parser.add_argument(
+        "--number", type=int, default=50, help="in process resolutions per repeat"
+    )
+    parser.add_argument(
+        "--launches", type=int, default=10, help="process launches per repeat"
+    )
+    parser.add_argument("--output", help="file to write results to, defaults to stdout")
+    return parser
+
+
+def main(args: "Optional[List[str]]" = None):
+    """Print the timings in milliseconds of every scenario as json"""
+    parsed_args = get_parser().parse_args(args)
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": REPEAT,
+        "number": parsed_args.number,
+        "launches": parsed_args.launches,
+        "unit": "ms",
+        "scenarios": {
+            name: run_scenario(
+                SCENARIOS[name], parsed_args.number, parsed_args.launches
+            )
+            for name in parsed_args.scenario or SCENARIOS
+        },
+    }
+    output = json.dumps(results, indent=2)
+    if parsed_args.output:
+        with open(parsed_args.output, "w", encoding="UTF-8") as output_file:
+            output_file.write(f"{output}\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
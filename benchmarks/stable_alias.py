@@ -0,0 +1,46 @@
+"""Benchmark resolving the stable alias by running nvm against resolving it locally"""
+import timeit
+from typing import Callable
+
+from nvshim.core.__main__ import (
+    get_local_stable_version,
+    get_nvm_aliases,
+    get_nvm_stable_version,
+)
+from nvshim.utils.environment import get_nvm_dir
+
+
+def time_per_call(func: "Callable[[], object]", number: int) -> float:
+    """
+    Get the best average seconds per call over a few repeats
+
+    :param func: function to time
+    :param number: number of calls per repeat
+    :return: seconds per call
+    """
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    """Print the latency of each stable alias resolution strategy"""
+    nvm_dir = get_nvm_dir()
+
+    def nvm_stable_version():
+        get_nvm_aliases.cache_clear()
+        get_nvm_stable_version.cache_clear()
+        return get_nvm_stable_version(nvm_dir)
+
+    def local_stable_version():
+        return get_local_stable_version(nvm_dir)
+
+    print(f"nvm:   {nvm_stable_version()}")
+    print(f"local: {local_stable_version()}")
+    before = time_per_call(nvm_stable_version, number=5)
+    after = time_per_call(local_stable_version, number=1000)
+    print(f"nvm alias stable (bash + nvm.sh): {before * 1e3:10.3f} ms")
+    print(f"installed versions (python):      {after * 1e3:10.3f} ms")
+    print(f"speedup:                          {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark matching versions against a synthetic versions folder with many installs"""
+import os
+import shutil
+import tempfile
+import timeit
+from typing import (
+    Callable,
+    Optional,
+    Set,
+)
+
+from nvshim.core.__main__ import get_node_versions
+from nvshim.utils import semver
+from nvshim.utils.version_index import VersionIndex
+
+QUERIES = ("18", "18.2", "^18.2", "~20.1", ">=18 <21", "16 || 20")
+
+
+def time_per_call(func: "Callable[[], object]", number: int) -> float:
+    """
+    Get the best average seconds per call over a few repeats
+
+    :param func: function to time
+    :param number: number of calls per repeat
+    :return: seconds per call
+    """
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def linear_match(version_alias: str, version_set: "Set[str]") -> "Optional[object]":
+    """Match a major or major.minor prefix by parsing, filtering and sorting every version"""
+    parts = [int(part) for part in version_alias.split(".")]
+    matches = sorted(
+        version
+        for version in map(semver.parse, version_set)
+        if version and [version.major, version.minor][: len(parts)] == parts
+    )
+    return matches.pop() if matches else None
+
+
+def main():
+    """Print the latency of matching versions with and without the version index"""
+    node_versions_dir = tempfile.mkdtemp(prefix="nvshim")
+    for major in range(4, 24):
+        for minor in range(0, 25):
+            for patch in range(0, 3):
+                os.mkdir(os.path.join(node_versions_dir, f"v{major}.{minor}.{patch}"))
+    try:
+        versions = get_node_versions(node_versions_dir)
+        index = VersionIndex(versions)
+        print(f"installed versions: {len(index)}")
+
+        def before():
+            return [linear_match(query, set(versions)) for query in ("18", "18.2")]
+
+        def build_and_query():
+            version_index = VersionIndex(versions)
+            return [version_index.max_satisfying(query) for query in QUERIES]
+
+        def query():
+            return [index.max_satisfying(query) for query in QUERIES]
+
+        linear = time_per_call(before, number=20) / 2
+        indexed = time_per_call(build_and_query, number=20) / len(QUERIES)
+        queried = time_per_call(query, number=2000) / len(QUERIES)
+    finally:
+        shutil.rmtree(node_versions_dir)
+    print(f"parse, filter and sort per match:   {linear * 1e3:8.3f} ms")
+    print(f"index built per resolution / query: {indexed * 1e3:8.3f} ms")
+    print(f"prebuilt index query:               {queried * 1e3:8.3f} ms")
+    print(f"speedup (prebuilt index):           {linear / queried:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 """Configure pytest"""
+import hashlib
+import io
 import os
 import shutil
 import sys
+import tarfile
 from typing import (
+    Callable,
     Dict,
+    List,
     Optional,
+    Sequence,
+    Tuple,
     Union,
 )
 
@@ -54,6 +61,87 @@ def _make_fs(base: str, structure: "Optional[Dict[str, Union[str, dict]]]" = Non
             os.makedirs(file_path, exist_ok=True)
 
 
+@pytest.fixture(autouse=True)
+def test_cache_dir(tmp_path, monkeypatch):
+    """Isolate the persistent resolution cache used during each test"""
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setenv("NVSHIM_CACHE_DIR", cache_dir)
+    return cache_dir
+
+
+@pytest.fixture
+def test_nvm_dir(tmp_path):
+    """Prepare a minimal nvm installation with the test node version installed"""
+    nvm_dir = str(tmp_path / "nvm")
+    bin_files = {
+        name: f'#!/bin/sh\necho "{name} $@"\n' for name in ("node", "npm", "npx")
+    }
+    _make_fs(
+        nvm_dir,
+        {
+            "alias": {"default": "14"},
+            "versions": {"node": {__TEST_VERSION__: {"bin": bin_files}}},
+        },
+    )
+    for name in bin_files:
+        os.chmod(
+            os.path.join(nvm_dir, "versions", "node", __TEST_VERSION__, "bin", name),
+            0o755,
+        )
+    return nvm_dir
+
+
+def _make_release_archive(
+    archive_path: str,
+    release_name: str,
+    members: "Sequence[Tuple[str, Union[bytes, str]]]",
+):
+    with tarfile.open(archive_path, "w:xz") as archive:
+        for name, content in members:
+            member = tarfile.TarInfo(f"{release_name}/{name}")
+            if isinstance(content, bytes):
+                member.size, member.mode = len(content), 0o755
+                archive.addfile(member, io.BytesIO(content))
+            else:
+                member.type, member.linkname = tarfile.SYMTYPE, content
+                archive.addfile(member)
+
+
+@pytest.fixture
+def test_mirror(tmp_path) -> "Callable[..., str]":
+    """Get function that writes node release archives to a local mirror folder"""
+    mirror_dir = str(tmp_path / "mirror")
+    node_script = b'#!/bin/sh\necho "node $@"\n'
+
+    def make_mirror(
+        versions: "List[str]",
+        corrupt: "Sequence[str]" = (),
+        members: "Optional[Sequence[Tuple[str, Union[bytes, str]]]]" = None,
+    ) -> str:
+        os.makedirs(mirror_dir, exist_ok=True)
+        checksums = [f"{'1' * 64}  node-v{versions[0]}-win-x64.zip"]
+        for version in versions:
+            file_name = f"node-v{version}-linux-x64.tar.xz"
+            archive_path = os.path.join(mirror_dir, file_name)
+            _make_release_archive(
+                archive_path,
+                f"node-v{version}-linux-x64",
+                members or [("bin/node", node_script)],
+            )
+            with open(archive_path, "rb") as archive_file:
+                checksum = hashlib.sha256(archive_file.read()).hexdigest()
+            if version in corrupt:
+                checksum = "0" * 64
+            checksums.append(f"{checksum}  {file_name}")
+        with open(
+            os.path.join(mirror_dir, "SHASUMS256.txt"), "w", encoding="UTF-8"
+        ) as checksums_file:
+            checksums_file.write("\n".join(checksums))
+        return mirror_dir
+
+    return make_mirror
+
+
 @pytest.fixture
 def test_workspace():
     """Prepare test workspace for interacting with file system during tests"""
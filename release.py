@@ -2,19 +2,17 @@
 import importlib
 import os
 
-import semver
-
-import nvshim
-from nvshim.utils import process
+from nvshim import _version
+from nvshim.utils import (
+    process,
+    semver,
+)
 
 DIST_PATH = "dist"
 
 
 def _is_valid_release_version(version: str) -> bool:
-    try:
-        return bool(semver.VersionInfo.parse(version))
-    except ValueError:
-        return False
+    return semver.parse(version) is not None
 
 
 def _clean():
@@ -56,7 +54,7 @@ def main():
     _clean()
     _build()
 
-    __version__ = importlib.reload(nvshim).__version__
+    __version__ = importlib.reload(_version).__version__
     print(f"Publishing: {__version__}")
 
     if __version__:
@@ -81,9 +81,10 @@ def version_scheme(version) -> str:
     return datetime.now().strftime("%Y.%m.%d.%H%M%S%f")
 
 
-console_scripts = ["nvm=nvshim.core.shim_nvm:main"] + [
-    f"{s}=nvshim.core.shim:main" for s in shims
-]
+console_scripts = [
+    "nvm=nvshim.core.shim_nvm:main",
+    "nvshim=nvshim.core.cli:main",
+] + [f"{s}=nvshim.core.shim:main" for s in shims]
 
 setup(
     author="Emmanuel Ogbizi-Ugbe",
@@ -120,7 +121,7 @@ setup(
     use_scm_version={
         "local_scheme": "no-local-version",
         "version_scheme": version_scheme,
-        "write_to": "./src/nvshim/__init__.py",
+        "write_to": "./src/nvshim/_version.py",
         "write_to_template": '"""Current package version"""\n__version__ = "{version}"\n',
     },
 )
@@ -1,2 +1,35 @@
-"""Current package version"""
-__version__ = "0.0.0"
+"""Automagically use the correct version of node"""
+from typing import TYPE_CHECKING
+
+from ._version import __version__
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from .core.api import (
+        ExecutableNotFoundError,
+        NvmDirMissingError,
+        ResolutionError,
+        VersionNotInstalledError,
+        resolve,
+    )
+    from .core.resolver import Resolution
+
+_API_MODULES = {
+    "ExecutableNotFoundError": "nvshim.core.api",
+    "NvmDirMissingError": "nvshim.core.api",
+    "Resolution": "nvshim.core.resolver",
+    "ResolutionError": "nvshim.core.api",
+    "VersionNotInstalledError": "nvshim.core.api",
+    "resolve": "nvshim.core.api",
+}
+
+__all__ = ["__version__", *_API_MODULES]
+
+
+def __getattr__(name: str) -> object:
+    """Import the python api on first use so shims do not pay for it"""
+    if name not in _API_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib  # pylint: disable=import-outside-toplevel
+
+    return getattr(importlib.import_module(_API_MODULES[name]), name)
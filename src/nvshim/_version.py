@@ -0,0 +1,2 @@
+"""Current package version"""
+__version__ = "0.0.0"
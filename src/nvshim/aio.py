@@ -0,0 +1,84 @@
+"""Resolve and run node executables from asyncio without a shim process per call"""
+import asyncio
+import os
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from nvshim.core import api
+from nvshim.core.resolver import Resolution
+from nvshim.utils import (
+    environment,
+    process,
+)
+
+if TYPE_CHECKING:  # pragma: no-cover
+    import subprocess
+
+    from nvshim.utils.environment import EnvDict
+
+    PendingKey = Tuple[asyncio.AbstractEventLoop, str, str, Optional[str]]
+
+_pending: "Dict[PendingKey, asyncio.Future]" = {}
+
+
+async def resolve(
+    cwd: str, bin_file: str = "node", nvm_dir: "Optional[str]" = None
+) -> "Resolution":
+    """
+    Resolve the node executable in a worker thread, where concurrent awaiters resolving
+    the same folder and executable share a single resolution
+
+    :param cwd: the folder the executable would be run from
+    :param bin_file: the node binary to find, defaults to node
+    :param nvm_dir: the path to .nvm installation, defaults to $NVM_DIR
+    :return: resolution with the .nvmrc file and version, alias chain and executable path
+    :raises nvshim.ResolutionError: when the executable cannot be resolved
+    """
+    loop = asyncio.get_event_loop()
+    key = (loop, os.path.abspath(cwd), bin_file, nvm_dir)
+    future = _pending.get(key)
+    if future is None:
+        future = _pending[key] = loop.run_in_executor(
+            None, api.resolve, key[1], bin_file, nvm_dir
+        )
+        future.add_done_callback(lambda _: _pending.pop(key, None))
+    return await asyncio.shield(future)
+
+
+async def run(
+    bin_file: str,
+    *args: str,
+    cwd: "Optional[str]" = None,
+    env: "Optional[EnvDict]" = None,
+    nvm_dir: "Optional[str]" = None,
+    check: bool = True,
+    **kwargs,
+) -> "subprocess.CompletedProcess":
+    """
+    Run the node executable resolved for a folder as the shim would,
+    exiting with the process exit code when it fails unless check is false
+
+    :param bin_file: the node binary to run e.g. node, npm, npx
+    :param args: arguments to run the executable with
+    :param cwd: the folder to run the executable in, defaults to the current folder
+    :param env: environment to run the executable in, defaults to a copy of os.environ,
+        with the resolved bin folder put first on the path when enabled
+    :param nvm_dir: the path to .nvm installation, defaults to $NVM_DIR
+    :param check: if a failed process should exit with its exit code, defaults to true
+    :return: completed process, with output when piped
+    :raises nvshim.ResolutionError: when the executable cannot be resolved
+    """
+    exec_dir = os.getcwd() if cwd is None else cwd
+    bin_path = str((await resolve(exec_dir, bin_file, nvm_dir)).bin_path)
+    bin_env = (
+        environment.get_node_bin_env(os.path.dirname(bin_path), env)
+        if environment.is_node_bin_first_enabled()
+        else env
+    )
+    return await process.run_async(
+        bin_path, *args, cwd=exec_dir, env=bin_env, check=check, **kwargs
+    )
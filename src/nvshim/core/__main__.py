@@ -1,66 +1,57 @@
 """Main shim logic"""
-import argparse
-import functools
 import os
-import re
-import subprocess
 import sys
-from typing import (
-    Callable,
-    Dict,
-    Hashable,
-    Iterator,
-    List,
-    Optional,
-    Sequence,
-    Set,
-    Tuple,
-    TypeVar,
-    Union,
-)
-
-import semver
+from typing import TYPE_CHECKING
 
 from nvshim import __version__
+from nvshim.core import client
 from nvshim.utils import (
+    cache,
     environment,
+    lock,
     message,
     process,
+    semver,
+    trace,
+    version_file,
 )
+from nvshim.utils.alias_graph import AliasGraph
 from nvshim.utils.constants import (
+    DEFAULT_VERSION_FILES,
+    INSTALL_LOCK_TIMEOUT,
+    LTS_ALIAS_PREFIX,
+    NVM_SESSION_IDLE_TIMEOUT,
+    NVM_SNAPSHOT_FILE_NAME,
+    RESOLVED_TOKEN_SEPARATOR,
     Alias,
     ErrorCode,
 )
+from nvshim.utils.version_index import VersionIndex
+
+if TYPE_CHECKING:  # pragma: no-cover
+    import argparse
+    import subprocess
+    from typing import (
+        Callable,
+        Dict,
+        Generator,
+        Iterable,
+        Iterator,
+        List,
+        Optional,
+        Sequence,
+        Tuple,
+        Union,
+    )
 
-K = TypeVar("K")
-V = TypeVar("V")
-
-
-class HashableList(List[V], Hashable):
-    """List that can be stored in a hash object"""
-
-    def __hash__(self):
-        return hash(frozenset(self))
-
-
-class HashableSet(Set[V], Hashable):
-    """Set that can be stored in a hash object"""
-
-    def __hash__(self):
-        return hash(frozenset(self))
-
-
-class HashableDict(Dict[K, V], Hashable):
-    """Dictionary that can be stored in a hash object"""
-
-    def __hash__(self):
-        return hash(frozenset(self.items()))
-
+    from nvshim.utils.cache import CacheStamp
+    from nvshim.utils.environment import EnvDict
 
-AliasResolver = Callable[..., Optional[str]]
-AliasOrResolver = Union[str, AliasResolver]
-VersionMapping = HashableDict[str, str]
-AliasMapping = HashableDict[str, AliasOrResolver]
+    AliasResolver = Callable[[], Optional[str]]
+    AliasOrResolver = Union[str, AliasResolver]
+    AliasMapping = Dict[str, AliasOrResolver]
+    VersionMapping = Dict[str, str]
+    NvmSnapshot = Dict[str, object]
 
 
 def get_files(path: str) -> "Iterator[str]":
@@ -75,29 +66,78 @@ def get_files(path: str) -> "Iterator[str]":
         yield path
 
 
+def get_nvm_state_paths(nvm_dir: str, **_: object) -> "List[str]":
+    """
+    Get the paths whose modification can change the aliases nvm reports
+
+    :param nvm_dir: the path to .nvm installation
+    :return: alias folders, alias files and the node versions folder
+    """
+    nvm_aliases_dir = get_nvm_aliases_dir(nvm_dir)
+    return [
+        nvm_aliases_dir,
+        os.path.join(nvm_aliases_dir, "lts"),
+        *get_files(nvm_aliases_dir),
+        get_node_versions_dir(nvm_dir),
+    ]
+
+
 def run_nvm_cmd(
-    nvm_sh_path: str, nvm_args: str, **kwargs
-) -> process.subprocess.CompletedProcess:
+    nvm_sh_path: str,
+    nvm_args: str,
+    *,
+    env: "Optional[environment.EnvDict]" = None,
+    **kwargs,
+) -> "subprocess.CompletedProcess":
     """
-    Run nvm command by creating temp file that sources nvm.sh and runs command
+    Run nvm command in a bash process that sources nvm.sh, passing the script as
+    an argument so no file is written and concurrent calls do not interfere.
+    When nvm sessions are enabled the command is run in a bash that has already
+    sourced nvm.sh, unless a custom environment or process arguments are given
 
     :param nvm_sh_path: path to .nvm/nvm.sh file
     :param nvm_args: arguments to pass to loaded nvm command
+    :param env: environment to run the command in, defaults to a copy of os.environ
     :return: completed process object
     """
-    nvshim_file_path = f"{os.path.dirname(sys.argv[0])}/nvm_shim.sh.tmp"
-    try:
-        with open(nvshim_file_path, "w", encoding="UTF-8") as nvshim_file:
-            nvshim_file.write(f"source {nvm_sh_path} &> /dev/null\nnvm {nvm_args}")
-        return process.run("bash", nvshim_file_path, **kwargs)
-    finally:
-        try:
-            os.remove(nvshim_file_path)
-        except OSError as exc:
-            message.print_unable_to_remove_nvm_shim_temp_file(exc)
+    trace.record_subprocess(f"nvm {nvm_args}")
+    nvm_cmd = _get_nvm_cmd(nvm_sh_path, nvm_args)
+    idle_timeout = environment.get_nvm_session_idle_timeout(NVM_SESSION_IDLE_TIMEOUT)
+    if idle_timeout and env is None and not kwargs:
+        from nvshim.core import nvm_session  # pylint: disable=import-outside-toplevel
+
+        exit_code = nvm_session.run_nvm_cmd(nvm_sh_path, nvm_args, idle_timeout)
+        if exit_code is not None:
+            return process.check_exit(nvm_cmd, exit_code)
+    return process.run(*nvm_cmd, env=env, **kwargs)
+
+
+def stream_nvm_cmd(
+    nvm_sh_path: str,
+    nvm_args: str,
+    *,
+    env: "Optional[environment.EnvDict]" = None,
+) -> "Generator[str, None, None]":
+    """
+    Run nvm command as run_nvm_cmd does, yielding each output line as nvm prints it
+    so long listings are never held in memory. Closing the generator stops nvm.
+
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :param nvm_args: arguments to pass to loaded nvm command
+    :param env: environment to run the command in, defaults to a copy of os.environ
+    :return: generator of output lines
+    """
+    trace.record_subprocess(f"nvm {nvm_args}")
+    nvm_cmd = _get_nvm_cmd(nvm_sh_path, nvm_args)
+    yield from process.stream(*nvm_cmd, env=env)  # type: ignore
 
 
-def parse_alias_version(line: str) -> "Tuple[str, str, Optional[semver.VersionInfo]]":
+def _get_nvm_cmd(nvm_sh_path: str, nvm_args: str) -> "Tuple[str, ...]":
+    nvm_script = f'source "$0" &> /dev/null\nnvm {nvm_args}'
+    return "bash", "-c", nvm_script, nvm_sh_path
+
+
+def parse_alias_version(line: str) -> "Tuple[str, str, Optional[semver.Version]]":
     """
     Convert nvm alias line to alias and eventual version
     Pattern: alias -> value (-> resolved version)
@@ -106,12 +146,29 @@ def parse_alias_version(line: str) -> "Tuple[str, str, Optional[semver.VersionIn
     stable -> 17.8 (-> v17.8.0) (default)
     unstable -> N/A (default)
     """
+    import re  # pylint: disable=import-outside-toplevel
+
     alias_ptn = r"^([\w\-.\/ *]+) -> ([\w\-.\/ *]+)( \(-> ([\w\-.\/ ]+)( \*)?\))?( \(default\))?$"
     result = re.findall(alias_ptn, line.strip())
     return result[0][0], result[0][1], parse_version(result[0][3])
 
 
-@functools.lru_cache(maxsize=None)
+def parse_alias_versions(
+    lines: "Iterable[str]",
+) -> "Iterator[Tuple[str, str, Optional[semver.Version]]]":
+    """
+    Convert nvm alias lines to alias and eventual version as each line is read,
+    skipping blank lines
+
+    :param lines: nvm alias output lines
+    :return: generator of alias, value and resolved version
+    """
+    for line in lines:
+        if line.strip():
+            yield parse_alias_version(line)
+
+
+@cache.mtime_cache(get_nvm_state_paths)
 def get_nvm_aliases(nvm_dir: str, *, alias: "Optional[str]" = "") -> "VersionMapping":
     """
     Get all nvm aliases
@@ -119,18 +176,12 @@ def get_nvm_aliases(nvm_dir: str, *, alias: "Optional[str]" = "") -> "VersionMap
     :param nvm_dir: the path to .nvm installation
     :return: mapping of alias to version
     """
-    output: "Optional[str]" = run_nvm_cmd(
-        get_nvmsh_path(nvm_dir),
-        f"alias {alias} --no-colors",
-        stdout=subprocess.PIPE,
-    ).stdout
-    aliases = HashableDict(
-        {
-            k: str(t or v)
-            for line in (output or "").splitlines()
-            for (k, v, t) in [parse_alias_version(line)]
-        }
-    )
+    aliases: "VersionMapping" = {
+        k: str(t or v)
+        for (k, v, t) in parse_alias_versions(
+            stream_nvm_cmd(get_nvmsh_path(nvm_dir), f"alias {alias} --no-colors")
+        )
+    }
 
     if Alias.DEFAULT.value not in aliases:
         aliases[Alias.DEFAULT.value] = Alias.STABLE.value
@@ -138,7 +189,7 @@ def get_nvm_aliases(nvm_dir: str, *, alias: "Optional[str]" = "") -> "VersionMap
     return aliases
 
 
-@functools.lru_cache(maxsize=None)
+@cache.mtime_cache(get_nvm_state_paths)
 def get_nvm_stable_version(nvm_dir: str) -> "Optional[str]":
     """
     Get the stable version by using nvm
@@ -146,11 +197,75 @@ def get_nvm_stable_version(nvm_dir: str) -> "Optional[str]":
     :param nvm_dir: the path to .nvm installation
     :return: the stable version number
     """
-    return get_nvm_aliases(nvm_dir, alias=Alias.STABLE.value).get(
-        Alias.STABLE.value
+    return get_nvm_alias_version(
+        nvm_dir, Alias.STABLE.value
     ) or message.print_unable_to_get_alias_version(Alias.STABLE.value)
 
 
+def get_nvm_alias_version(nvm_dir: str, alias: str) -> "Optional[str]":
+    """
+    Get the version of a single alias using nvm, stopping nvm as soon as it is listed
+
+    :param nvm_dir: the path to .nvm installation
+    :param alias: the alias to find
+    :return: the alias version or None when nvm does not list the alias
+    """
+    import contextlib  # pylint: disable=import-outside-toplevel
+
+    with contextlib.closing(
+        stream_nvm_cmd(get_nvmsh_path(nvm_dir), f"alias {alias} --no-colors")
+    ) as lines:
+        for name, value, version in parse_alias_versions(lines):
+            if name == alias:
+                return str(version or value)
+    return None
+
+
+def get_stable_version(node_versions: "Iterable[semver.Version]") -> "Optional[str]":
+    """
+    Get the latest installed stable version using the same rules as nvm,
+    every release from 1.0.0 is stable but only even minor 0.x releases are
+
+    :param node_versions: installed node versions
+    :return: the stable version number or None when no stable version is installed
+    """
+    stable_versions = [v for v in node_versions if v.major or v.minor % 2 == 0]
+    return str(max(stable_versions)) if stable_versions else None
+
+
+def get_local_stable_version(nvm_dir: str) -> "Optional[str]":
+    """
+    Get the stable version from the installed node versions in the nvm snapshot,
+    falling back to nvm only when enabled and no stable version is installed
+
+    :param nvm_dir: the path to .nvm installation
+    :return: the stable version number
+    """
+    stable_version = get_stable_version(
+        semver.Version(*version)
+        for version in get_nvm_snapshot(nvm_dir)["versions"]  # type: ignore
+    )
+    if stable_version:
+        return stable_version
+    if environment.is_nvm_fallback_enabled():
+        return get_nvm_stable_version(nvm_dir)
+    return message.print_unable_to_get_alias_version(Alias.STABLE.value)
+
+
+def get_local_iojs_version(nvm_dir: str) -> "Optional[str]":
+    """
+    Get the latest installed io.js version named as nvm does e.g. iojs-v3.3.1
+
+    :param nvm_dir: the path to .nvm installation
+    :return: the io.js version or None when no io.js version is installed
+    """
+    iojs_versions = get_node_versions(os.path.join(nvm_dir, "versions", "io.js"))
+    versions = [v for v in map(parse_version, iojs_versions.keys()) if v]
+    if versions:
+        return f"{Alias.IOJS.value}-v{max(versions)}"
+    return message.print_unable_to_get_alias_version(Alias.IOJS.value)
+
+
 def get_nvm_aliases_dir(nvm_dir: str) -> str:
     """
     Get the folder location of .nvm aliases
@@ -161,112 +276,115 @@ def get_nvm_aliases_dir(nvm_dir: str) -> str:
     return os.path.join(nvm_dir, "alias")
 
 
-def get_nvm_alias_mapping(nvm_dir: str) -> "AliasMapping":
+def get_nvm_alias_files(
+    nvm_dir: str, file_paths: "Optional[Iterable[str]]" = None
+) -> "Dict[str, str]":
     """
-    Get all nvm aliases
+    Read the version or alias each nvm alias file points to
 
     :param nvm_dir: the path to .nvm installation
-    :return: mapping of alias to version or lazy function that returns version
+    :param file_paths: the alias files to read, defaults to all files in the alias folder
+    :return: mapping of alias file path relative to the alias folder to its first line
     """
-    aliases_to_version = AliasMapping(
-        {
-            Alias.DEFAULT.value: Alias.STABLE.value,
-            Alias.NODE.value: Alias.STABLE.value,
-            Alias.STABLE.value: lambda: get_nvm_stable_version(nvm_dir),
-        }
-    )
     nvm_aliases_dir = get_nvm_aliases_dir(nvm_dir)
-    for file_path in get_files(nvm_aliases_dir):
-        rel_path = os.path.relpath(file_path, nvm_aliases_dir)
+    alias_files = {}
+    for file_path in get_files(nvm_aliases_dir) if file_paths is None else file_paths:
         with open(file_path, encoding="UTF-8") as open_file:
-            aliases_to_version[rel_path] = open_file.readline().strip()
+            alias_files[
+                os.path.relpath(file_path, nvm_aliases_dir)
+            ] = open_file.readline().strip()
+    return alias_files
+
+
+def get_nvm_alias_mapping(
+    nvm_dir: str, alias_files: "Optional[Dict[str, str]]" = None
+) -> "AliasMapping":
+    """
+    Get all nvm aliases
 
+    :param nvm_dir: the path to .nvm installation
+    :param alias_files: the alias files read from the alias folder, read when not given
+    :return: mapping of alias to version or lazy function that returns version
+    """
+    aliases_to_version: "AliasMapping" = {
+        Alias.DEFAULT.value: Alias.STABLE.value,
+        Alias.IOJS.value: lambda: get_local_iojs_version(nvm_dir),
+        Alias.NODE.value: Alias.STABLE.value,
+        Alias.STABLE.value: lambda: get_local_stable_version(nvm_dir),
+    }
+    if alias_files is None:
+        alias_files = get_nvm_alias_files(nvm_dir)
+    aliases_to_version.update(alias_files)
+    lts_names = [
+        alias
+        for alias in alias_files
+        if alias.startswith(LTS_ALIAS_PREFIX) and alias != Alias.LTS.value
+    ]
+
+    for alias, lts_alias in get_lts_relative_aliases(sorted(lts_names)).items():
+        aliases_to_version.setdefault(alias, lts_alias)
     return aliases_to_version
 
 
-def parse_version(version: "Optional[str]") -> "Optional[semver.VersionInfo]":
+def get_lts_relative_aliases(lts_aliases: "List[str]") -> "Dict[str, str]":
     """
-    Extract semantic version info object from version string
+    Get the lts/* and relative lts/-N aliases nvm derives from the sorted lts alias files,
+    where lts/-1 is the release line before the latest
 
-    :param version: version string in various formats e.g. v0.1, 1.0.1 etc.
-    :return: parsed semantic version info or None when version cannot be parsed
+    :param lts_aliases: sorted lts codename aliases e.g. [lts/hydrogen, lts/iron, lts/jod]
+    :return: mapping of derived lts alias to lts codename alias
     """
-    if not version:
-        return None
-    try:
-        return semver.VersionInfo.parse(
-            version[1:] if version.startswith("v") else version
-        )
-    except ValueError:
-        return None
+    if not lts_aliases:
+        return {}
+    relative_aliases = {
+        f"{LTS_ALIAS_PREFIX}-{offset}": lts_alias
+        for offset, lts_alias in enumerate(reversed(lts_aliases))
+        if offset
+    }
+    return {Alias.LTS.value: lts_aliases[-1], **relative_aliases}
 
 
-def as_number(maybe_numeric: str) -> "Tuple[Union[int, float, None], bool, bool]":
+def parse_version(version: "Optional[str]") -> "Optional[semver.Version]":
     """
-    Attempt to parse string as numeric value
+    Extract semantic version info object from version string
 
-    :returns: the number, is integer i.e. only major, is float i.e. no patch
+    :param version: version string in various formats e.g. v0.1, 1.0.1 etc.
+    :return: parsed semantic version info or None when version cannot be parsed
     """
-    try:
-        return int(maybe_numeric), True, True
-    except ValueError:
-        try:
-            return float(maybe_numeric), False, True
-        except ValueError:
-            return None, False, False
+    if not version:
+        return None
+    return semver.parse(version[1:] if version.startswith("v") else version)
 
 
 def match_version(
-    version_alias: str, version_set: "Set[str]"
-) -> "Optional[semver.VersionInfo]":
+    version_alias: str, version_set: "Union[Iterable[str], VersionIndex]"
+) -> "Optional[semver.Version]":
     """
-    Find the closest matching semantic version in the version set
+    Find the highest version in the version set matching the version or range
+
+    :param version_alias: version or npm style range e.g. 18, v18.2.0, ^18.2, >=18 <21
+    :param version_set: versions to search, indexed once when not already a version index
+    :return: highest matching version or None when no version matches
     """
-    plain_version = (
-        version_alias[1:] if version_alias.startswith("v") else version_alias
-    )
-    version = parse_version(plain_version)
-    if version:
-        is_minor_wildcard = False
-        is_patch_wildcard = False
-    else:
-        version_number, is_minor_wildcard, is_patch_wildcard = as_number(plain_version)
-        if version_number is None:
-            return None
-        version = parse_version(f"{float(version_number)}.0")
-
-    version_sorted = sorted(
-        vi
-        for vi in (semver.VersionInfo.parse(v) for v in version_set)
-        if version
-        and version.major == vi.major
-        and (is_minor_wildcard or version.minor == vi.minor)
-        and (is_patch_wildcard or version.patch == vi.patch)
-    )
-    return version_sorted.pop() if version_sorted else None
+    if not isinstance(version_set, VersionIndex):
+        version_set = VersionIndex(version_set)
+    return version_set.max_satisfying(version_alias)
 
 
-@functools.lru_cache(maxsize=None)
 def resolve_alias(
-    var: "AliasOrResolver",
-    alias_mapping: "AliasMapping",
-    seen: "HashableSet[str]" = HashableSet(),
-    seen_order: "HashableList[str]" = HashableList(),
-) -> "Tuple[Optional[semver.VersionInfo], Optional[str], HashableList[str]]":
+    version_alias: str, nvm_aliases: "Union[AliasMapping, AliasGraph]"
+) -> "Tuple[Optional[semver.Version], Optional[str], List[str]]":
     """
     Resolve an alias to a semantic version going through multiple mappings
 
-    :param var: version alias or resolver
-    :type alias_mapping: mapping of alias to version, alias or resolver
+    :param version_alias: version or alias to resolve
+    :param nvm_aliases: nvm aliases to version mapping, compiled once when not already a graph
     :return: (semantic version info, alias name, list of aliases traversed)
     """
-    alias = var() if callable(var) else var
-    if alias and alias in alias_mapping and alias not in seen:
-        seen_order.append(alias)
-        seen.add(alias)
-        return resolve_alias(alias_mapping.get(alias), alias_mapping, seen, seen_order)
-
-    return parse_version(alias), alias, seen_order
+    if not isinstance(nvm_aliases, AliasGraph):
+        nvm_aliases = AliasGraph(nvm_aliases)
+    alias, alias_chain = nvm_aliases.resolve(version_alias)
+    return parse_version(alias), alias, alias_chain
 
 
 def get_node_versions_dir(nvm_dir: str) -> str:
@@ -298,45 +416,87 @@ def get_node_versions(node_versions_dir: str) -> "VersionMapping":
     :return: mapping of parsed versions in the node versions folder to node version bin folder path
     """
     files = os.listdir(node_versions_dir) if os.path.exists(node_versions_dir) else []
-    return HashableDict(
-        {
-            str(v): get_node_version_bin_dir(node_versions_dir, str(v))
-            for v in map(parse_version, files)
-        }
+    return {
+        str(v): get_node_version_bin_dir(node_versions_dir, str(v))
+        for v in map(parse_version, files)
+    }
+
+
+def build_nvm_snapshot(nvm_dir: str) -> "Tuple[List[str], CacheStamp, NvmSnapshot]":
+    """
+    Read the nvm aliases and installed node versions, stamping the folders before
+    listing them and the files before reading them so changes made meanwhile are not missed
+
+    :param nvm_dir: the path to .nvm installation
+    :return: the paths whose modification invalidates the snapshot, their stamp,
+        and the alias files with the parsed versions sorted by precedence
+    """
+    nvm_aliases_dir = get_nvm_aliases_dir(nvm_dir)
+    node_versions_dir = get_node_versions_dir(nvm_dir)
+    folders = [nvm_aliases_dir, os.path.join(nvm_aliases_dir, "lts"), node_versions_dir]
+    folders_stamp = cache.get_stamp(folders)
+    alias_file_paths = [*get_files(nvm_aliases_dir)]
+    versions = VersionIndex(get_node_versions(node_versions_dir))
+    bin_dirs = (get_node_version_bin_dir(node_versions_dir, str(v)) for v in versions)
+    incomplete_version_dirs = [
+        os.path.dirname(bin_dir) for bin_dir in bin_dirs if not os.path.isdir(bin_dir)
+    ]
+    files = [*alias_file_paths, *incomplete_version_dirs]
+    files_stamp = cache.get_stamp(files)
+    snapshot: "NvmSnapshot" = {
+        "aliases": get_nvm_alias_files(nvm_dir, alias_file_paths),
+        "versions": [tuple(version) for version in versions],
+    }
+    return [*folders, *files], [*folders_stamp, *files_stamp], snapshot
+
+
+def get_nvm_snapshot(nvm_dir: str) -> "NvmSnapshot":
+    """
+    Get the nvm aliases and installed node versions with a single read of the snapshot file
+    in the nvm folder when caching is enabled, rebuilding it when the alias or node versions
+    folders, an alias file or the folder of a version without a bin folder was modified
+
+    :param nvm_dir: the path to .nvm installation
+    :return: the alias files and parsed versions sorted by precedence
+    """
+    snapshot_path = (
+        os.path.join(nvm_dir, NVM_SNAPSHOT_FILE_NAME)
+        if environment.is_resolution_cache_enabled()
+        else None
     )
+    snapshot = cache.get_entry(snapshot_path, nvm_dir) if snapshot_path else None
+    if snapshot:
+        return snapshot
+    paths, stamp, snapshot = build_nvm_snapshot(nvm_dir)
+    if snapshot_path:
+        cache.set_entry(
+            snapshot_path, nvm_dir, paths, max_entries=1, stamp=stamp, **snapshot
+        )
+    return snapshot
 
 
 def get_nvmrc_path(exec_dir: str) -> "Optional[str]":
     """
-    Get the path to the nearest .nvmrc file from the current folder by traversing up the tree
+    Get the path to the nearest version file from the current folder by traversing up the tree,
+    looking for the names set in $NVSHIM_VERSION_FILES in order of precedence in each folder
 
     :param exec_dir: the folder to start search from
-    :return: path to first found .nvmrc file
+    :return: path to first found .nvmrc, .node-version, .tool-versions or package.json file
     """
-    root_dir = os.path.abspath(os.sep)
-    current_dir = exec_dir
-    config_file = ".nvmrc"
-    config_found = False
-    while True:
-        current_config = os.path.join(current_dir, config_file)
-        config_found = os.path.exists(current_config)
-        if config_found or current_dir == root_dir:
-            break
-        current_dir = os.path.realpath(os.path.join(current_dir, "../"))
-
-    return current_config if config_found else None
+    return version_file.find(
+        exec_dir, environment.get_version_files(DEFAULT_VERSION_FILES)
+    )
 
 
 def get_nvmrc(nvmrc_path: "Optional[str]" = None) -> str:
     """
-    Get the version from the nvmrc file, falling back to default when none found
+    Get the version from the version file, falling back to default when none found
 
-    :param nvmrc_path: the location of the .nvmrc file, defaults to None
-    :return: .nvmrc version or using fallback
+    :param nvmrc_path: the location of the version file, defaults to None
+    :return: version file version or using fallback
     """
     if nvmrc_path:
-        with open(nvmrc_path, encoding="UTF-8") as open_file:
-            return open_file.readline().strip()
+        return version_file.read(nvmrc_path) or ""
 
     return Alias.DEFAULT.value
 
@@ -352,25 +512,116 @@ def get_nvmsh_path(nvm_dir: str) -> str:
 
 
 def resolve_version(
-    *, version_alias: str, nvm_aliases: "AliasMapping", node_versions: "VersionMapping"
+    *,
+    version_alias: str,
+    nvm_aliases: "Union[AliasMapping, AliasGraph]",
+    node_versions: "Union[VersionMapping, VersionIndex]",
 ) -> "Tuple[str, bool]":
     """
     Resolve the rc version to an installed or installable version
 
     :param rc_version: version loaded from nvmrc file
-    :param nvm_aliases: nvm aliases to version mapping
-    :param node_versions: node versions to bin folder mapping
+    :param nvm_aliases: nvm aliases to version mapping or their compiled graph
+    :param node_versions: node versions to bin folder mapping or their version index
     :return: version to use, if version is installed
     """
     resolved_version, resolved_alias, _ = resolve_alias(version_alias, nvm_aliases)
     version_to_install = resolved_version or resolved_alias or version_alias
     version_installed = match_version(
         version_alias=str(version_to_install),
-        version_set=set(node_versions.keys()),
+        version_set=node_versions,
     )
     return str(version_installed or version_to_install), bool(version_installed)
 
 
+def get_install_lock_path(version: str, node_versions_dir: str) -> str:
+    """
+    Get the lock file location guarding installs of a version into a node versions folder
+
+    :param version: release version number to install
+    :param node_versions_dir: the path of .nvm node installations
+    :return: path to the lock file in the cache folder
+    """
+    import zlib  # pylint: disable=import-outside-toplevel
+
+    versions_dir_hash = zlib.crc32(os.fsencode(os.path.realpath(node_versions_dir)))
+    lock_name = f"install-{versions_dir_hash:08x}-{version.replace(os.sep, '_')}.lock"
+    return os.path.join(environment.get_cache_dir(), "locks", lock_name)
+
+
+def get_install_target(version: str, nvm_sh_path: str) -> "Optional[str]":
+    """
+    Get the release installing the version unpacks, the latest matching release
+    of the mirror when set or the remote version nvm would install otherwise
+
+    :param version: version number or range to install
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :return: the release version number or None when no release matches
+    """
+    mirror = environment.get_mirror()
+    if mirror:
+        from nvshim.utils import installer  # pylint: disable=import-outside-toplevel
+
+        release = installer.get_mirror_release(mirror, version)
+        if not release:
+            message.print_version_not_in_mirror(version, mirror)
+        return release[0] if release else None
+
+    import contextlib  # pylint: disable=import-outside-toplevel
+
+    with contextlib.closing(
+        stream_nvm_cmd(nvm_sh_path, f"version-remote {version}")
+    ) as lines:
+        target = parse_version(next(lines, "").strip())
+    return str(target) if target else None
+
+
+def install_version(
+    *, version: str, node_versions_dir: str, nvm_sh_path: str
+) -> "Optional[semver.Version]":
+    """
+    Install the release the version resolves to, holding a lock on that release so
+    concurrent shims missing versions or ranges of the same release wait for a single
+    install and reuse it
+
+    :param version: version number or range to install
+    :param node_versions_dir: the path of .nvm node installations
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :return: installed release or None when not installed
+    """
+    from nvshim.utils import installer  # pylint: disable=import-outside-toplevel
+
+    target = get_install_target(version, nvm_sh_path)
+    if not target:
+        return None
+
+    def get_installed_version() -> "Optional[semver.Version]":
+        return match_version(
+            version_alias=str(target),
+            version_set=get_node_versions(node_versions_dir),
+        )
+
+    timeout = environment.get_install_lock_timeout(INSTALL_LOCK_TIMEOUT)
+    try:
+        with lock.file_lock(
+            get_install_lock_path(target, node_versions_dir), timeout
+        ) as wait_seconds:
+            installed_version = get_installed_version()
+            if installed_version:
+                message.print_waited_for_install(version, wait_seconds)
+            else:
+                mirror = environment.get_mirror()
+                if mirror:
+                    installer.install_from_mirror(mirror, target, node_versions_dir)
+                else:
+                    run_nvm_cmd(nvm_sh_path, f"install {target}")
+                installed_version = get_installed_version()
+    except TimeoutError:
+        message.print_install_lock_timeout(version, timeout)
+        installed_version = get_installed_version()
+    return installed_version
+
+
 def get_bin_path(
     *,
     version_alias: str,
@@ -379,7 +630,7 @@ def get_bin_path(
     bin_file: str,
     node_versions_dir: str,
     nvm_sh_path: str,
-):
+) -> str:
     """
     Get path of the node executable for the version/alias given
 
@@ -394,11 +645,12 @@ def get_bin_path(
     if not version_installed:
         installed_version = None
         if environment.is_version_auto_install_enabled():
-            run_nvm_cmd(nvm_sh_path, f"install {version}")
-            installed_version = match_version(
-                version_alias=version,
-                version_set=set(get_node_versions(node_versions_dir).keys()),
+            installed_version = install_version(
+                version=version,
+                node_versions_dir=node_versions_dir,
+                nvm_sh_path=nvm_sh_path,
             )
+            trace.mark("install")
         if not installed_version:
             message.print_version_not_installed(version_alias, version)
             sys.exit(ErrorCode.VERSION_NOT_INSTALLED)
@@ -413,11 +665,238 @@ def get_bin_path(
     return bin_path
 
 
+def get_resolution_cache_path() -> "Optional[str]":
+    """
+    Get the persistent resolution cache file location if caching is enabled
+
+    :return: path to the cache file or None when disabled
+    """
+    if not environment.is_resolution_cache_enabled():
+        return None
+    return cache.get_cache_path(environment.get_cache_dir())
+
+
+def get_resolution_dependencies(
+    nvm_dir: str, nvmrc_path: "Optional[str]", alias_chain: "Sequence[str]"
+) -> "List[str]":
+    """
+    Get the paths whose modification invalidates a cached resolution
+
+    :param nvm_dir: the path to .nvm installation
+    :param nvmrc_path: the location of the .nvmrc file used if any
+    :param alias_chain: the aliases traversed to resolve the version
+    :return: list of the .nvmrc, alias and node versions folders, and alias files used
+    """
+    nvm_aliases_dir = get_nvm_aliases_dir(nvm_dir)
+    uses_lts_alias = any(alias.startswith(LTS_ALIAS_PREFIX) for alias in alias_chain)
+    return [
+        *([nvmrc_path] if nvmrc_path else []),
+        nvm_aliases_dir,
+        *([os.path.join(nvm_aliases_dir, "lts")] if uses_lts_alias else []),
+        get_node_versions_dir(nvm_dir),
+        *(os.path.join(nvm_aliases_dir, alias) for alias in alias_chain),
+    ]
+
+
+def get_resolution(
+    *,
+    rc_version: str,
+    nvmrc_path: "Optional[str]",
+    nvm_dir: str,
+    cache_path: "Optional[str]",
+    cache_key: str,
+) -> "Tuple[str, bool, Optional[str], List[str]]":
+    """
+    Resolve the rc version using the persistent cache when it is still valid,
+    caching the result when the version is not installed
+
+    :param rc_version: version loaded from nvmrc file
+    :param nvmrc_path: the location of the .nvmrc file used if any
+    :param nvm_dir: the path to .nvm installation
+    :param cache_path: path to the cache file, None when caching is disabled
+    :param cache_key: key identifying the resolution
+    :return: version, if version is installed, cached executable path, cache dependencies
+    """
+    cached = cache.get_entry(cache_path, cache_key) if cache_path else None
+    trace.record(cache=("hit" if cached else "miss") if cache_path else "disabled")
+    trace.mark("cache")
+    if cached:
+        bin_path: "Optional[str]" = cached["bin_path"]  # type: ignore
+        dependencies: "List[str]" = cached["paths"]  # type: ignore
+        return (
+            str(cached["version"]),
+            bool(cached["version_installed"]),
+            bin_path,
+            dependencies,
+        )
+
+    nvm_snapshot = get_nvm_snapshot(nvm_dir)
+    nvm_aliases = AliasGraph(
+        get_nvm_alias_mapping(nvm_dir, nvm_snapshot["aliases"])  # type: ignore
+    )
+    trace.mark("aliases")
+    node_versions = VersionIndex.from_sorted(
+        semver.Version(*version) for version in nvm_snapshot["versions"]  # type: ignore
+    )
+    trace.mark("versions")
+    version, version_installed = resolve_version(
+        version_alias=rc_version,
+        nvm_aliases=nvm_aliases,
+        node_versions=node_versions,
+    )
+    alias_chain = resolve_alias(rc_version, nvm_aliases)[2]
+    trace.record(alias_chain=alias_chain)
+    trace.mark("resolve")
+    dependencies = get_resolution_dependencies(
+        nvm_dir, nvmrc_path, alias_chain or [rc_version]
+    )
+    if cache_path and not version_installed:
+        cache.set_entry(
+            cache_path,
+            cache_key,
+            dependencies,
+            version=version,
+            version_installed=False,
+            bin_path=None,
+        )
+    return version, version_installed, None, dependencies
+
+
+def resolve_bin_path(
+    exec_dir: str, bin_file: str, nvm_dir: str
+) -> "Tuple[str, str, str, Optional[str]]":
+    """
+    Resolve the node executable in process, using the persistent cache when enabled
+
+    :param exec_dir: the folder the executable is run from
+    :param bin_file: the node binary to find
+    :param nvm_dir: the path to .nvm installation
+    :return: executable path, version, .nvmrc version and path
+    """
+    nvmrc_path = get_nvmrc_path(exec_dir)
+    rc_version = get_nvmrc(nvmrc_path)
+    trace.mark("nvmrc")
+    cache_path = get_resolution_cache_path()
+    cache_key = cache.get_cache_key(exec_dir, nvmrc_path, bin_file, nvm_dir)
+    version, version_installed, cached_bin_path, dependencies = get_resolution(
+        rc_version=rc_version,
+        nvmrc_path=nvmrc_path,
+        nvm_dir=nvm_dir,
+        cache_path=cache_path,
+        cache_key=cache_key,
+    )
+    bin_path = cached_bin_path or get_bin_path(
+        version_alias=rc_version,
+        version=version,
+        version_installed=version_installed,
+        node_versions_dir=get_node_versions_dir(nvm_dir),
+        bin_file=bin_file,
+        nvm_sh_path=get_nvmsh_path(nvm_dir),
+    )
+    trace.mark("bin_path")
+    if cache_path and not cached_bin_path:
+        cache.set_entry(
+            cache_path,
+            cache_key,
+            dependencies,
+            version=version,
+            version_installed=True,
+            bin_path=bin_path,
+        )
+        trace.mark("cache")
+    return bin_path, version, rc_version, nvmrc_path
+
+
+def get_resolved_token(
+    bin_path: str, version: str, rc_version: str, nvmrc_path: "Optional[str]"
+) -> "Optional[str]":
+    """
+    Get the token passing a resolution down to nested shims,
+    only valid while the .nvmrc file used is unchanged
+
+    :param bin_path: the resolved executable path
+    :param version: the resolved version
+    :param rc_version: version loaded from nvmrc file
+    :param nvmrc_path: the location of the .nvmrc file used if any
+    :return: newline separated .nvmrc path and modification time, versions and bin folder,
+        None when no .nvmrc file was used
+    """
+    nvmrc_mtime = cache.get_stamp([nvmrc_path])[0] if nvmrc_path else None
+    if nvmrc_mtime is None:
+        return None
+    return RESOLVED_TOKEN_SEPARATOR.join(
+        (
+            str(nvmrc_path),
+            str(nvmrc_mtime),
+            version,
+            rc_version,
+            os.path.dirname(bin_path),
+        )
+    )
+
+
+def resolve_bin_path_from_token(
+    token: "Optional[str]", exec_dir: str, bin_file: str, nvm_dir: str
+) -> "Optional[Tuple[str, str, str, Optional[str]]]":
+    """
+    Reuse the resolution of a parent shim when the nearest .nvmrc file is the same
+    unchanged file and the executable is in the node versions folder of the nvm installation
+
+    :param token: resolution passed down by the parent shim
+    :param exec_dir: the folder the executable is run from
+    :param bin_file: the node binary to find
+    :param nvm_dir: the path to .nvm installation
+    :return: executable path, version, .nvmrc version and path or None when not valid
+    """
+    parts = token.split(RESOLVED_TOKEN_SEPARATOR) if token else []
+    if len(parts) != 5:
+        return None
+    nvmrc_path, nvmrc_mtime, version, rc_version, bin_dir = parts
+    bin_path = os.path.join(bin_dir, bin_file)
+    is_valid = (
+        client.is_node_bin_path(bin_path, nvm_dir)
+        and get_nvmrc_path(exec_dir) == nvmrc_path
+        and str(cache.get_stamp([nvmrc_path])[0]) == nvmrc_mtime
+        and os.path.isfile(bin_path)
+    )
+    if not is_valid:
+        return None
+    return bin_path, version, rc_version, nvmrc_path
+
+
+def get_launch_env(
+    bin_path: str, version: str, rc_version: str, nvmrc_path: "Optional[str]"
+) -> "EnvDict":
+    """
+    Get the environment to launch the executable in, with the resolution passed down
+    to nested shims and its bin folder first on the path when enabled
+
+    :param bin_path: the resolved executable path
+    :param version: the resolved version
+    :param rc_version: version loaded from nvmrc file
+    :param nvmrc_path: the location of the .nvmrc file used if any
+    :return: copy of os.environ with the launch changes
+    """
+    env = (
+        environment.get_node_bin_env(os.path.dirname(bin_path))
+        if environment.is_node_bin_first_enabled()
+        else {**os.environ}
+    )
+    token = get_resolved_token(bin_path, version, rc_version, nvmrc_path)
+    if token:
+        env[environment.EnvironmentVariable.RESOLVED.value] = token
+    else:
+        env.pop(environment.EnvironmentVariable.RESOLVED.value, None)
+    return env
+
+
 def parse_args(args: "Sequence[str]") -> "Tuple[argparse.Namespace, List[str]]":
     """
     Get the arguments to be used to execute the node binary
     :return: parsed and unknown arguments
     """
+    import argparse  # pylint: disable=import-outside-toplevel
+
     parser = argparse.ArgumentParser(
         description="Launch executable using project or default node version",
         add_help=False,
@@ -438,6 +917,19 @@ def parse_args(args: "Sequence[str]") -> "Tuple[argparse.Namespace, List[str]]":
     return parser.parse_known_args(args)
 
 
+def split_args(args: "Sequence[str]") -> "Tuple[str, List[str]]":
+    """
+    Get the node binary and the arguments to execute it with in the order given,
+    only parsing with argparse to show usage when no binary is given
+
+    :return: node binary name and its arguments
+    """
+    if not args or args[0].startswith("-"):
+        parsed_args, unknown_args = parse_args(args)
+        return parsed_args.bin_file, [*parsed_args.bin_args, *unknown_args]
+    return args[0], [*args[1:]]
+
+
 def get_nvm_dir() -> str:
     """
     Get nvm dir from environment or fail if the variable is not set
@@ -451,33 +943,51 @@ def get_nvm_dir() -> str:
         sys.exit(ErrorCode.ENV_NVM_DIR_MISSING)
 
 
-def main(version_number: str = __version__):
+def main(version_number: str = __version__, replace_process: bool = False):
     """
     Run the main shim logic
 
     :param version_number: the current nvshim version, defaults to __version__
+    :param replace_process: exec the node binary in place of this process, defaults to False
     """
+    trace.start(environment.get_trace_path())
     message.print_running_version(version_number)
-    parsed_args, unknown_args = parse_args(sys.argv[1:])
-    nvmrc_path = get_nvmrc_path(os.getcwd())
-    rc_version = get_nvmrc(nvmrc_path)
-    nvm_dir = get_nvm_dir()
-    node_versions_dir = get_node_versions_dir(nvm_dir)
-    version, version_installed = resolve_version(
-        version_alias=rc_version,
-        nvm_aliases=get_nvm_alias_mapping(nvm_dir),
-        node_versions=get_node_versions(node_versions_dir),
-    )
-    bin_path = get_bin_path(
-        version_alias=rc_version,
-        version=version,
-        version_installed=version_installed,
-        node_versions_dir=node_versions_dir,
-        bin_file=parsed_args.bin_file,
-        nvm_sh_path=get_nvmsh_path(nvm_dir),
-    )
-    message.print_using_version(rc_version, version, bin_path, nvmrc_path)
-    process.run(bin_path, *parsed_args.bin_args, *unknown_args)
+    try:
+        bin_file, bin_args = split_args(sys.argv[1:])
+        cwd = os.getcwd()
+        nvm_dir = get_nvm_dir()
+        resolution = resolve_bin_path_from_token(
+            environment.get_resolved_token(), cwd, bin_file, nvm_dir
+        )
+        trace.record(bin_file=bin_file, inherited=bool(resolution))
+        trace.mark("inherited")
+        if not resolution:
+            resolution = client.request_resolution(
+                environment.get_daemon_socket_path(), cwd, bin_file, nvm_dir
+            )
+            trace.record(daemon=bool(resolution))
+            trace.mark("daemon")
+        bin_path, version, rc_version, nvmrc_path = resolution or resolve_bin_path(
+            cwd, bin_file, nvm_dir
+        )
+        trace.record(
+            bin_path=bin_path,
+            version=version,
+            rc_version=rc_version,
+            nvmrc_path=nvmrc_path,
+        )
+        message.print_using_version(rc_version, version, bin_path, nvmrc_path)
+        env = get_launch_env(bin_path, version, rc_version, nvmrc_path)
+        if replace_process:
+            trace.flush()
+            process.exec_replace(bin_path, *bin_args, env=env)
+        process.run(bin_path, *bin_args, env=env)
+        trace.mark("launch")
+    except SystemExit as exit_e:
+        trace.record(exit_code=exit_e.code)
+        raise
+    finally:
+        trace.flush()
 
 
 if __name__ == "__main__":
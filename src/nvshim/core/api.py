@@ -0,0 +1,155 @@
+"""
+Resolve node executables from python without exiting the process, caching resolutions
+in memory until the files and folders they depend on are modified
+"""
+import os
+import threading
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import nvshim.core.__main__ as core
+from nvshim.core.resolver import (
+    Resolution,
+    Resolver,
+)
+from nvshim.utils import (
+    cache,
+    environment,
+)
+from nvshim.utils.constants import ErrorCode
+
+ResolutionKey = Tuple[str, str, str]
+CachedResolution = Tuple[List[str], "cache.CacheStamp", Resolution]
+
+
+class ResolutionError(Exception):
+    """Error for node executable that could not be resolved"""
+
+    error_code = ErrorCode.EXECUTABLE_NOT_FOUND
+
+
+class NvmDirMissingError(ResolutionError):
+    """Error for nvm folder that is not given or set in the environment"""
+
+    error_code = ErrorCode.ENV_NVM_DIR_MISSING
+
+
+class VersionNotInstalledError(ResolutionError):
+    """Error for resolved node version that is not installed"""
+
+    error_code = ErrorCode.VERSION_NOT_INSTALLED
+
+    def __init__(self, resolution: "Resolution"):
+        super().__init__(
+            f"Version {resolution.version} for {resolution.rc_version} is not installed"
+        )
+        self.resolution = resolution
+
+
+class ExecutableNotFoundError(ResolutionError):
+    """Error for executable missing from the installed node version"""
+
+    def __init__(self, resolution: "Resolution", bin_file: str):
+        super().__init__(f"No {bin_file} executable found in {resolution.version}")
+        self.resolution = resolution
+        self.bin_file = bin_file
+
+
+_resolvers: "Dict[str, Tuple[List[str], cache.CacheStamp, Resolver]]" = {}
+_resolutions: "Dict[ResolutionKey, CachedResolution]" = {}
+_resolve_lock = threading.Lock()
+
+
+def _get_resolver(nvm_dir: str) -> "Resolver":
+    """Get the resolver for the nvm folder, reloaded when any alias or version changes"""
+    paths = core.get_nvm_state_paths(nvm_dir)
+    stamp = cache.get_stamp(paths)
+    cached = _resolvers.get(nvm_dir)
+    if cached is None or cached[:2] != (paths, stamp):
+        cached = _resolvers[nvm_dir] = (paths, stamp, Resolver(nvm_dir))
+    return cached[2]
+
+
+def _get_dependencies(
+    nvm_dir: str, searched_dirs: "List[str]", resolution: "Resolution", bin_file: str
+) -> "List[str]":
+    """Get the paths whose modification invalidates the resolution"""
+    dependencies = core.get_resolution_dependencies(
+        nvm_dir,
+        resolution.nvmrc_path,
+        resolution.alias_chain or (resolution.rc_version,),
+    )
+    if resolution.version_installed:
+        dependencies.append(
+            os.path.join(
+                core.get_node_version_bin_dir(
+                    core.get_node_versions_dir(nvm_dir), resolution.version
+                ),
+                bin_file,
+            )
+        )
+    return [*searched_dirs, *dependencies]
+
+
+def _resolve(exec_dir: str, bin_file: str, nvm_dir: str) -> "Resolution":
+    """Resolve using the cached resolution while its dependencies are unchanged"""
+    key = (exec_dir, bin_file, nvm_dir)
+    cached = _resolutions.get(key)
+    if cached and cache.get_stamp(cached[0]) == cached[1]:
+        return cached[2]
+
+    with _resolve_lock:
+        return _resolve_uncached(key)
+
+
+def _resolve_uncached(key: "ResolutionKey") -> "Resolution":
+    """Resolve sharing the resolver of the nvm folder, caching the resolution"""
+    exec_dir, bin_file, nvm_dir = key
+    resolver = _get_resolver(nvm_dir)
+    resolver.invalidate_nvmrc()
+    searched_dirs: "List[str]" = []
+    resolver.on_nvmrc_lookup = searched_dirs.extend
+    try:
+        resolution = resolver.resolve(exec_dir, bin_file)
+    finally:
+        resolver.on_nvmrc_lookup = None
+    dependencies = _get_dependencies(nvm_dir, searched_dirs, resolution, bin_file)
+    _resolutions[key] = (dependencies, cache.get_stamp(dependencies), resolution)
+    return resolution
+
+
+def resolve(
+    cwd: str, bin_file: str = "node", nvm_dir: "Optional[str]" = None
+) -> "Resolution":
+    """
+    Resolve the node executable to run in a folder without installing missing versions,
+    repeat calls only check the modification times of the files and folders used.
+    Safe to call from multiple threads.
+
+    :param cwd: the folder the executable would be run from
+    :param bin_file: the node binary to find, defaults to node
+    :param nvm_dir: the path to .nvm installation, defaults to $NVM_DIR
+    :return: resolution with the .nvmrc file and version, alias chain and executable path
+    :raises NvmDirMissingError: when no nvm folder is given or set in the environment
+    :raises VersionNotInstalledError: when the resolved version is not installed
+    :raises ExecutableNotFoundError: when the version has no such executable
+    """
+    nvm_dir = nvm_dir or os.environ.get(environment.EnvironmentVariable.NVM_DIR.value)
+    if not nvm_dir:
+        raise NvmDirMissingError("NVM_DIR is not set")
+    resolution = _resolve(os.path.abspath(cwd), bin_file, nvm_dir)
+    if not resolution.version_installed:
+        raise VersionNotInstalledError(resolution)
+    if not resolution.bin_path:
+        raise ExecutableNotFoundError(resolution, bin_file)
+    return resolution
+
+
+def cache_clear():
+    """Forget all cached resolutions"""
+    _resolvers.clear()
+    _resolutions.clear()
@@ -0,0 +1,156 @@
+"""Command line interface for managing nvshim"""
+import argparse
+import os
+import sys
+from typing import (
+    List,
+    Optional,
+)
+
+import nvshim.core.__main__ as core
+from nvshim import __version__
+from nvshim.core.shell import (
+    SHELLS,
+    get_default_shell,
+)
+from nvshim.utils import (
+    environment,
+    message,
+)
+from nvshim.utils.constants import ErrorCode
+
+
+def run_daemon(args: "argparse.Namespace"):
+    """Run the resolver daemon in the foreground"""
+    from nvshim.core import daemon  # pylint: disable=import-outside-toplevel
+
+    daemon.serve(args.socket, core.get_nvm_dir())
+
+
+def run_env(args: "argparse.Namespace"):
+    """Print the shell commands that put the node bin folder for the current folder on the path"""
+    import contextlib  # pylint: disable=import-outside-toplevel
+
+    from nvshim.core import shell  # pylint: disable=import-outside-toplevel
+
+    with contextlib.redirect_stdout(sys.stderr):
+        changes = shell.get_env_changes(os.getcwd(), core.get_nvm_dir(), {**os.environ})
+    print(shell.format_env_changes(args.shell, changes))
+
+
+def run_hook(args: "argparse.Namespace"):
+    """Print the shell hook that updates the path when the .nvmrc file changes"""
+    from nvshim.core import shell  # pylint: disable=import-outside-toplevel
+
+    print(shell.get_hook(args.shell), end="")
+
+
+def run_resolve(args: "argparse.Namespace"):
+    """
+    Print the node executable resolved for each folder as a json line,
+    sharing the nvm state and .nvmrc lookups across all folders
+    """
+    # pylint: disable=import-outside-toplevel
+    import json
+
+    from nvshim.core.resolver import Resolver
+
+    resolver = Resolver(core.get_nvm_dir())
+    exec_dirs = args.dirs or (line.rstrip("\n") for line in sys.stdin)
+    for exec_dir in exec_dirs:
+        if not exec_dir:
+            continue
+        resolution = resolver.resolve(os.path.abspath(exec_dir), args.bin)
+        resolved = {
+            "dir": exec_dir,
+            "nvmrc_path": resolution.nvmrc_path,
+            "rc_version": resolution.rc_version,
+            "alias_chain": resolution.alias_chain,
+            "version": resolution.version,
+            "installed": resolution.version_installed,
+            "bin_path": resolution.bin_path,
+        }
+        print(json.dumps(resolved), flush=True)
+
+
+def run_sync(args: "argparse.Namespace"):
+    """Install the node versions used by all version files in a folder"""
+    from nvshim.core import sync  # pylint: disable=import-outside-toplevel
+
+    summary = sync.sync(args.root, core.get_nvm_dir(), max_workers=args.jobs)
+    message.print_sync_summary(summary)
+    if summary.failed:
+        sys.exit(ErrorCode.VERSION_NOT_INSTALLED)
+
+
+def get_parser() -> "argparse.ArgumentParser":
+    """Get the parser for all nvshim commands"""
+    parser = argparse.ArgumentParser(prog="nvshim")
+    parser.add_argument("--version", action="version", version=__version__)
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    daemon_parser = commands.add_parser(
+        "daemon", help="serve node executable resolutions to shims"
+    )
+    daemon_parser.add_argument(
+        "--socket",
+        default=environment.get_daemon_socket_path(),
+        help="unix socket to listen on, defaults to $NVSHIM_DAEMON_SOCKET",
+    )
+    daemon_parser.set_defaults(func=run_daemon)
+
+    for name, func, help_text in (
+        ("env", run_env, "print shell commands putting node for this folder on path"),
+        ("hook", run_hook, "print shell hook running env when the .nvmrc changes"),
+    ):
+        shell_parser = commands.add_parser(name, help=help_text)
+        shell_parser.add_argument(
+            "--shell",
+            choices=SHELLS,
+            default=get_default_shell(),
+            help="shell to print commands for, defaults to $SHELL",
+        )
+        shell_parser.set_defaults(func=func)
+
+    resolve_parser = commands.add_parser(
+        "resolve", help="print the node executable used in each folder as json lines"
+    )
+    resolve_parser.add_argument(
+        "dirs",
+        nargs="*",
+        help="folders to resolve, read one per line from stdin if none",
+    )
+    resolve_parser.add_argument(
+        "--bin", default="node", help="executable to resolve, defaults to node"
+    )
+    resolve_parser.set_defaults(func=run_resolve)
+
+    sync_parser = commands.add_parser(
+        "sync", help="install node versions used by all version files in a folder"
+    )
+    sync_parser.add_argument(
+        "root", nargs="?", default=".", help="folder to search, defaults to current"
+    )
+    sync_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="maximum concurrent installs, defaults to the number of processors",
+    )
+    sync_parser.set_defaults(func=run_sync)
+    return parser
+
+
+def main(args: "Optional[List[str]]" = None):
+    """
+    Run nvshim command
+
+    :param args: command line arguments, defaults to sys.argv
+    """
+    parsed_args = get_parser().parse_args(sys.argv[1:] if args is None else args)
+    parsed_args.func(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
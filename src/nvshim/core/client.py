@@ -0,0 +1,90 @@
+"""Resolver daemon client used by shims to skip resolving executables in process"""
+import os
+from typing import TYPE_CHECKING
+
+from nvshim.utils.environment import EnvironmentVariable
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Optional,
+        Tuple,
+    )
+
+REQUEST_SEPARATOR = "\0"
+REQUEST_TIMEOUT = 1.0
+
+RESOLUTION_SETTINGS = (
+    EnvironmentVariable.AUTO_INSTALL,
+    EnvironmentVariable.CACHE,
+    EnvironmentVariable.MIRROR,
+    EnvironmentVariable.NVM_FALLBACK,
+    EnvironmentVariable.VERSION_FILES,
+)
+
+
+def get_resolution_settings() -> "Tuple[str, ...]":
+    """
+    Get the environment settings that change how executables are resolved
+
+    :return: values of the settings in order, empty when not set
+    """
+    return tuple(os.environ.get(setting.value, "") for setting in RESOLUTION_SETTINGS)
+
+
+def is_node_bin_path(bin_path: str, nvm_dir: str) -> bool:
+    """
+    Check the executable is in the bin folder of a node version installed by nvm
+
+    :param bin_path: the executable path
+    :param nvm_dir: the path to .nvm installation
+    :return: if the path is in $NVM_DIR/versions/node/<version>/bin
+    """
+    bin_dir = os.path.dirname(os.path.normpath(bin_path))
+    return os.path.basename(bin_dir) == "bin" and os.path.dirname(
+        os.path.dirname(bin_dir)
+    ) == os.path.join(os.path.normpath(nvm_dir), "versions", "node")
+
+
+def request_resolution(
+    socket_path: str, exec_dir: str, bin_file: str, nvm_dir: str
+) -> "Optional[Tuple[str, str, str, Optional[str]]]":
+    """
+    Request the executable resolution from the resolver daemon if it is running
+
+    :param socket_path: path of the unix socket the daemon listens on
+    :param exec_dir: the folder the executable is run from
+    :param bin_file: the node binary to find
+    :param nvm_dir: the path to .nvm installation
+    :return: executable path, version, .nvmrc version and path, None when unavailable,
+        the daemon was started with other resolution settings
+        or the executable is not in the node versions folder of the nvm installation
+    """
+    if not os.path.exists(socket_path):
+        return None
+
+    import socket  # pylint: disable=import-outside-toplevel
+
+    request = REQUEST_SEPARATOR.join(
+        (exec_dir, bin_file, nvm_dir, *get_resolution_settings())
+    )
+    response = b""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(REQUEST_TIMEOUT)
+            connection.connect(socket_path)
+            connection.sendall(os.fsencode(request) + b"\n")
+            while not response.endswith(b"\n"):
+                chunk = connection.recv(4096)
+                if not chunk:
+                    break
+                response += chunk
+    except OSError:
+        return None
+
+    fields = os.fsdecode(response[:-1]).split(REQUEST_SEPARATOR)
+    if len(fields) != 4 or not fields[0]:
+        return None
+    bin_path, version, rc_version, nvmrc_path = fields
+    if not is_node_bin_path(bin_path, nvm_dir):
+        return None
+    return bin_path, version, rc_version, nvmrc_path or None
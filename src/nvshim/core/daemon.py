@@ -0,0 +1,309 @@
+"""Resolver daemon serving node executable resolutions to shims over a unix socket"""
+import ctypes
+import ctypes.util
+import os
+import select
+import socket
+import struct
+import threading
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from nvshim.core.client import (
+    REQUEST_SEPARATOR,
+    REQUEST_TIMEOUT,
+    get_resolution_settings,
+)
+from nvshim.core.resolver import Resolver
+from nvshim.utils import (
+    message,
+    unix_socket,
+)
+from nvshim.utils.constants import VERSION_FILES
+
+REQUEST_MAX_SIZE = 65536
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DIR_CHANGES = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+IN_EVENT_HEADER = struct.Struct("iIII")
+
+WATCH_ALIASES = "aliases"
+WATCH_NVM_DIR = "nvm_dir"
+WATCH_NVMRC = "nvmrc"
+WATCH_VERSIONS = "versions"
+
+WatchEvent = Tuple[str, int, str]
+
+
+class InotifyWatcher:
+    """Watch folders for changes using the linux inotify api"""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.file_descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.file_descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: "Dict[int, str]" = {}
+        self._watched_paths: "Dict[str, int]" = {}
+
+    def add(self, path: str, kind: str) -> bool:
+        """
+        Watch a folder for changes to files in it and to the folder itself
+
+        :param path: folder to watch
+        :param kind: the kind of watch reported with events from this folder
+        :return: if the folder is being watched
+        """
+        if path in self._watched_paths:
+            return True
+        watch_descriptor = self._add_watch(
+            self.file_descriptor, os.fsencode(path), IN_DIR_CHANGES
+        )
+        if watch_descriptor < 0:
+            return False
+        self._watches[watch_descriptor] = kind
+        self._watched_paths[path] = watch_descriptor
+        return True
+
+    def clear(self, kind: str):
+        """
+        Forget watched folders of a kind so they can be watched again
+
+        :param kind: the kind of watch to forget
+        """
+        for path, watch_descriptor in [*self._watched_paths.items()]:
+            if self._watches.get(watch_descriptor) == kind:
+                del self._watched_paths[path]
+
+    def read(self) -> "Iterator[WatchEvent]":
+        """
+        Generate pending events without blocking
+
+        :return: events as (kind of watch, event mask, file name)
+        """
+        while True:
+            try:
+                data = os.read(self.file_descriptor, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                watch_descriptor, mask, _, name_size = IN_EVENT_HEADER.unpack_from(
+                    data, offset
+                )
+                offset += IN_EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + name_size].rstrip(b"\0"))
+                offset += name_size
+                if mask & IN_IGNORED:
+                    for path, descriptor in [*self._watched_paths.items()]:
+                        if descriptor == watch_descriptor:
+                            del self._watched_paths[path]
+                kind = self._watches.get(watch_descriptor, WATCH_NVM_DIR)
+                yield kind, mask, name
+
+    def close(self):
+        """Stop watching all folders"""
+        os.close(self.file_descriptor)
+
+
+def get_watcher() -> "Optional[InotifyWatcher]":
+    """
+    Get folder watcher if supported by the system
+
+    :return: inotify watcher or None when not available
+    """
+    try:
+        return InotifyWatcher()
+    except (AttributeError, OSError, TypeError):
+        return None
+
+
+class ResolverDaemon:
+    """
+    Serve resolutions to shims from a resolver kept in memory, only to shims with the
+    same resolution settings, invalidating it when watched nvm folders or .nvmrc files change
+    """
+
+    def __init__(self, socket_path: str, nvm_dir: str):
+        """
+        :param socket_path: path of the unix socket to listen on
+        :param nvm_dir: the path to .nvm installation
+        """
+        self.socket_path = socket_path
+        self.settings = get_resolution_settings()
+        self.watcher = get_watcher()
+        self.resolver = Resolver(nvm_dir, on_nvmrc_lookup=self._watch_nvmrc_dirs)
+        self._running = False
+        self._lock = threading.Lock()
+        self._server = unix_socket.listen(socket_path)
+        self._watch_nvm_dirs()
+
+    @property
+    def nvm_dir(self) -> str:
+        """The path to .nvm installation resolved from"""
+        return self.resolver.nvm_dir
+
+    def _watch_nvm_dirs(self):
+        if not self.watcher:
+            return
+        self.watcher.add(self.nvm_dir, WATCH_NVM_DIR)
+        self.watcher.add(os.path.join(self.nvm_dir, "versions"), WATCH_NVM_DIR)
+        self.watcher.add(self.resolver.node_versions_dir, WATCH_VERSIONS)
+        aliases_dir = os.path.join(self.nvm_dir, "alias")
+        for root, _, _ in os.walk(aliases_dir):
+            self.watcher.add(root, WATCH_ALIASES)
+
+    def _watch_nvmrc_dirs(self, searched_dirs: "List[str]"):
+        if not self.watcher:
+            return
+        for searched_dir in searched_dirs:
+            if not self.watcher.add(searched_dir, WATCH_NVMRC):
+                self.resolver.invalidate_nvmrc()
+
+    def process_events(self):
+        """Invalidate the resolver state affected by pending folder changes"""
+        if not self.watcher:
+            self.resolver.invalidate()
+            return
+        for kind, mask, name in self.watcher.read():
+            if mask & IN_Q_OVERFLOW or kind == WATCH_NVM_DIR:
+                self.resolver.invalidate()
+                self.watcher.clear(WATCH_ALIASES)
+                self.watcher.clear(WATCH_VERSIONS)
+                self._watch_nvm_dirs()
+            elif kind == WATCH_ALIASES:
+                self.resolver.invalidate_aliases()
+                self._watch_nvm_dirs()
+            elif kind == WATCH_VERSIONS:
+                self.resolver.invalidate_versions()
+            elif name in VERSION_FILES or mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self.resolver.invalidate_nvmrc()
+
+    def _get_response(self, exec_dir: str, bin_file: str) -> str:
+        with self._lock:
+            try:
+                self.process_events()
+                resolution = self.resolver.resolve(exec_dir, bin_file)
+            except (OSError, ValueError):
+                self.resolver.invalidate()
+                return ""
+        if not resolution.bin_path:
+            return ""
+        return REQUEST_SEPARATOR.join(
+            (
+                resolution.bin_path,
+                resolution.version,
+                resolution.rc_version,
+                resolution.nvmrc_path or "",
+            )
+        )
+
+    def handle(self, connection: "socket.socket"):
+        """
+        Respond to a shim request of "cwd\\0bin_file\\0nvm_dir\\0settings...\\n" with
+        "bin_path\\0version\\0rc_version\\0nvmrc_path\\n" or an empty line
+        when the shim should resolve the executable itself,
+        which it does when its nvm folder or resolution settings differ from the daemon
+
+        :param connection: accepted shim connection
+        """
+        connection.settimeout(REQUEST_TIMEOUT)
+        request = b""
+        while not request.endswith(b"\n") and len(request) < REQUEST_MAX_SIZE:
+            chunk = connection.recv(4096)
+            if not chunk:
+                break
+            request += chunk
+        fields = os.fsdecode(request[:-1]).split(REQUEST_SEPARATOR)
+        response = ""
+        if fields[2:] == [self.nvm_dir, *self.settings]:
+            response = self._get_response(fields[0], fields[1])
+        connection.sendall(os.fsencode(response) + b"\n")
+
+    def serve_forever(self, poll_interval: float = 0.5):
+        """
+        Handle shim requests concurrently until shutdown
+
+        :param poll_interval: seconds between checks for shutdown
+        """
+        self._running = True
+        readers = [self._server] + (
+            [self.watcher.file_descriptor] if self.watcher else []
+        )
+        try:
+            while self._running:
+                readable, _, _ = select.select(readers, [], [], poll_interval)
+                if self.watcher and self.watcher.file_descriptor in readable:
+                    with self._lock:
+                        self.process_events()
+                if self._server in readable:
+                    connection, _ = self._server.accept()
+                    threading.Thread(
+                        target=self._serve_connection, args=(connection,), daemon=True
+                    ).start()
+        finally:
+            self.close()
+
+    def _serve_connection(self, connection: "socket.socket"):
+        with connection:
+            try:
+                self.handle(connection)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        """Stop serving requests"""
+        self._running = False
+
+    def close(self):
+        """Stop listening and remove the socket file"""
+        unix_socket.close(self._server, self.socket_path)
+        if self.watcher:
+            with self._lock:
+                self.watcher.close()
+
+
+def serve(socket_path: str, nvm_dir: str):
+    """
+    Run the resolver daemon until interrupted
+
+    :param socket_path: path of the unix socket to listen on
+    :param nvm_dir: the path to .nvm installation
+    """
+    daemon = ResolverDaemon(socket_path, nvm_dir)
+    if not daemon.watcher:
+        message.print_daemon_watcher_unavailable()
+    message.print_daemon_listening(socket_path, nvm_dir)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt as interrupt_e:
+        message.print_process_interrupted(interrupt_e)
@@ -0,0 +1,478 @@
+"""
+Persistent bash sessions with nvm.sh already sourced, serving nvm commands sent over
+a unix socket so back to back commands do not each pay for loading nvm
+"""
+import hashlib
+import os
+import secrets
+import select
+import shlex
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import (
+    BinaryIO,
+    List,
+    Optional,
+)
+
+from nvshim.utils import (
+    environment,
+    lock,
+    message,
+    process,
+    unix_socket,
+)
+from nvshim.utils.constants import ErrorCode
+
+REQUEST_SEPARATOR = "\0"
+REQUEST_MAX_SIZE = 65536
+START_TIMEOUT = 5.0
+SESSION_ENV_IGNORED = frozenset({"_", "OLDPWD", "PWD", "SHLVL"})
+
+FRAME_HEADER = struct.Struct(">cI")
+FRAME_STDOUT = b"o"
+FRAME_STDERR = b"e"
+FRAME_EXIT = b"x"
+
+
+def get_socket_path(
+    nvm_sh_path: str, env: "Optional[environment.EnvDict]" = None
+) -> str:
+    """
+    Get the unix socket of the session serving the nvm installation in the environment,
+    sessions run commands in the environment they were started in so callers with
+    a different environment get a different session
+
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :param env: environment commands are run in, defaults to os.environ
+    :return: socket path in the cache folder unique to the nvm installation and environment
+    """
+    env_vars = os.environ if env is None else env
+    digest = hashlib.sha1(os.fsencode(os.path.abspath(nvm_sh_path)))
+    for name in sorted(set(env_vars) - SESSION_ENV_IGNORED):
+        digest.update(os.fsencode(f"\0{name}={env_vars[name]}"))
+    return os.path.join(
+        environment.get_cache_dir(), f"nvm-{digest.hexdigest()[:16]}.sock"
+    )
+
+
+def _send_frame(connection: "socket.socket", kind: bytes, payload: bytes):
+    connection.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv_exact(connection: "socket.socket", size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("nvm session closed the connection")
+        data += chunk
+    return data
+
+
+class _MarkedOutput:
+    """Coprocess output split into command output and the values printed after markers"""
+
+    def __init__(self, file_descriptor: int, kind: bytes, marker: bytes, markers: int):
+        """
+        :param file_descriptor: coprocess output to read
+        :param kind: frame kind the command output is relayed as
+        :param marker: marker the values are printed after
+        :param markers: number of marker lines ending the command output
+        """
+        self.file_descriptor = file_descriptor
+        self.kind = kind
+        self.values: "List[bytes]" = []
+        self._marker = marker
+        self._markers = markers
+        self._pending = b""
+
+    @property
+    def done(self) -> bool:
+        """If all marker lines have been read"""
+        return len(self.values) >= self._markers
+
+    def feed(self, chunk: bytes) -> bytes:
+        """
+        Record the marker values completed by the chunk read
+
+        :param chunk: bytes read from the coprocess
+        :return: command output that can be relayed
+        """
+        buffer = self._pending + chunk
+        output = b""
+        while not self.done:
+            index = buffer.find(self._marker)
+            line_end = buffer.find(b"\n", index) if index >= 0 else -1
+            if line_end < 0:
+                break
+            output += buffer[:index]
+            self.values.append(buffer[index + len(self._marker) : line_end])
+            buffer = buffer[line_end + 1 :]
+        relayed = len(buffer)
+        if not self.done:
+            relayed = buffer.find(self._marker)
+            if relayed < 0:
+                relayed = len(buffer) - self._get_marker_start_size(buffer)
+        self._pending = buffer[relayed:]
+        return output + buffer[:relayed]
+
+    def _get_marker_start_size(self, buffer: bytes) -> int:
+        """Get the size of the buffer end that could be the start of a marker"""
+        for size in range(min(len(buffer), len(self._marker) - 1), 0, -1):
+            if buffer.endswith(self._marker[:size]):
+                return size
+        return 0
+
+
+class NvmBash:
+    """
+    Bash coprocess that sources nvm.sh once and runs nvm commands one at a time,
+    each as a job in a subshell so commands like nvm use do not leak into the next one
+    """
+
+    def __init__(self, nvm_sh_path: str):
+        """
+        :param nvm_sh_path: path to .nvm/nvm.sh file
+        """
+        self.marker = secrets.token_hex(16).encode()
+        self._stopped = False
+        self._bash = subprocess.Popen(  # pylint: disable=consider-using-with
+            ("bash", "-s"),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._write(f"source {shlex.quote(nvm_sh_path)} &> /dev/null\nset -m\n")
+
+    @property
+    def alive(self) -> bool:
+        """If the coprocess can run more commands"""
+        return not self._stopped and self._bash.poll() is None
+
+    def _write(self, script: str):
+        stdin: "BinaryIO" = self._bash.stdin  # type: ignore
+        stdin.write(script.encode())
+        stdin.flush()
+
+    def _stop_job(self, job_values: "List[bytes]"):
+        """Stop the command process group once its id is known, not reusing the coprocess"""
+        if self._stopped or not job_values:
+            return
+        self._stopped = True
+        try:
+            os.killpg(int(job_values[0]), signal.SIGTERM)
+        except OSError:
+            pass
+
+    def run(self, cwd: str, nvm_args: str, connection: "socket.socket") -> int:
+        """
+        Run nvm command relaying its output to the connection as frames,
+        stopping the command when the connection is closed before it ends
+
+        :param cwd: folder to run the command in
+        :param nvm_args: arguments to pass to loaded nvm command
+        :param connection: client connection to relay output to
+        :return: command exit code
+        """
+        marker = self.marker.decode()
+        self._write(
+            f"(cd {shlex.quote(cwd)} && nvm {nvm_args}\n) < /dev/null &\n"
+            f"printf '%s%d\\n' {marker} $!\n"
+            "wait $!\n"
+            f"printf '%s%d\\n' {marker} $?\n"
+            f"printf '%s\\n' {marker} >&2\n"
+        )
+        stdout, stderr = (
+            _MarkedOutput(stream.fileno(), kind, self.marker, markers)  # type: ignore
+            for stream, kind, markers in (
+                (self._bash.stdout, FRAME_STDOUT, 2),
+                (self._bash.stderr, FRAME_STDERR, 1),
+            )
+        )
+        connected = True
+        while not (stdout.done and stderr.done):
+            readers: "List[object]" = [
+                output.file_descriptor for output in (stdout, stderr) if not output.done
+            ]
+            readable, _, _ = select.select(
+                readers + [connection] if connected else readers, [], []
+            )
+            connected = connected and connection not in readable
+            for output in (stdout, stderr):
+                if output.file_descriptor not in readable:
+                    continue
+                chunk = os.read(output.file_descriptor, REQUEST_MAX_SIZE)
+                if not chunk:
+                    self._stopped = True
+                    return 1
+                relayed = output.feed(chunk)
+                if connected and relayed:
+                    try:
+                        _send_frame(connection, output.kind, relayed)
+                    except OSError:
+                        connected = False
+            if not connected:
+                self._stop_job(stdout.values)
+        return int(stdout.values[1])
+
+    def close(self):
+        """Stop the coprocess"""
+        if self._bash.poll() is None:
+            self._bash.kill()
+        self._bash.wait()
+        for stream in (self._bash.stdin, self._bash.stdout, self._bash.stderr):
+            if stream:
+                stream.close()
+
+
+class NvmBashPool:
+    """Nvm bash coprocesses reused between commands, started when none is free"""
+
+    def __init__(self, nvm_sh_path: str):
+        """
+        :param nvm_sh_path: path to .nvm/nvm.sh file
+        """
+        self.nvm_sh_path = nvm_sh_path
+        self._free = [NvmBash(nvm_sh_path)]
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._released_at = time.monotonic()
+
+    def acquire(self) -> "NvmBash":
+        """Take a free coprocess or start one"""
+        with self._lock:
+            self._in_use += 1
+            while self._free:
+                session = self._free.pop()
+                if session.alive:
+                    return session
+                session.close()
+        return NvmBash(self.nvm_sh_path)
+
+    def release(self, session: "NvmBash"):
+        """Free the coprocess for the next command, stopping it if it cannot be reused"""
+        if not session.alive:
+            session.close()
+        with self._lock:
+            if session.alive:
+                self._free.append(session)
+            self._in_use -= 1
+            self._released_at = time.monotonic()
+
+    def get_idle_time(self) -> float:
+        """Seconds since the last coprocess was freed, zero while any is in use"""
+        with self._lock:
+            return 0.0 if self._in_use else time.monotonic() - self._released_at
+
+    def close(self):
+        """Stop the free coprocesses"""
+        with self._lock:
+            for session in self._free:
+                session.close()
+            self._free.clear()
+
+
+class NvmSessionServer:
+    """Serve nvm commands concurrently from a pool of nvm bash coprocesses until idle"""
+
+    def __init__(self, socket_path: str, nvm_sh_path: str, idle_timeout: float):
+        """
+        :param socket_path: path of the unix socket to listen on
+        :param nvm_sh_path: path to .nvm/nvm.sh file
+        :param idle_timeout: seconds without commands to stop serving after
+        """
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._pool = NvmBashPool(nvm_sh_path)
+        self._running = False
+        self._server = unix_socket.listen(socket_path)
+
+    @staticmethod
+    def handle(connection: "socket.socket", session: "NvmBash") -> "Optional[int]":
+        """
+        Run the client request of "cwd\\0nvm_args\\n" relaying the command output
+        as frames
+
+        :param connection: accepted client connection
+        :param session: coprocess to run the command in
+        :return: command exit code, None when the request is empty
+        """
+        request = b""
+        while not request.endswith(b"\n") and len(request) < REQUEST_MAX_SIZE:
+            chunk = connection.recv(4096)
+            if not chunk:
+                return None
+            request += chunk
+        cwd, nvm_args = os.fsdecode(request[:-1]).split(REQUEST_SEPARATOR)
+        return session.run(cwd, nvm_args, connection)
+
+    def _serve_connection(self, connection: "socket.socket", session: "NvmBash"):
+        """Serve the request freeing the coprocess before ending with the exit code"""
+        with connection:
+            try:
+                exit_code = self.handle(connection, session)
+            except (OSError, ValueError):
+                exit_code = None
+            finally:
+                self._pool.release(session)
+            if exit_code is None:
+                return
+            try:
+                _send_frame(connection, FRAME_EXIT, str(exit_code).encode())
+            except OSError:
+                pass
+
+    def serve_forever(self, poll_interval: float = 0.5):
+        """
+        Handle client requests concurrently until idle or shutdown
+
+        :param poll_interval: seconds between checks for idle or shutdown
+        """
+        self._running = True
+        try:
+            while self._running and self._pool.get_idle_time() < self.idle_timeout:
+                readable, _, _ = select.select([self._server], [], [], poll_interval)
+                if not readable:
+                    continue
+                connection, _ = self._server.accept()
+                threading.Thread(
+                    target=self._serve_connection,
+                    args=(connection, self._pool.acquire()),
+                    daemon=True,
+                ).start()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """Stop serving requests"""
+        self._running = False
+
+    def close(self):
+        """Stop listening, remove the socket file and stop free coprocesses"""
+        unix_socket.close(self._server, self.socket_path)
+        self._pool.close()
+
+
+def request_nvm_cmd(
+    socket_path: str, cwd: str, nvm_args: str, stdout: "BinaryIO", stderr: "BinaryIO"
+) -> "Optional[int]":
+    """
+    Run nvm command in the session listening on the socket
+
+    :param socket_path: path of the unix socket the session listens on
+    :param cwd: folder to run the command in
+    :param nvm_args: arguments to pass to loaded nvm command
+    :param stdout: where to write the command output
+    :param stderr: where to write the command errors
+    :return: command exit code, None when no session is listening
+    """
+    if not os.path.exists(socket_path):
+        return None
+    outputs = {FRAME_STDOUT: stdout, FRAME_STDERR: stderr}
+    relayed = False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socket_path)
+            request = REQUEST_SEPARATOR.join((cwd, nvm_args))
+            connection.sendall(os.fsencode(request) + b"\n")
+            while True:
+                kind, size = FRAME_HEADER.unpack(
+                    _recv_exact(connection, FRAME_HEADER.size)
+                )
+                payload = _recv_exact(connection, size)
+                relayed = True
+                if kind == FRAME_EXIT:
+                    return int(payload)
+                outputs[kind].write(payload)
+                outputs[kind].flush()
+    except OSError:
+        return 1 if relayed else None
+
+
+def start(socket_path: str, nvm_sh_path: str, idle_timeout: float):
+    """
+    Start a session in the background unless one is already listening,
+    waiting for it to listen on the socket
+
+    :param socket_path: path of the unix socket to listen on
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :param idle_timeout: seconds without commands to stop the session after
+    """
+    try:
+        with lock.file_lock(f"{socket_path}.lock", START_TIMEOUT):
+            if _is_listening(socket_path):
+                return
+            process.spawn(
+                sys.executable,
+                "-m",
+                __name__,
+                socket_path,
+                nvm_sh_path,
+                str(idle_timeout),
+            )
+            started = time.monotonic()
+            while time.monotonic() - started < START_TIMEOUT:
+                if _is_listening(socket_path):
+                    return
+                time.sleep(lock.LOCK_POLL_INTERVAL)
+    except TimeoutError:
+        pass
+
+
+def _is_listening(socket_path: str) -> bool:
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socket_path)
+    except OSError:
+        return False
+    return True
+
+
+def run_nvm_cmd(
+    nvm_sh_path: str, nvm_args: str, idle_timeout: float
+) -> "Optional[int]":
+    """
+    Run nvm command in the current folder using the session of the nvm installation
+    started in the same environment, starting one in the background when none is listening
+
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :param nvm_args: arguments to pass to loaded nvm command
+    :param idle_timeout: seconds without commands to stop a started session after
+    :return: command exit code, None when no session could be used
+    """
+    socket_path = get_socket_path(nvm_sh_path)
+    request = (socket_path, os.getcwd(), nvm_args, sys.stdout.buffer, sys.stderr.buffer)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        exit_code = request_nvm_cmd(*request)
+        if exit_code is None:
+            start(socket_path, nvm_sh_path, idle_timeout)
+            exit_code = request_nvm_cmd(*request)
+    except KeyboardInterrupt as interrupt_e:
+        message.print_process_interrupted(interrupt_e)
+        sys.exit(ErrorCode.KEYBOARD_INTERRUPT)
+    return exit_code
+
+
+def serve(socket_path: str, nvm_sh_path: str, idle_timeout: float):
+    """
+    Run the nvm session until idle
+
+    :param socket_path: path of the unix socket to listen on
+    :param nvm_sh_path: path to .nvm/nvm.sh file
+    :param idle_timeout: seconds without commands to stop serving after
+    """
+    NvmSessionServer(socket_path, nvm_sh_path, idle_timeout).serve_forever()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], sys.argv[2], float(sys.argv[3]))
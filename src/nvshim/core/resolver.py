@@ -0,0 +1,180 @@
+"""Resolve node executables reusing parsed nvm state across resolutions"""
+import os
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import nvshim.core.__main__ as core
+from nvshim.utils import (
+    environment,
+    version_file,
+)
+from nvshim.utils.alias_graph import AliasGraph
+from nvshim.utils.constants import DEFAULT_VERSION_FILES
+from nvshim.utils.version_index import VersionIndex
+
+
+class Resolution(NamedTuple):
+    """Result of resolving the node executable to use for a folder"""
+
+    nvmrc_path: "Optional[str]"
+    rc_version: str
+    version: str
+    version_installed: bool
+    bin_path: "Optional[str]"
+    alias_chain: "Tuple[str, ...]"
+
+
+NvmrcLookupHandler = Callable[[List[str]], None]
+ResolvedVersion = Tuple[str, bool, Tuple[str, ...]]
+
+
+class Resolver:
+    """
+    Resolve node executables keeping the nvm alias mapping, installed node versions,
+    per folder .nvmrc lookups and resolved versions in memory until they are invalidated
+    """
+
+    def __init__(
+        self,
+        nvm_dir: str,
+        on_nvmrc_lookup: "Optional[NvmrcLookupHandler]" = None,
+    ):
+        """
+        :param nvm_dir: the path to .nvm installation
+        :param on_nvmrc_lookup: called with the folders searched for a .nvmrc file
+        """
+        self.nvm_dir = nvm_dir
+        self.on_nvmrc_lookup = on_nvmrc_lookup
+        self._alias_graph: "Optional[AliasGraph]" = None
+        self._node_versions: "Optional[VersionIndex]" = None
+        self._nvmrc_paths: "Dict[str, Optional[str]]" = {}
+        self._rc_versions: "Dict[Optional[str], str]" = {}
+        self._resolved_versions: "Dict[str, ResolvedVersion]" = {}
+
+    @property
+    def node_versions_dir(self) -> str:
+        """Folder of the installed node versions"""
+        return core.get_node_versions_dir(self.nvm_dir)
+
+    @property
+    def alias_graph(self) -> "AliasGraph":
+        """Nvm aliases compiled to the version at the end of each alias chain"""
+        if self._alias_graph is None:
+            self._alias_graph = AliasGraph(core.get_nvm_alias_mapping(self.nvm_dir))
+        return self._alias_graph
+
+    @property
+    def node_versions(self) -> "VersionIndex":
+        """Index of installed node versions"""
+        if self._node_versions is None:
+            self._node_versions = VersionIndex(
+                core.get_node_versions(self.node_versions_dir)
+            )
+        return self._node_versions
+
+    def invalidate_aliases(self):
+        """Reload the nvm alias mapping on next resolution"""
+        self._alias_graph = None
+        self._resolved_versions.clear()
+
+    def invalidate_versions(self):
+        """Reload the installed node versions and the aliases resolved from them"""
+        self._node_versions = None
+        self.invalidate_aliases()
+
+    def invalidate_nvmrc(self):
+        """Search for and reload .nvmrc files on next resolution"""
+        self._nvmrc_paths.clear()
+        self._rc_versions.clear()
+
+    def invalidate(self):
+        """Reload all nvm state on next resolution"""
+        self.invalidate_versions()
+        self.invalidate_nvmrc()
+
+    def get_nvmrc_path(self, exec_dir: str) -> "Optional[str]":
+        """
+        Get the path to the nearest version file reusing previous lookups of parent folders
+
+        :param exec_dir: the folder to start search from
+        :return: path to first found .nvmrc, .node-version, .tool-versions or package.json file
+        """
+        file_names = environment.get_version_files(DEFAULT_VERSION_FILES)
+        current_dir = os.path.abspath(exec_dir)
+        searched_dirs: "List[str]" = []
+        while current_dir not in self._nvmrc_paths:
+            searched_dirs.append(current_dir)
+            nvmrc_path = version_file.get_dir_version_file(current_dir, file_names)
+            parent_dir = os.path.dirname(current_dir)
+            if nvmrc_path or parent_dir == current_dir:
+                break
+            current_dir = parent_dir
+        else:
+            nvmrc_path = self._nvmrc_paths[current_dir]
+
+        for searched_dir in searched_dirs:
+            self._nvmrc_paths[searched_dir] = nvmrc_path
+        if searched_dirs and self.on_nvmrc_lookup:
+            self.on_nvmrc_lookup(searched_dirs)
+        return nvmrc_path
+
+    def get_nvmrc(self, nvmrc_path: "Optional[str]") -> str:
+        """
+        Get the version from the nvmrc file reusing previously read files
+
+        :param nvmrc_path: the location of the .nvmrc file
+        :return: .nvmrc version or using fallback
+        """
+        if nvmrc_path not in self._rc_versions:
+            self._rc_versions[nvmrc_path] = core.get_nvmrc(nvmrc_path)
+        return self._rc_versions[nvmrc_path]
+
+    def resolve_version(self, rc_version: str) -> "ResolvedVersion":
+        """
+        Resolve the rc version reusing previous resolutions of the same version
+
+        :param rc_version: version loaded from nvmrc file
+        :return: version to use, if version is installed, aliases traversed
+        """
+        if rc_version not in self._resolved_versions:
+            version, version_installed = core.resolve_version(
+                version_alias=rc_version,
+                nvm_aliases=self.alias_graph,
+                node_versions=self.node_versions,
+            )
+            alias_chain = core.resolve_alias(rc_version, self.alias_graph)[2]
+            self._resolved_versions[rc_version] = (
+                version,
+                version_installed,
+                tuple(alias_chain),
+            )
+        return self._resolved_versions[rc_version]
+
+    def resolve(self, exec_dir: str, bin_file: str) -> "Resolution":
+        """
+        Resolve the node executable to use in a folder
+
+        :param exec_dir: the folder the executable is run from
+        :param bin_file: the node binary to find
+        :return: resolution with executable path, None when not installed or not found
+        """
+        nvmrc_path = self.get_nvmrc_path(exec_dir)
+        rc_version = self.get_nvmrc(nvmrc_path)
+        version, version_installed, alias_chain = self.resolve_version(rc_version)
+        bin_path: "Optional[str]" = None
+        if version_installed:
+            bin_path = os.path.join(
+                core.get_node_version_bin_dir(self.node_versions_dir, version),
+                bin_file,
+            )
+            if not os.path.exists(bin_path):
+                bin_path = None
+        return Resolution(
+            nvmrc_path, rc_version, version, version_installed, bin_path, alias_chain
+        )
@@ -0,0 +1,170 @@
+"""Shell exports and hooks putting the resolved node bin folder on the path"""
+import os
+import shlex
+import sys
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+from nvshim.core import api
+from nvshim.utils import (
+    environment,
+    message,
+)
+from nvshim.utils.constants import DEFAULT_VERSION_FILES
+
+SHELLS = ("bash", "zsh", "fish")
+NVM_BIN = environment.EnvironmentVariable.NVM_BIN.value
+PATH = "PATH"
+
+EnvChanges = Dict[str, Optional[str]]
+
+_POSIX_HOOK = """\
+_nvshim_hook() {{
+  local dir="$PWD" file="" state="" content found name word version rest
+  while :; do
+    for name in {names}; do
+      [ -f "$dir/$name" ] || continue
+      content="" found=""
+      while read -r word version rest || [ -n "$word" ]; do
+        content="$content$word $version $rest
+"
+        case "$name:$word:$version" in
+          .tool-versions:node:[!#]* | .tool-versions:nodejs:[!#]*) found=1 ;;
+        esac
+      done < "$dir/$name"
+      case "$name:$content" in
+        package.json:*'"engines"'*'"node"'*) found=1 ;;
+        .tool-versions:* | package.json:*) ;;
+        *) found=1 ;;
+      esac
+      if [ -n "$found" ]; then
+        file="$dir/$name"
+        state="$content"
+        break
+      fi
+    done
+    [ -n "$file" ] || [ -z "$dir" ] && break
+    dir="${{dir%/*}}"
+  done
+  state="$file:$state"
+  if [ "$state" != "${{_NVSHIM_STATE-}}" ]; then
+    _NVSHIM_STATE="$state"
+    eval "$({command} env --shell {shell})"
+  fi
+}}
+"""
+
+_HOOKS = {
+    "bash": _POSIX_HOOK
+    + """\
+if [[ ";${{PROMPT_COMMAND:-}};" != *";_nvshim_hook;"* ]]; then
+  PROMPT_COMMAND="_nvshim_hook${{PROMPT_COMMAND:+;$PROMPT_COMMAND}}"
+fi
+""",
+    "zsh": _POSIX_HOOK
+    + """\
+autoload -Uz add-zsh-hook
+add-zsh-hook precmd _nvshim_hook
+""",
+    "fish": """\
+function _nvshim_hook --on-event fish_prompt
+    set -l dir $PWD
+    set -l file ""
+    set -l state ""
+    set -l content ""
+    while true
+        for name in {names}
+            test -f "$dir/$name"; or continue
+            read -z content < "$dir/$name"
+            switch $name
+                case .tool-versions
+                    string match -qr '(?m)^\\s*(nodejs|node)\\s+[^#\\s]' -- $content; or continue
+                case package.json
+                    string match -q '*"engines"*"node"*' -- $content; or continue
+            end
+            set file "$dir/$name"
+            set state $content
+            break
+        end
+        test -n "$file" -o -z "$dir"; and break
+        set dir (string replace -r '/[^/]*$' '' -- $dir)
+    end
+    set state "$file:$state"
+    if test "$state" != "$_nvshim_state"
+        set -g _nvshim_state $state
+        {command} env --shell {shell} | source
+    end
+end
+""",
+}
+
+
+def get_default_shell() -> str:
+    """Get the shell named by $SHELL when supported, falling back to bash"""
+    shell = os.path.basename(os.environ.get("SHELL", ""))
+    return shell if shell in SHELLS else SHELLS[0]
+
+
+def get_env_changes(
+    exec_dir: str, nvm_dir: str, environ: "Dict[str, str]"
+) -> "EnvChanges":
+    """
+    Get the environment changes that put the bin folder of the node version used
+    in a folder first on the path, replacing the previously added bin folder
+
+    :param exec_dir: the folder node would be run from
+    :param nvm_dir: the path to .nvm installation
+    :param environ: the current environment
+    :return: new values of the changed variables, None for variables to unset,
+        only removing the previously added bin folder when no version can be used
+    """
+    try:
+        bin_path = api.resolve(exec_dir, "node", nvm_dir).bin_path
+    except api.ResolutionError as exc:
+        message.print_unable_to_resolve(exec_dir, exc)
+        bin_path = None
+    env = environment.get_node_bin_env(
+        os.path.dirname(bin_path) if bin_path else None, environ
+    )
+    return {PATH: env[PATH], NVM_BIN: env.get(NVM_BIN)}
+
+
+def _quote_fish(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def format_env_changes(shell: str, changes: "EnvChanges") -> str:
+    """
+    Format environment changes as commands to evaluate in the shell
+
+    :param shell: one of the supported shells
+    :param changes: new values of the changed variables, None for variables to unset
+    :return: shell commands
+    """
+    lines: "List[str]" = []
+    for name, value in changes.items():
+        if value is None:
+            lines.append(f"set -e {name};" if shell == "fish" else f"unset {name};")
+        elif shell == "fish":
+            values = value.split(os.pathsep) if name == PATH else [value]
+            lines.append(f"set -gx {name} {' '.join(map(_quote_fish, values))};")
+        else:
+            lines.append(f"export {name}={shlex.quote(value)};")
+    return "\n".join(lines)
+
+
+def get_hook(shell: str) -> str:
+    """
+    Get the shell hook that reevaluates the environment before a prompt,
+    only when the nearest version file setting a node version or its content changed
+
+    :param shell: one of the supported shells
+    :return: shell script to evaluate in the shell startup file
+    """
+    command = " ".join(map(shlex.quote, (sys.executable, "-m", "nvshim.core.cli")))
+    names = " ".join(environment.get_version_files(DEFAULT_VERSION_FILES))
+    return _HOOKS[shell].format(command=command, shell=shell, names=names)
@@ -6,9 +6,9 @@ import nvshim.core.__main__ as core
 
 
 def main():
-    """Pipe arguments to run specific node binary"""
+    """Pipe arguments to run specific node binary in place of the shim process"""
     sys.argv.insert(1, os.path.basename(sys.argv[0]))
-    core.main()
+    core.main(replace_process=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""Install every node version used by the version files in a folder tree"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import nvshim.core.__main__ as core
+from nvshim.utils import (
+    environment,
+    version_file,
+)
+from nvshim.utils.constants import DEFAULT_VERSION_FILES
+from nvshim.utils.version_index import VersionIndex
+
+SKIPPED_DIR_NAMES = frozenset({".git", "node_modules"})
+
+
+class SyncSummary(NamedTuple):
+    """Versions resolved from version files and the outcome of installing them"""
+
+    nvmrc_paths: "List[str]"
+    resolved: "Dict[str, str]"
+    present: "List[str]"
+    installed: "List[str]"
+    failed: "List[str]"
+
+
+def find_nvmrc_files(root_dir: str, file_names: "Sequence[str]") -> "Iterator[str]":
+    """
+    Find the version file used in every folder of a folder tree without following
+    symlinks, skipping node_modules and .git folders
+
+    :param root_dir: the folder to start search from
+    :param file_names: version file names in order of precedence within a folder
+    :return: paths of the version files found
+    """
+    pending_dirs = [root_dir]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        found: "Dict[str, str]" = {}
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.name in file_names and entry.is_file():
+                        found[entry.name] = entry.path
+                    elif entry.name not in SKIPPED_DIR_NAMES and entry.is_dir(
+                        follow_symlinks=False
+                    ):
+                        pending_dirs.append(entry.path)
+        except OSError:
+            continue
+        nvmrc_path = version_file.select(found, file_names)
+        if nvmrc_path:
+            yield nvmrc_path
+
+
+def _install_version(version: str, nvm_dir: str) -> "Optional[str]":
+    """Install version in a worker process returning the installed version if any"""
+    try:
+        installed_version = core.install_version(
+            version=version,
+            node_versions_dir=core.get_node_versions_dir(nvm_dir),
+            nvm_sh_path=core.get_nvmsh_path(nvm_dir),
+        )
+    except SystemExit:
+        return None
+    return str(installed_version) if installed_version else None
+
+
+def _get_install_target(version: str, nvm_dir: str) -> "Optional[str]":
+    """Get the release installing the version unpacks, None when it cannot be found"""
+    try:
+        return core.get_install_target(version, core.get_nvmsh_path(nvm_dir))
+    except SystemExit:
+        return None
+
+
+def resolve_versions(
+    rc_versions: "Set[str]", nvm_dir: str
+) -> "Tuple[Dict[str, str], Set[str], Set[str]]":
+    """
+    Resolve version file versions to the versions to use with the existing alias logic,
+    resolving missing versions to the release installing them unpacks so versions and
+    ranges of the same release are installed once
+
+    :param rc_versions: distinct versions or aliases found in version files
+    :param nvm_dir: the path to .nvm installation
+    :return: mapping of version file version to resolved version or release to install,
+        installed versions and missing releases or versions no release was found for
+    """
+    nvm_aliases = core.get_nvm_alias_mapping(nvm_dir)
+    node_versions = VersionIndex(
+        core.get_node_versions(core.get_node_versions_dir(nvm_dir))
+    )
+    install_targets: "Dict[str, str]" = {}
+    resolved: "Dict[str, str]" = {}
+    present: "Set[str]" = set()
+    missing: "Set[str]" = set()
+    for rc_version in sorted(rc_versions):
+        version, version_installed = core.resolve_version(
+            version_alias=rc_version,
+            nvm_aliases=nvm_aliases,
+            node_versions=node_versions,
+        )
+        if not version_installed:
+            if version not in install_targets:
+                install_targets[version] = (
+                    _get_install_target(version, nvm_dir) or version
+                )
+            version = install_targets[version]
+        resolved[rc_version] = version
+        (present if version_installed else missing).add(version)
+    return resolved, present, missing
+
+
+def install_versions(
+    versions: "List[str]", nvm_dir: str, max_workers: "Optional[int]" = None
+) -> "Tuple[List[str], List[str]]":
+    """
+    Install versions in parallel worker processes
+
+    :param versions: versions to install
+    :param nvm_dir: the path to .nvm installation
+    :param max_workers: maximum concurrent installs, defaults to the number of processors
+    :return: installed versions and the versions that failed to install
+    """
+    installed: "List[str]" = []
+    failed: "List[str]" = []
+    if not versions:
+        return installed, failed
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_install_version, versions, [nvm_dir] * len(versions))
+        for version, installed_version in zip(versions, results):
+            if installed_version:
+                installed.append(installed_version)
+            else:
+                failed.append(version)
+    return installed, failed
+
+
+def sync(
+    root_dir: str, nvm_dir: str, max_workers: "Optional[int]" = None
+) -> "SyncSummary":
+    """
+    Resolve the distinct versions in all version files under a folder and
+    install the missing releases in parallel
+
+    :param root_dir: the folder to search for the version files set in $NVSHIM_VERSION_FILES
+    :param nvm_dir: the path to .nvm installation
+    :param max_workers: maximum concurrent installs, defaults to the number of processors
+    :return: summary of the resolved, already installed and newly installed versions
+    """
+    file_names = environment.get_version_files(DEFAULT_VERSION_FILES)
+    nvmrc_paths = sorted(find_nvmrc_files(root_dir, file_names))
+    rc_versions = {core.get_nvmrc(nvmrc_path) for nvmrc_path in nvmrc_paths}
+    rc_versions.discard("")
+    resolved, present, missing = resolve_versions(rc_versions, nvm_dir)
+    installed, failed = install_versions(sorted(missing), nvm_dir, max_workers)
+    return SyncSummary(nvmrc_paths, resolved, sorted(present), installed, failed)
@@ -0,0 +1,107 @@
+"""Test resolving node executables from python"""
+import os
+from pathlib import Path
+
+import pytest
+
+import nvshim
+from nvshim.core import api
+from nvshim.utils.constants import ErrorCode
+from nvshim.utils.environment import (
+    EnvironmentVariable,
+    process_env,
+)
+
+
+def _write(path, content: str):
+    """Write file content making sure its modification time changes"""
+    existed = path.exists()
+    path.write_text(content)
+    if existed:
+        stat = path.stat()
+        os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def test_project(tmp_path):
+    """Prepare a project with a nested package folder using the default version"""
+    project_dir = tmp_path / "project"
+    (project_dir / "package").mkdir(parents=True)
+    _write(project_dir / ".nvmrc", "default")
+    yield project_dir
+    api.cache_clear()
+
+
+def test_resolve_is_exposed_lazily_on_package():
+    """Test the api is available from the package and importing nvshim alone is cheap"""
+    assert nvshim.resolve is api.resolve
+    assert nvshim.VersionNotInstalledError is api.VersionNotInstalledError
+    with pytest.raises(AttributeError):
+        getattr(nvshim, "missing")
+
+
+def test_resolve_returns_immutable_resolution(test_nvm_dir, test_project):
+    """Test resolution of an installed executable through the alias chain"""
+    resolution = nvshim.resolve(
+        str(test_project / "package"), "npm", nvm_dir=test_nvm_dir
+    )
+    assert resolution.nvmrc_path == str(test_project / ".nvmrc")
+    assert resolution.rc_version == "default"
+    assert resolution.alias_chain == ("default",)
+    assert resolution.version == "14.5.0"
+    assert resolution.bin_path == os.path.join(
+        test_nvm_dir, "versions", "node", "v14.5.0", "bin", "npm"
+    )
+    with pytest.raises(AttributeError):
+        resolution.version = "16.0.0"  # type: ignore
+    with pytest.raises(AttributeError):
+        resolution.alias_chain.append("lts/*")  # type: ignore
+    assert (
+        nvshim.resolve(str(test_project / "package"), "npm", nvm_dir=test_nvm_dir)
+        == resolution
+    )
+
+
+def test_resolve_reuses_resolution_until_dependencies_change(
+    mocker, test_nvm_dir, test_project
+):
+    """Test repeat resolutions are cached until a .nvmrc or alias file changes"""
+    mocked_resolve = mocker.spy(api.Resolver, "resolve")
+    package_dir = str(test_project / "package")
+    with process_env({**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}):
+        assert api.resolve(package_dir).version == "14.5.0"
+        assert api.resolve(package_dir).version == "14.5.0"
+        assert mocked_resolve.call_count == 1
+
+        versions_dir = os.path.join(test_nvm_dir, "versions", "node")
+        os.rename(f"{versions_dir}/v14.5.0", f"{versions_dir}/v16.1.0")
+        _write(test_project / ".nvmrc", "16")
+        assert api.resolve(package_dir).version == "16.1.0"
+
+        _write(test_project / ".nvmrc", "default")
+        _write(Path(test_nvm_dir, "alias", "default"), "16.1")
+        assert api.resolve(package_dir).version == "16.1.0"
+
+        _write(test_project / "package" / ".nvmrc", "14")
+        with pytest.raises(api.VersionNotInstalledError) as exc_info:
+            api.resolve(package_dir)
+        assert mocked_resolve.call_count == 4
+
+    assert exc_info.value.error_code == ErrorCode.VERSION_NOT_INSTALLED
+    assert exc_info.value.resolution.nvmrc_path == str(
+        test_project / "package" / ".nvmrc"
+    )
+
+
+def test_resolve_raises_typed_errors(monkeypatch, test_nvm_dir, test_project):
+    """Test failures raise exceptions with the matching shim error code"""
+    monkeypatch.delenv(EnvironmentVariable.NVM_DIR.value, raising=False)
+    with pytest.raises(api.NvmDirMissingError) as nvm_dir_exc_info:
+        api.resolve(str(test_project))
+    with pytest.raises(api.ExecutableNotFoundError) as bin_exc_info:
+        api.resolve(str(test_project), "yarn", nvm_dir=test_nvm_dir)
+
+    assert nvm_dir_exc_info.value.error_code == ErrorCode.ENV_NVM_DIR_MISSING
+    assert bin_exc_info.value.error_code == ErrorCode.EXECUTABLE_NOT_FOUND
+    assert bin_exc_info.value.bin_file == "yarn"
+    assert isinstance(bin_exc_info.value, api.ResolutionError)
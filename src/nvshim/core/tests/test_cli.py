@@ -0,0 +1,197 @@
+"""Test nvshim command line interface"""
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from nvshim.core.cli import main
+from nvshim.utils.environment import (
+    EnvironmentVariable,
+    process_env,
+)
+
+
+def test_cli_requires_command(capsys):
+    """Test running without a command fails with usage"""
+    with pytest.raises(SystemExit) as exc_info:
+        main([])
+    assert exc_info.value.code == 2
+    assert "usage: nvshim" in capsys.readouterr().err
+
+
+def test_cli_runs_daemon(mocker, test_nvm_dir, test_cache_dir):
+    """Test daemon command serves on the configured socket for nvm dir"""
+    mocked_serve = mocker.patch("nvshim.core.daemon.serve", autospec=True)
+    with process_env({**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}):
+        main(["daemon"])
+        main(["daemon", "--socket", "/tmp/nvshim.sock"])
+
+    assert mocked_serve.call_args_list == [
+        mocker.call(os.path.join(test_cache_dir, "daemon.sock"), test_nvm_dir),
+        mocker.call("/tmp/nvshim.sock", test_nvm_dir),
+    ]
+
+
+def test_cli_resolves_folders_as_json_lines(
+    mocker, capsys, test_nvm_dir, test_workspace_with_nvmrc, tmp_path
+):
+    """Test resolve command prints a json line per folder from argv or stdin"""
+    (tmp_path / "legacy").mkdir()
+    (tmp_path / "legacy" / ".nvmrc").write_text("12")
+    legacy_dir = str(tmp_path / "legacy")
+    with process_env({**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}):
+        main(["resolve", test_workspace_with_nvmrc, legacy_dir, "--bin", "npm"])
+        mocker.patch("sys.stdin", io.StringIO(f"{test_workspace_with_nvmrc}\n\n"))
+        main(["resolve"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {
+            "dir": test_workspace_with_nvmrc,
+            "nvmrc_path": os.path.join(test_workspace_with_nvmrc, ".nvmrc"),
+            "rc_version": "v14.5.0",
+            "alias_chain": [],
+            "version": "14.5.0",
+            "installed": True,
+            "bin_path": f"{test_nvm_dir}/versions/node/v14.5.0/bin/npm",
+        },
+        {
+            "dir": legacy_dir,
+            "nvmrc_path": os.path.join(legacy_dir, ".nvmrc"),
+            "rc_version": "12",
+            "alias_chain": [],
+            "version": "12",
+            "installed": False,
+            "bin_path": None,
+        },
+        {
+            "dir": test_workspace_with_nvmrc,
+            "nvmrc_path": os.path.join(test_workspace_with_nvmrc, ".nvmrc"),
+            "rc_version": "v14.5.0",
+            "alias_chain": [],
+            "version": "14.5.0",
+            "installed": True,
+            "bin_path": f"{test_nvm_dir}/versions/node/v14.5.0/bin/node",
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "shell, expected",
+    [
+        ("bash", "export PATH={bin_dir}:/usr/bin;\nexport NVM_BIN={bin_dir};\n"),
+        (
+            "fish",
+            "set -gx PATH '{bin_dir}' '/usr/bin';\nset -gx NVM_BIN '{bin_dir}';\n",
+        ),
+    ],
+)
+def test_cli_env_prints_shell_commands_adding_bin_dir(
+    capsys, monkeypatch, test_nvm_dir, test_workspace_with_nvmrc, shell, expected
+):
+    """Test env replaces the previous node bin folder on the path with the resolved"""
+    monkeypatch.chdir(test_workspace_with_nvmrc)
+    monkeypatch.setenv(EnvironmentVariable.NVM_DIR.value, test_nvm_dir)
+    monkeypatch.setenv("PATH", "/old/bin:/usr/bin")
+    monkeypatch.setenv("NVM_BIN", "/old/bin")
+    main(["env", "--shell", shell])
+
+    bin_dir = os.path.join(test_nvm_dir, "versions", "node", "v14.5.0", "bin")
+    assert capsys.readouterr().out == expected.format(bin_dir=bin_dir)
+
+
+def test_cli_env_removes_bin_dir_when_version_not_installed(
+    capsys, monkeypatch, test_nvm_dir, tmp_path
+):
+    """Test env only removes the previous node bin folder when node cannot be used"""
+    (tmp_path / ".nvmrc").write_text("16")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(EnvironmentVariable.NVM_DIR.value, test_nvm_dir)
+    monkeypatch.setenv("PATH", "/usr/bin:/old/bin")
+    monkeypatch.setenv("NVM_BIN", "/old/bin")
+    main(["env", "--shell", "zsh"])
+
+    captured = capsys.readouterr()
+    assert captured.out == "export PATH=/usr/bin;\nunset NVM_BIN;\n"
+    assert f"Unable to use node in '{tmp_path}'" in captured.err
+
+
+def test_cli_hook_reevaluates_env_when_nvmrc_changes(test_nvm_dir, tmp_path):
+    """Test bash hook only runs env when the nearest .nvmrc or its version changes"""
+    (tmp_path / "project" / "nested").mkdir(parents=True)
+    (tmp_path / "project" / ".nvmrc").write_text("14")
+    script = """
+    eval "$(python -m nvshim.core.cli hook --shell bash)"
+    eval "$(python -m nvshim.core.cli hook --shell bash)"
+    echo "$PROMPT_COMMAND"
+    cd project && _nvshim_hook && echo "$NVM_BIN"
+    NVM_BIN=unchanged
+    cd nested && _nvshim_hook && echo "$NVM_BIN"
+    echo 16 > ../.nvmrc && _nvshim_hook && echo "${NVM_BIN-unset}"
+    """
+    completed = subprocess.run(
+        ("bash", "-c", script),
+        check=True,
+        cwd=str(tmp_path),
+        env={
+            **os.environ,
+            "NVM_DIR": test_nvm_dir,
+            "PATH": f"{os.path.dirname(sys.executable)}:{os.environ['PATH']}",
+            "PROMPT_COMMAND": "history -a",
+            "PYTHONPATH": os.pathsep.join(sys.path),
+        },
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="UTF-8",
+    )
+    assert completed.stdout.splitlines() == [
+        "_nvshim_hook;history -a",
+        os.path.join(test_nvm_dir, "versions", "node", "v14.5.0", "bin"),
+        "unchanged",
+        "unset",
+    ]
+
+
+def test_cli_hook_skips_files_without_node_version_and_reads_whole_file(
+    test_nvm_dir, tmp_path
+):
+    """Test bash hook looks past version files without node and tracks every line"""
+    (tmp_path / "project" / "app").mkdir(parents=True)
+    (tmp_path / "project" / ".nvmrc").write_text("14", encoding="UTF-8")
+    (tmp_path / "project" / "app" / ".tool-versions").write_text(
+        "python 3.11\nnodejs # pinned later\n", encoding="UTF-8"
+    )
+    (tmp_path / "project" / "app" / "package.json").write_text(
+        '{"name": "app"}', encoding="UTF-8"
+    )
+    script = """
+    eval "$(python -m nvshim.core.cli hook --shell bash)"
+    cd project/app && _nvshim_hook && echo "$NVM_BIN"
+    NVM_BIN=unchanged
+    echo '{"engines": {"npm": ">=9"}}' > package.json && _nvshim_hook
+    echo "$NVM_BIN"
+    printf 'python 3.11\\nnodejs 16.0.0\\n' > .tool-versions && _nvshim_hook
+    echo "${NVM_BIN-unset}"
+    printf 'python 3.11\\nnodejs 14.5.0\\n' > .tool-versions && _nvshim_hook
+    echo "$NVM_BIN"
+    """
+    completed = subprocess.run(
+        ("bash", "-c", script),
+        check=True,
+        cwd=str(tmp_path),
+        env={
+            **os.environ,
+            "NVM_DIR": test_nvm_dir,
+            "NVSHIM_VERSION_FILES": ".nvmrc,.tool-versions,package.json",
+            "PATH": f"{os.path.dirname(sys.executable)}:{os.environ['PATH']}",
+            "PYTHONPATH": os.pathsep.join(sys.path),
+        },
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="UTF-8",
+    )
+    bin_dir = os.path.join(test_nvm_dir, "versions", "node", "v14.5.0", "bin")
+    assert completed.stdout.splitlines() == [bin_dir, "unchanged", "unset", bin_dir]
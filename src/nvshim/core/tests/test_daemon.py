@@ -0,0 +1,175 @@
+"""Test resolver daemon and the shim client"""
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from nvshim.core.client import (
+    REQUEST_SEPARATOR,
+    REQUEST_TIMEOUT,
+    RESOLUTION_SETTINGS,
+    request_resolution,
+)
+from nvshim.core.daemon import ResolverDaemon
+from nvshim.utils import unix_socket
+from nvshim.utils.environment import process_env
+
+
+@pytest.fixture
+def test_daemon(test_nvm_dir):
+    """Run the resolver daemon on a short unix socket path for the test"""
+    socket_dir = tempfile.mkdtemp(prefix="nvshim")
+    daemon = ResolverDaemon(os.path.join(socket_dir, "d.sock"), test_nvm_dir)
+    thread = threading.Thread(target=daemon.serve_forever, args=(0.05,))
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join()
+    shutil.rmtree(socket_dir)
+
+
+def _bin_path(nvm_dir, version, bin_file="node"):
+    return os.path.join(nvm_dir, "versions", "node", version, "bin", bin_file)
+
+
+def _install(nvm_dir, version):
+    bin_dir = os.path.dirname(_bin_path(nvm_dir, version))
+    os.makedirs(bin_dir)
+    with open(os.path.join(bin_dir, "node"), "w", encoding="UTF-8"):
+        pass
+
+
+def test_daemon_serves_resolution(test_daemon, tmp_path):
+    """Test daemon responds with the executable resolved for the folder"""
+    (tmp_path / ".nvmrc").write_text("14")
+    nvm_dir = test_daemon.nvm_dir
+    assert request_resolution(
+        test_daemon.socket_path, str(tmp_path), "npm", nvm_dir
+    ) == (
+        _bin_path(nvm_dir, "v14.5.0", "npm"),
+        "14.5.0",
+        "14",
+        str(tmp_path / ".nvmrc"),
+    )
+    assert request_resolution(test_daemon.socket_path, "/", "node", nvm_dir) == (
+        _bin_path(nvm_dir, "v14.5.0"),
+        "14.5.0",
+        "default",
+        None,
+    )
+
+
+def test_daemon_defers_unresolved_requests(test_daemon, tmp_path):
+    """Test daemon leaves missing versions and other nvm installs to the shim"""
+    (tmp_path / ".nvmrc").write_text("16")
+    socket_path, nvm_dir = test_daemon.socket_path, test_daemon.nvm_dir
+    assert request_resolution(socket_path, str(tmp_path), "node", nvm_dir) is None
+    assert request_resolution(socket_path, "/", "node", str(tmp_path)) is None
+    assert request_resolution(socket_path, "/", "yarn", nvm_dir) is None
+
+
+def test_daemon_defers_requests_with_other_resolution_settings(test_daemon, tmp_path):
+    """Test daemon leaves shims with other version files or install settings to resolve"""
+    (tmp_path / ".nvmrc").write_text("14")
+    socket_path, nvm_dir = test_daemon.socket_path, test_daemon.nvm_dir
+    assert request_resolution(socket_path, str(tmp_path), "node", nvm_dir)
+    for setting in RESOLUTION_SETTINGS:
+        with process_env({**os.environ, setting.value: ".node-version"}):
+            assert (
+                request_resolution(socket_path, str(tmp_path), "node", nvm_dir) is None
+            )
+
+
+def test_daemon_serves_connections_concurrently(test_daemon, tmp_path):
+    """Test a shim that has not sent its request does not hold up other shims"""
+    (tmp_path / ".nvmrc").write_text("14")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+        stalled.connect(test_daemon.socket_path)
+        started = time.monotonic()
+        resolution = request_resolution(
+            test_daemon.socket_path, str(tmp_path), "node", test_daemon.nvm_dir
+        )
+        assert time.monotonic() - started < REQUEST_TIMEOUT / 2
+    assert resolution and resolution[1] == "14.5.0"
+
+
+def test_daemon_invalidates_on_changes(test_daemon, tmp_path):
+    """Test daemon reloads state when .nvmrc files, aliases or versions change"""
+    socket_path, nvm_dir = test_daemon.socket_path, test_daemon.nvm_dir
+    project_dir = str(tmp_path)
+    (tmp_path / ".nvmrc").write_text("16")
+    assert request_resolution(socket_path, project_dir, "node", nvm_dir) is None
+
+    _install(nvm_dir, "v16.0.0")
+    resolution = request_resolution(socket_path, project_dir, "node", nvm_dir)
+    assert resolution and resolution[1] == "16.0.0"
+
+    (tmp_path / ".nvmrc").write_text("project")
+    assert request_resolution(socket_path, project_dir, "node", nvm_dir) is None
+
+    with open(
+        os.path.join(nvm_dir, "alias", "project"), "w", encoding="UTF-8"
+    ) as open_file:
+        open_file.write("14")
+    resolution = request_resolution(socket_path, project_dir, "node", nvm_dir)
+    assert resolution and resolution[1] == "14.5.0"
+
+    (tmp_path / ".nvmrc").unlink()
+    resolution = request_resolution(socket_path, project_dir, "node", nvm_dir)
+    assert resolution and resolution[2:] == ("default", None)
+
+
+def test_daemon_reloads_every_request_without_watcher(mocker, test_nvm_dir, tmp_path):
+    """Test daemon falls back to reloading state when folders cannot be watched"""
+    mocker.patch("nvshim.core.daemon.get_watcher", return_value=None)
+    daemon = ResolverDaemon(str(tmp_path / "d.sock"), test_nvm_dir)
+    mocked_invalidate = mocker.patch.object(daemon.resolver, "invalidate")
+    daemon.process_events()
+    daemon.close()
+    mocked_invalidate.assert_called_once_with()
+    assert not os.path.exists(daemon.socket_path)
+
+
+def test_client_returns_nothing_without_daemon(tmp_path):
+    """Test shim client falls back when the daemon is not running or unresponsive"""
+    socket_path = str(tmp_path / "d.sock")
+    assert request_resolution(socket_path, "/", "node", "/nvm") is None
+    (tmp_path / "d.sock").write_text("")
+    assert request_resolution(socket_path, "/", "node", "/nvm") is None
+
+
+@pytest.mark.parametrize(
+    "bin_path",
+    [
+        "/usr/bin/node",
+        "{nvm_dir}/versions/node/v14.5.0/node",
+        "{nvm_dir}/versions/node/../bin/node",
+        "{nvm_dir}/../versions/node/v14.5.0/bin/node",
+    ],
+)
+def test_client_rejects_executable_outside_node_versions(test_nvm_dir, bin_path):
+    """Test shim client falls back when the daemon responds with another executable"""
+    bin_path = bin_path.format(nvm_dir=test_nvm_dir)
+    socket_dir = tempfile.mkdtemp(prefix="nvshim")
+    socket_path = os.path.join(socket_dir, "d.sock")
+    server = unix_socket.listen(socket_path)
+
+    def respond():
+        connection, _ = server.accept()
+        with connection:
+            connection.recv(4096)
+            response = REQUEST_SEPARATOR.join((bin_path, "14.5.0", "default", ""))
+            connection.sendall(os.fsencode(response) + b"\n")
+
+    thread = threading.Thread(target=respond)
+    thread.start()
+    try:
+        assert request_resolution(socket_path, "/", "node", test_nvm_dir) is None
+    finally:
+        thread.join()
+        unix_socket.close(server, socket_path)
+        shutil.rmtree(socket_dir)
@@ -1,31 +1,50 @@
 """Test main shim logic"""
+# pylint: disable=too-many-lines
+import json
 import os
+import shutil
 import subprocess
-import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
-import semver
 
 from nvshim.core.__main__ import (
-    HashableDict,
-    HashableList,
     get_files,
+    get_install_lock_path,
+    get_install_target,
+    get_local_stable_version,
+    get_node_versions,
+    get_nvm_alias_mapping,
     get_nvm_aliases,
+    get_nvm_snapshot,
     get_nvm_stable_version,
     get_nvmrc,
+    get_nvmrc_path,
+    get_resolved_token,
+    get_stable_version,
+    install_version,
     main,
     match_version,
+    parse_alias_versions,
     parse_args,
     parse_version,
     resolve_alias,
+    resolve_bin_path_from_token,
+    resolve_version,
     run_nvm_cmd,
+    split_args,
+    stream_nvm_cmd,
 )
+from nvshim.utils.constants import ErrorCode
 from nvshim.utils.environment import (
     EnvironmentVariable,
     process_env,
 )
+from nvshim.utils.lock import file_lock
 from nvshim.utils.process import clean_output
+from nvshim.utils.semver import Version
 
 
 def test_raises_missing_bin_file():
@@ -137,9 +156,7 @@ def test_runs_correct_version_of_node(
         autospec=True,
         return_value=test_nested_workspace_with_nvmrc,
     )
-    mocked_process_run = mocker.patch(
-        "nvshim.utils.process.subprocess.run", wraps=subprocess.run
-    )
+    mocked_process_run = mocker.patch("subprocess.run", wraps=subprocess.run)
     mock_env = {
         EnvironmentVariable.NVM_DIR.value: nvm_dir,
         **os.environ,
@@ -153,6 +170,7 @@ def test_runs_correct_version_of_node(
         (f"{node_version_dir}/bin/{test_args[1]}", *test_args[2:]),
         check=True,
         encoding="UTF-8",
+        env=mocker.ANY,
     )
     captured = capsys.readouterr()
     assert "with version <v14.5.0>" in clean_output(captured.out)
@@ -166,39 +184,40 @@ def test_get_files_returns_path_when_single_file(test_workspace_with_nvmrc):
     assert result == [file_path]
 
 
-def test_run_nvm_command_handles_failure_to_remove_tmp_file(capsys, mocker, snapshot):
-    """Test handling of os remove file error"""
+def test_run_nvm_command_passes_script_without_temp_file(mocker):
+    """Test nvm command script is passed to bash as an argument"""
     mocked_process_run = mocker.patch(
         "nvshim.core.__main__.process.run",
         autospec=True,
     )
-    mocker.patch(
-        "nvshim.core.__main__.os.remove",
-        autospec=True,
-        side_effect=OSError,
-    )
-    run_nvm_cmd("/home/.nvm/.nvm.sh", "list")
+    mocked_open = mocker.patch("builtins.open")
+    run_nvm_cmd("/home/.nvm/nvm.sh", "list")
     mocked_process_run.assert_called_with(
-        "bash", f"{os.path.dirname(sys.argv[0])}/nvm_shim.sh.tmp"
+        "bash",
+        "-c",
+        'source "$0" &> /dev/null\nnvm list',
+        "/home/.nvm/nvm.sh",
+        env=None,
     )
-    captured = capsys.readouterr()
-    assert snapshot == clean_output(captured.out)
+    mocked_open.assert_not_called()
 
 
 def test_get_nvm_stable_version_returns_nothing_when_no_version_found(
     capsys, mocker, snapshot
 ):
     """Test failure handling of fetching stable version from nvm"""
-    mocked_process_run = mocker.patch(
-        "nvshim.core.__main__.process.run",
+    mocked_process_stream = mocker.patch(
+        "nvshim.core.__main__.process.stream",
         autospec=True,
-        return_value=subprocess.CompletedProcess(None, 1),
+        return_value=iter([]),
     )
     assert get_nvm_stable_version("/home/.nvm") is None
-    mocked_process_run.assert_called_with(
+    mocked_process_stream.assert_called_with(
         "bash",
-        f"{os.path.dirname(sys.argv[0])}/nvm_shim.sh.tmp",
-        stdout=subprocess.PIPE,
+        "-c",
+        'source "$0" &> /dev/null\nnvm alias stable --no-colors',
+        "/home/.nvm/nvm.sh",
+        env=None,
     )
     captured = capsys.readouterr()
     assert snapshot == clean_output(captured.out)
@@ -208,20 +227,50 @@ def test_get_nvm_stable_version_returns_correctly_when_no_version_found(mocker):
     """Test correct handling of fetching alias version from nvm"""
     test_nvm_dir = "/home/.nvm"
     expected_version = "17.8.0"
-    mocked_run_nvm_cmd = mocker.patch(
-        "nvshim.core.__main__.run_nvm_cmd",
+    mocked_stream_nvm_cmd = mocker.patch(
+        "nvshim.core.__main__.stream_nvm_cmd",
         autospec=True,
-        return_value=subprocess.CompletedProcess(
-            None, 0, f"stable -> 17.8 (-> v{expected_version}) (default)\n"
-        ),
+        return_value=iter([f"stable -> 17.8 (-> v{expected_version}) (default)\n"]),
     )
     assert get_nvm_aliases(test_nvm_dir) == {
         "default": "stable",
         "stable": expected_version,
     }
-    mocked_run_nvm_cmd.assert_called_with(
-        f"{test_nvm_dir}/nvm.sh", "alias  --no-colors", stdout=subprocess.PIPE
+    mocked_stream_nvm_cmd.assert_called_with(
+        f"{test_nvm_dir}/nvm.sh", "alias  --no-colors"
+    )
+
+
+def test_get_nvm_stable_version_stops_nvm_once_alias_is_listed(mocker):
+    """Test nvm output is read only until the stable alias is found"""
+    read_lines = []
+
+    def nvm_alias_output(*_):
+        for line in ["", "stable -> 17.8 (-> v17.8.0)", "unstable -> N/A (default)"]:
+            read_lines.append(line)
+            yield f"{line}\n"
+
+    mocker.patch(
+        "nvshim.core.__main__.stream_nvm_cmd",
+        autospec=True,
+        side_effect=nvm_alias_output,
     )
+    assert get_nvm_stable_version("/home/.nvm/stopped") == "17.8.0"
+    assert read_lines == ["", "stable -> 17.8 (-> v17.8.0)"]
+
+
+def test_stream_nvm_cmd_yields_lines_as_printed(tmp_path):
+    """Test nvm output lines are yielded as produced and nvm is stopped on close"""
+    nvm_sh_path = tmp_path / "nvm.sh"
+    nvm_sh_path.write_text('nvm() { echo "$1 -> 1"; echo "$2 -> 2"; sleep 10; }\n')
+    lines = stream_nvm_cmd(str(nvm_sh_path), "first second")
+    started = time.monotonic()
+    assert [*parse_alias_versions([next(lines), next(lines)])] == [
+        ("first", "1", None),
+        ("second", "2", None),
+    ]
+    lines.close()
+    assert time.monotonic() - started < 5
 
 
 def test_parse_version_handles_none_case():
@@ -240,9 +289,9 @@ def test_get_nvmrc_uses_raw_value_when_not_parseable(test_workspace):
 
 def test_resolve_alias_handles_cycles():
     """Test that resolving aliases can handle recursive references"""
-    mock_alias_mappings = HashableDict({"a": "b", "b": "c", "c": "a"})
+    mock_alias_mappings = {"a": "b", "b": "c", "c": "a"}
     result = resolve_alias("a", mock_alias_mappings)
-    assert result == (None, "a", HashableList(["a", "b", "c"]))
+    assert result == (None, "a", ["a", "b", "c"])
 
 
 def test_parse_version_returns_correct_values():
@@ -252,8 +301,8 @@ def test_parse_version_returns_correct_values():
     assert parse_version("v1") is None
     assert parse_version("v1.0") is None
     assert parse_version("v1.0") is None
-    assert parse_version("1.0.0") == semver.VersionInfo(1, 0, 0)
-    assert parse_version("v1.0.0") == semver.VersionInfo(1, 0, 0)
+    assert parse_version("1.0.0") == Version(1, 0, 0)
+    assert parse_version("v1.0.0") == Version(1, 0, 0)
 
 
 def test_match_version_returns_correct_value():
@@ -262,7 +311,726 @@ def test_match_version_returns_correct_value():
     assert match_version("alias", version_set) is None
     assert match_version("", version_set) is None
     assert match_version("3", version_set) is None
-    assert match_version("2", version_set) == semver.VersionInfo.parse("2.0.0")
-    assert match_version("1", version_set) == semver.VersionInfo.parse("1.1.0")
-    assert match_version("1.0", version_set) == semver.VersionInfo.parse("1.0.1")
-    assert match_version("0", version_set) == semver.VersionInfo.parse("0.0.1")
+    assert match_version("2", version_set) == Version(2, 0, 0)
+    assert match_version("1", version_set) == Version(1, 1, 0)
+    assert match_version("1.0", version_set) == Version(1, 0, 1)
+    assert match_version("0", version_set) == Version(0, 0, 1)
+    assert match_version("v1.0.0", version_set) == Version(1, 0, 0)
+    assert match_version("^1.0.1", version_set) == Version(1, 1, 0)
+    assert match_version("~1.0", version_set) == Version(1, 0, 1)
+    assert match_version(">=0.0.1 <1.1", version_set) == Version(1, 0, 1)
+    assert match_version("0.x || 1.0", version_set) == Version(1, 0, 1)
+
+
+def test_main_reuses_cached_resolution(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir
+):
+    """Test resolution is cached across runs while nvm folders are unchanged"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    mocked_alias_mapping = mocker.patch(
+        "nvshim.core.__main__.get_nvm_alias_mapping",
+        wraps=get_nvm_alias_mapping,
+    )
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    mock_env = {**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}
+    with process_env(mock_env):
+        main()
+        main()
+
+    expected_bin_path = f"{test_nvm_dir}/versions/node/v14.5.0/bin/{test_args[1]}"
+    assert mocked_alias_mapping.call_count == 1
+    mocked_process_run.assert_called_with(
+        expected_bin_path, *test_args[2:], env=mocker.ANY
+    )
+
+
+def test_main_does_not_share_cached_resolution_between_nvm_dirs(
+    mocker, tmp_path, test_args, test_workspace_with_nvmrc, test_nvm_dir
+):
+    """Test nvm installations sharing a cache folder each run their own node"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    other_nvm_dir = str(tmp_path / "other_nvm")
+    shutil.copytree(test_nvm_dir, other_nvm_dir)
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    for nvm_dir in (test_nvm_dir, other_nvm_dir):
+        with process_env({**os.environ, EnvironmentVariable.NVM_DIR.value: nvm_dir}):
+            main()
+
+    assert [call[0][0] for call in mocked_process_run.call_args_list] == [
+        f"{nvm_dir}/versions/node/v14.5.0/bin/{test_args[1]}"
+        for nvm_dir in (test_nvm_dir, other_nvm_dir)
+    ]
+
+
+def test_main_caches_version_not_installed_until_installed(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir
+):
+    """Test missing version is cached and invalidated once the version is installed"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    with open(
+        f"{test_workspace_with_nvmrc}/.nvmrc", "w", encoding="UTF-8"
+    ) as open_file:
+        open_file.write("16")
+    mocked_alias_mapping = mocker.patch(
+        "nvshim.core.__main__.get_nvm_alias_mapping",
+        wraps=get_nvm_alias_mapping,
+    )
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        EnvironmentVariable.AUTO_INSTALL.value: "false",
+    }
+    with process_env(mock_env):
+        for _ in range(2):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+            assert exc_info.value.code == 1001
+        assert mocked_alias_mapping.call_count == 1
+
+        versions_dir = f"{test_nvm_dir}/versions/node"
+        shutil.copytree(f"{versions_dir}/v14.5.0", f"{versions_dir}/v16.1.0")
+        main()
+
+    assert mocked_alias_mapping.call_count == 2
+    mocked_process_run.assert_called_with(
+        f"{versions_dir}/v16.1.0/bin/{test_args[1]}", *test_args[2:], env=mocker.ANY
+    )
+
+
+def test_main_skips_cache_when_disabled(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir, test_cache_dir
+):
+    """Test resolution cache is not used when disabled"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        EnvironmentVariable.CACHE.value: "false",
+    }
+    with process_env(mock_env):
+        main()
+
+    assert not os.path.exists(test_cache_dir)
+
+
+def test_main_uses_daemon_resolution_when_available(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir, test_cache_dir
+):
+    """Test resolution is requested from the daemon before resolving in process"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    mocked_request = mocker.patch(
+        "nvshim.core.__main__.client.request_resolution",
+        autospec=True,
+        return_value=("/daemon/bin/npm", "14.5.0", "14", None),
+    )
+    mocked_resolve = mocker.patch("nvshim.core.__main__.resolve_bin_path")
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    with process_env({**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}):
+        main()
+
+    mocked_request.assert_called_once_with(
+        os.path.join(test_cache_dir, "daemon.sock"),
+        test_workspace_with_nvmrc,
+        test_args[1],
+        test_nvm_dir,
+    )
+    mocked_resolve.assert_not_called()
+    mocked_process_run.assert_called_once_with(
+        "/daemon/bin/npm", *test_args[2:], env=mocker.ANY
+    )
+
+
+@pytest.mark.parametrize("node_bin_first", [False, True])
+def test_main_replaces_process_when_requested(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir, node_bin_first
+):
+    """Test main replaces the shim process with node binary in exec launch mode"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    mocked_exec_replace = mocker.patch(
+        "nvshim.core.__main__.process.exec_replace",
+        autospec=True,
+        side_effect=SystemExit(0),
+    )
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        EnvironmentVariable.NODE_BIN_FIRST.value: str(node_bin_first).lower(),
+        EnvironmentVariable.NVM_BIN.value: "/previous/bin",
+        "PATH": "/previous/bin:/shims:/usr/bin",
+    }
+    with process_env(mock_env), pytest.raises(SystemExit):
+        main(replace_process=True)
+
+    bin_dir = f"{test_nvm_dir}/versions/node/v14.5.0/bin"
+    nvmrc_path = os.path.join(test_workspace_with_nvmrc, ".nvmrc")
+    nvmrc_mtime = os.stat(nvmrc_path).st_mtime_ns
+    expected_env = {
+        **mock_env,
+        EnvironmentVariable.RESOLVED.value: "\n".join(
+            (nvmrc_path, str(nvmrc_mtime), "14.5.0", "v14.5.0", bin_dir)
+        ),
+    }
+    if node_bin_first:
+        expected_env[EnvironmentVariable.NVM_BIN.value] = bin_dir
+        expected_env["PATH"] = f"{bin_dir}:/shims:/usr/bin"
+    mocked_exec_replace.assert_called_once_with(
+        f"{bin_dir}/{test_args[1]}", *test_args[2:], env=expected_env
+    )
+    mocked_process_run.assert_not_called()
+
+
+def test_main_reuses_resolution_passed_down_by_parent_shim(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir
+):
+    """Test nested shim reuses the parent resolution without resolving again"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    mocked_exec_replace = mocker.patch(
+        "nvshim.core.__main__.process.exec_replace",
+        autospec=True,
+        side_effect=SystemExit(0),
+    )
+    mock_env = {**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}
+    with process_env(mock_env), pytest.raises(SystemExit):
+        main(replace_process=True)
+    child_env = mocked_exec_replace.call_args[1]["env"]
+
+    mocked_request = mocker.patch(
+        "nvshim.core.__main__.client.request_resolution", autospec=True
+    )
+    mocked_resolve = mocker.patch(
+        "nvshim.core.__main__.resolve_bin_path", autospec=True
+    )
+    with process_env(child_env), pytest.raises(SystemExit):
+        main(replace_process=True)
+
+    mocked_request.assert_not_called()
+    mocked_resolve.assert_not_called()
+    assert mocked_exec_replace.call_args == mocker.call(
+        f"{test_nvm_dir}/versions/node/v14.5.0/bin/{test_args[1]}",
+        *test_args[2:],
+        env=child_env,
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    ["nvmrc", "nvm_dir", "bin_file", "missing_nvmrc", "malformed", "no_token"],
+)
+def test_resolve_bin_path_from_token_falls_back_when_token_is_invalid(
+    tmp_path, test_workspace_with_nvmrc, test_nvm_dir, change
+):
+    """Test passed down resolution is only reused while it is still valid"""
+    bin_path = f"{test_nvm_dir}/versions/node/v14.5.0/bin/node"
+    nvmrc_path = os.path.join(test_workspace_with_nvmrc, ".nvmrc")
+    token = get_resolved_token(bin_path, "14.5.0", "v14.5.0", nvmrc_path)
+    args = [token, test_workspace_with_nvmrc, "node", test_nvm_dir]
+    assert resolve_bin_path_from_token(*args) == (
+        bin_path,
+        "14.5.0",
+        "v14.5.0",
+        nvmrc_path,
+    )
+
+    if change == "nvmrc":
+        nvmrc_mtime = os.stat(nvmrc_path).st_mtime_ns
+        os.utime(nvmrc_path, ns=(nvmrc_mtime, nvmrc_mtime + 1))
+    elif change == "nvm_dir":
+        args[3] = str(tmp_path / "other_nvm")
+    elif change == "bin_file":
+        args[2] = "yarn"
+    elif change == "missing_nvmrc":
+        args[1] = str(tmp_path)
+    elif change == "malformed":
+        args[0] = str(token).replace("\n", ":")
+    else:
+        args[0] = get_resolved_token(bin_path, "14.5.0", "default", None)
+    assert resolve_bin_path_from_token(*args) is None
+
+
+def test_main_appends_trace_before_replacing_process(
+    mocker, tmp_path, test_args, test_workspace_with_nvmrc, test_nvm_dir
+):
+    """Test each invocation is traced with its phases and flushed before exec"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    trace_path = tmp_path / "trace.jsonl"
+
+    def exec_replace(*_, **__):
+        assert trace_path.exists()
+        raise SystemExit(0)
+
+    mocked_exec_replace = mocker.patch(
+        "nvshim.core.__main__.process.exec_replace",
+        autospec=True,
+        side_effect=exec_replace,
+    )
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        EnvironmentVariable.TRACE.value: str(trace_path),
+    }
+    with process_env(mock_env):
+        for _ in range(2):
+            with pytest.raises(SystemExit) as exc_info:
+                main(replace_process=True)
+            assert exc_info.value.code == 0
+
+    expected_bin_path = f"{test_nvm_dir}/versions/node/v14.5.0/bin/{test_args[1]}"
+    assert mocked_exec_replace.call_count == 2
+    traces = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert len(traces) == 2
+    assert [entry["cache"] for entry in traces] == ["miss", "hit"]
+    assert sorted(traces[0]["phases"]) == [
+        "aliases",
+        "bin_path",
+        "cache",
+        "daemon",
+        "inherited",
+        "nvmrc",
+        "resolve",
+        "versions",
+    ]
+    assert sorted(traces[1]["phases"]) == [
+        "bin_path",
+        "cache",
+        "daemon",
+        "inherited",
+        "nvmrc",
+    ]
+    assert traces[0]["alias_chain"] == []
+    for entry in traces:
+        assert entry["daemon"] is False
+        assert entry["bin_path"] == expected_bin_path
+        assert entry["version"] == "14.5.0"
+        assert entry["subprocesses"] == []
+        assert "exit_code" not in entry
+
+
+def _parse_versions(*versions):
+    return [parse_version(version) for version in versions]
+
+
+def test_get_stable_version_follows_nvm_rules():
+    """Test stable version is the latest release with only even minor 0.x releases"""
+    assert get_stable_version([]) is None
+    assert get_stable_version(_parse_versions("0.11.16", "0.12.18")) == "0.12.18"
+    assert get_stable_version(_parse_versions("0.11.16")) is None
+    assert get_stable_version(_parse_versions("0.12.18", "14.5.0", "5.1.1")) == "14.5.0"
+
+
+def test_get_nvm_alias_mapping_resolves_stable_without_nvm(mocker, test_nvm_dir):
+    """Test stable, node and default aliases are resolved from installed versions"""
+    mocked_run_nvm_cmd = mocker.patch("nvshim.core.__main__.run_nvm_cmd", autospec=True)
+    os.remove(f"{test_nvm_dir}/alias/default")
+    alias_mapping = get_nvm_alias_mapping(test_nvm_dir)
+    stable = alias_mapping["stable"]
+    assert alias_mapping["node"] == alias_mapping["default"] == "stable"
+    assert callable(stable) and stable() == "14.5.0"
+    mocked_run_nvm_cmd.assert_not_called()
+
+
+def test_get_nvm_alias_mapping_resolves_iojs_without_nvm(mocker, capsys, test_nvm_dir):
+    """Test iojs alias is resolved from installed io.js versions"""
+    mocked_run_nvm_cmd = mocker.patch("nvshim.core.__main__.run_nvm_cmd", autospec=True)
+    iojs = get_nvm_alias_mapping(test_nvm_dir)["iojs"]
+    assert callable(iojs) and iojs() is None
+    assert "Unable to retrieve iojs version" in clean_output(capsys.readouterr().out)
+    os.makedirs(f"{test_nvm_dir}/versions/io.js/v3.3.1")
+    os.makedirs(f"{test_nvm_dir}/versions/io.js/v2.5.0")
+    assert iojs() == "iojs-v3.3.1"
+    mocked_run_nvm_cmd.assert_not_called()
+
+
+def test_get_nvm_alias_mapping_falls_back_to_nvm_when_enabled(
+    mocker, capsys, test_nvm_dir
+):
+    """Test stable alias is only resolved by running nvm when fallback is enabled"""
+    mocked_nvm_stable_version = mocker.patch(
+        "nvshim.core.__main__.get_nvm_stable_version",
+        autospec=True,
+        return_value="17.8.0",
+    )
+    shutil.rmtree(f"{test_nvm_dir}/versions/node")
+    stable = get_nvm_alias_mapping(test_nvm_dir)["stable"]
+    assert callable(stable)
+    with process_env({**os.environ, EnvironmentVariable.NVM_FALLBACK.value: "0"}):
+        assert stable() is None
+    mocked_nvm_stable_version.assert_not_called()
+    assert "Unable to retrieve stable version" in clean_output(capsys.readouterr().out)
+    with process_env({**os.environ, EnvironmentVariable.NVM_FALLBACK.value: "1"}):
+        assert stable() == "17.8.0"
+    mocked_nvm_stable_version.assert_called_once_with(test_nvm_dir)
+
+
+@pytest.fixture
+def test_nvm_dir_with_lts(test_nvm_dir):
+    """Add lts aliases as written by nvm with some of the release lines installed"""
+    lts_versions = {"gallium": "v16.20.2", "hydrogen": "v18.20.8", "iron": "v20.19.5"}
+    os.makedirs(f"{test_nvm_dir}/alias/lts")
+    for name, version in lts_versions.items():
+        Path(f"{test_nvm_dir}/alias/lts/{name}").write_text(
+            f"{version}\n", encoding="UTF-8"
+        )
+    Path(f"{test_nvm_dir}/alias/lts/*").write_text("lts/iron\n", encoding="UTF-8")
+    for version in ("v16.20.2", "v20.19.5"):
+        os.makedirs(f"{test_nvm_dir}/versions/node/{version}/bin")
+    return test_nvm_dir
+
+
+@pytest.mark.parametrize(
+    "rc_version,expected",
+    [
+        ("lts/*", ("20.19.5", True)),
+        ("lts/iron", ("20.19.5", True)),
+        ("lts/-1", ("18.20.8", False)),
+        ("lts/-2", ("16.20.2", True)),
+        ("lts/-3", ("lts/-3", False)),
+        ("lts/argon", ("lts/argon", False)),
+    ],
+)
+def test_resolve_version_resolves_lts_aliases_without_nvm(
+    mocker, test_nvm_dir_with_lts, rc_version, expected
+):
+    """Test lts aliases are resolved from the alias folder and installed versions"""
+    mocked_subprocess_run = mocker.patch("subprocess.run")
+    nvm_dir = test_nvm_dir_with_lts
+    assert (
+        resolve_version(
+            version_alias=rc_version,
+            nvm_aliases=get_nvm_alias_mapping(nvm_dir),
+            node_versions=get_node_versions(f"{nvm_dir}/versions/node"),
+        )
+        == expected
+    )
+    mocked_subprocess_run.assert_not_called()
+
+
+def test_get_nvm_alias_mapping_derives_latest_lts_without_star_alias(
+    test_nvm_dir_with_lts,
+):
+    """Test lts/* is derived from the latest lts alias when nvm did not write it"""
+    os.remove(f"{test_nvm_dir_with_lts}/alias/lts/*")
+    assert get_nvm_alias_mapping(test_nvm_dir_with_lts)["lts/*"] == "lts/iron"
+
+
+def test_main_invalidates_cached_relative_lts_alias(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir_with_lts
+):
+    """Test cached lts/-N resolution is invalidated when a new lts line is added"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    nvm_dir = test_nvm_dir_with_lts
+    Path(f"{test_workspace_with_nvmrc}/.nvmrc").write_text("lts/-1", encoding="UTF-8")
+    for version in ("v16.20.2", "v20.19.5"):
+        Path(f"{nvm_dir}/versions/node/{version}/bin/{test_args[1]}").touch()
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    with process_env({**os.environ, EnvironmentVariable.NVM_DIR.value: nvm_dir}):
+        Path(f"{nvm_dir}/alias/lts/hydrogen").unlink()
+        main()
+        Path(f"{nvm_dir}/alias/lts/hydrogen").write_text("v18.20.8\n", encoding="UTF-8")
+        Path(f"{nvm_dir}/alias/lts/jod").write_text("v22.20.0\n", encoding="UTF-8")
+        main()
+
+    assert mocked_process_run.call_args_list == [
+        mocker.call(
+            f"{nvm_dir}/versions/node/{version}/bin/npm", *test_args[2:], env=mocker.ANY
+        )
+        for version in ("v16.20.2", "v20.19.5")
+    ]
+
+
+def test_split_args_keeps_argument_order():
+    """Test binary arguments are passed through in the order given"""
+    assert split_args(["node", "--inspect", "app.js", "-p"]) == (
+        "node",
+        ["--inspect", "app.js", "-p"],
+    )
+    with pytest.raises(SystemExit):
+        split_args([])
+
+
+@pytest.mark.parametrize(
+    "versions", [["16"] * 8, ["16", "16.0", "16.0.0", "^16", "16", "16.0", "16", "v16"]]
+)
+def test_install_version_installs_once_across_concurrent_shims(
+    mocker, capsys, test_nvm_dir, versions
+):
+    """Test concurrent installs of versions of the same release wait on a single install"""
+    node_versions_dir = os.path.join(test_nvm_dir, "versions", "node")
+
+    def nvm_install(*_, **__):
+        time.sleep(0.2)
+        os.makedirs(os.path.join(node_versions_dir, "v16.0.0", "bin"))
+
+    mocked_get_install_target = mocker.patch(
+        "nvshim.core.__main__.get_install_target", return_value="16.0.0"
+    )
+    mocked_run_nvm_cmd = mocker.patch(
+        "nvshim.core.__main__.run_nvm_cmd", side_effect=nvm_install
+    )
+
+    def install(version):
+        return install_version(
+            version=version,
+            node_versions_dir=node_versions_dir,
+            nvm_sh_path=os.path.join(test_nvm_dir, "nvm.sh"),
+        )
+
+    with process_env({**os.environ, EnvironmentVariable.VERBOSE.value: "true"}):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            installed_versions = [*executor.map(install, versions)]
+
+    assert installed_versions == [Version(16, 0, 0)] * 8
+    assert mocked_get_install_target.call_count == 8
+    mocked_run_nvm_cmd.assert_called_once_with(
+        os.path.join(test_nvm_dir, "nvm.sh"), "install 16.0.0"
+    )
+    output = clean_output(capsys.readouterr().out)
+    assert output.count("to be installed") == 7
+
+
+def test_install_version_does_not_reuse_other_release_of_range(mocker, test_nvm_dir):
+    """Test the release the range resolves to is installed over other matching releases"""
+    node_versions_dir = os.path.join(test_nvm_dir, "versions", "node")
+    os.makedirs(os.path.join(node_versions_dir, "v16.1.0", "bin"))
+
+    def nvm_install(*_, **__):
+        os.makedirs(os.path.join(node_versions_dir, "v16.2.0", "bin"))
+
+    mocker.patch("nvshim.core.__main__.get_install_target", return_value="16.2.0")
+    mocked_run_nvm_cmd = mocker.patch(
+        "nvshim.core.__main__.run_nvm_cmd", side_effect=nvm_install
+    )
+    installed_version = install_version(
+        version="16",
+        node_versions_dir=node_versions_dir,
+        nvm_sh_path=os.path.join(test_nvm_dir, "nvm.sh"),
+    )
+
+    assert installed_version == Version(16, 2, 0)
+    mocked_run_nvm_cmd.assert_called_once_with(
+        os.path.join(test_nvm_dir, "nvm.sh"), "install 16.2.0"
+    )
+
+
+def test_get_install_target_uses_remote_version_listed_by_nvm(mocker, test_nvm_dir):
+    """Test the release to install is the remote version nvm resolves the range to"""
+    mocked_stream_nvm_cmd = mocker.patch(
+        "nvshim.core.__main__.stream_nvm_cmd",
+        side_effect=lambda *_: (line for line in ["v16.20.2\n"]),
+    )
+    nvm_sh_path = os.path.join(test_nvm_dir, "nvm.sh")
+    assert get_install_target("16", nvm_sh_path) == "16.20.2"
+    mocked_stream_nvm_cmd.assert_called_once_with(nvm_sh_path, "version-remote 16")
+
+    mocked_stream_nvm_cmd.side_effect = lambda *_: (line for line in ["N/A\n"])
+    assert get_install_target("99", nvm_sh_path) is None
+
+
+def test_install_version_gives_up_waiting_after_timeout(mocker, capsys, test_nvm_dir):
+    """Test waiting for another install is bounded and falls back to installed versions"""
+    node_versions_dir = os.path.join(test_nvm_dir, "versions", "node")
+    mocker.patch("nvshim.core.__main__.get_install_target", return_value="16.0.0")
+    mocked_run_nvm_cmd = mocker.patch("nvshim.core.__main__.run_nvm_cmd")
+    mock_env = {**os.environ, EnvironmentVariable.INSTALL_LOCK_TIMEOUT.value: "0.1"}
+    lock_path = get_install_lock_path("16.0.0", node_versions_dir)
+    with file_lock(lock_path, timeout=1), process_env(mock_env):
+        installed_version = install_version(
+            version="16",
+            node_versions_dir=node_versions_dir,
+            nvm_sh_path=os.path.join(test_nvm_dir, "nvm.sh"),
+        )
+
+    assert installed_version is None
+    mocked_run_nvm_cmd.assert_not_called()
+    assert "Timed out after 0.1s waiting for version <16>" in clean_output(
+        capsys.readouterr().out
+    )
+
+
+def test_main_auto_installs_from_mirror(
+    mocker, test_args, test_workspace_with_nvmrc, test_nvm_dir, test_mirror
+):
+    """Test missing version is installed from the mirror without running nvm"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    with open(
+        f"{test_workspace_with_nvmrc}/.nvmrc", "w", encoding="UTF-8"
+    ) as open_file:
+        open_file.write("16")
+    mocker.patch(
+        "nvshim.utils.installer.get_archive_platform", return_value="linux-x64"
+    )
+    mocked_run_nvm_cmd = mocker.patch("nvshim.core.__main__.run_nvm_cmd")
+    mocked_process_run = mocker.patch("nvshim.core.__main__.process.run", autospec=True)
+    test_args[1] = "node"
+    mirror_dir = test_mirror(["16.1.0", "16.2.0", "17.0.0"])
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        EnvironmentVariable.AUTO_INSTALL.value: "true",
+        EnvironmentVariable.MIRROR.value: Path(mirror_dir).as_uri(),
+    }
+    with process_env(mock_env):
+        main()
+
+    mocked_run_nvm_cmd.assert_not_called()
+    mocked_process_run.assert_called_once_with(
+        f"{test_nvm_dir}/versions/node/v16.2.0/bin/node", *test_args[2:], env=mocker.ANY
+    )
+
+
+def test_main_fails_to_auto_install_corrupted_mirror_archive(
+    mocker, capsys, test_args, test_workspace_with_nvmrc, test_nvm_dir, test_mirror
+):
+    """Test version is not installed when the mirror archive checksum does not match"""
+    mocker.patch(
+        "nvshim.core.__main__.os.getcwd",
+        autospec=True,
+        return_value=test_workspace_with_nvmrc,
+    )
+    with open(
+        f"{test_workspace_with_nvmrc}/.nvmrc", "w", encoding="UTF-8"
+    ) as open_file:
+        open_file.write("16")
+    mocker.patch(
+        "nvshim.utils.installer.get_archive_platform", return_value="linux-x64"
+    )
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        EnvironmentVariable.AUTO_INSTALL.value: "true",
+        EnvironmentVariable.MIRROR.value: test_mirror(["16.1.0"], corrupt=["16.1.0"]),
+    }
+    with process_env(mock_env), pytest.raises(SystemExit) as exc_info:
+        main()
+
+    assert exc_info.value.code == ErrorCode.VERSION_NOT_INSTALLED
+    output = clean_output(capsys.readouterr().out)
+    assert "Unable to install 'node-v16.1.0-linux-x64.tar.xz'" in output
+    assert os.listdir(f"{test_nvm_dir}/versions/node") == ["v14.5.0"]
+
+
+def test_get_nvm_snapshot_is_rebuilt_only_when_nvm_folders_change(mocker, test_nvm_dir):
+    """Test snapshot file is reused until an alias or installed version changes"""
+    mocked_listdir = mocker.spy(os, "listdir")
+    snapshot = get_nvm_snapshot(test_nvm_dir)
+    assert snapshot["aliases"] == {"default": "14"}
+    assert snapshot["versions"] == [(14, 5, 0, None, None)]
+    assert os.path.exists(os.path.join(test_nvm_dir, ".nvshim.snapshot"))
+    assert mocked_listdir.call_count == 1
+
+    assert get_nvm_snapshot(test_nvm_dir)["aliases"] == snapshot["aliases"]
+    assert mocked_listdir.call_count == 1
+
+    alias_path = os.path.join(test_nvm_dir, "alias", "default")
+    with open(alias_path, "w", encoding="UTF-8") as alias_file:
+        alias_file.write("16")
+    alias_mtime = os.stat(alias_path).st_mtime_ns
+    os.utime(alias_path, ns=(alias_mtime, alias_mtime + 1))
+    assert get_nvm_snapshot(test_nvm_dir)["aliases"] == {"default": "16"}
+
+    versions_dir = os.path.join(test_nvm_dir, "versions", "node")
+    os.makedirs(os.path.join(versions_dir, "v16.1.0"))
+    assert get_nvm_snapshot(test_nvm_dir)["versions"] == [
+        (14, 5, 0, None, None),
+        (16, 1, 0, None, None),
+    ]
+    call_count = mocked_listdir.call_count
+    assert get_nvm_snapshot(test_nvm_dir)["versions"] == [
+        (14, 5, 0, None, None),
+        (16, 1, 0, None, None),
+    ]
+    assert mocked_listdir.call_count == call_count
+
+    version_mtime = os.stat(os.path.join(versions_dir, "v16.1.0")).st_mtime_ns
+    os.makedirs(os.path.join(versions_dir, "v16.1.0", "bin"))
+    os.utime(
+        os.path.join(versions_dir, "v16.1.0"),
+        ns=(version_mtime, version_mtime + 1),
+    )
+    get_nvm_snapshot(test_nvm_dir)
+    assert mocked_listdir.call_count == call_count + 1
+
+
+def test_get_nvm_snapshot_is_not_stored_when_cache_disabled(test_nvm_dir):
+    """Test snapshot is read from the nvm folders every time when caching is disabled"""
+    with process_env({**os.environ, EnvironmentVariable.CACHE.value: "false"}):
+        assert get_nvm_snapshot(test_nvm_dir)["aliases"] == {"default": "14"}
+    assert not os.path.exists(os.path.join(test_nvm_dir, ".nvshim.snapshot"))
+
+
+def test_get_local_stable_version_reads_versions_from_snapshot(mocker, test_nvm_dir):
+    """Test stable version is found from the snapshot without listing node versions"""
+    versions_dir = os.path.join(test_nvm_dir, "versions", "node")
+    for version in ("v0.11.16", "v0.12.18"):
+        os.makedirs(os.path.join(versions_dir, version, "bin"))
+    get_nvm_snapshot(test_nvm_dir)
+    mocked_listdir = mocker.spy(os, "listdir")
+    assert get_local_stable_version(test_nvm_dir) == "14.5.0"
+    assert mocked_listdir.call_count == 0
+
+    shutil.rmtree(os.path.join(versions_dir, "v14.5.0"))
+    assert get_local_stable_version(test_nvm_dir) == "0.12.18"
+
+
+def test_get_nvmrc_path_uses_configured_version_files(monkeypatch, tmp_path):
+    """Test version files are looked up in the precedence set in the environment"""
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (tmp_path / ".nvmrc").write_text("14")
+    (project_dir / ".node-version").write_text("v16.1.0\n")
+    (project_dir / "package.json").write_text('{"engines": {"node": "^18"}}')
+    monkeypatch.delenv(EnvironmentVariable.VERSION_FILES.value, raising=False)
+
+    nvmrc_path = get_nvmrc_path(str(project_dir))
+    assert nvmrc_path == str(project_dir / ".node-version")
+    assert get_nvmrc(nvmrc_path) == "v16.1.0"
+
+    monkeypatch.setenv(EnvironmentVariable.VERSION_FILES.value, "package.json,.nvmrc")
+    nvmrc_path = get_nvmrc_path(str(project_dir))
+    assert nvmrc_path == str(project_dir / "package.json")
+    assert get_nvmrc(nvmrc_path) == "^18"
+
+    monkeypatch.setenv(EnvironmentVariable.VERSION_FILES.value, ".nvmrc")
+    assert get_nvmrc_path(str(project_dir)) == str(tmp_path / ".nvmrc")
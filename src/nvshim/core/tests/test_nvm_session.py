@@ -0,0 +1,189 @@
+"""Test persistent nvm bash sessions and their clients"""
+import io
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import nvshim.core.__main__ as core
+from nvshim.core import nvm_session
+from nvshim.utils.environment import EnvironmentVariable
+
+NVM_SH = """
+nvm() {
+    case "$1" in
+        fail) echo "failed $2" >&2; return 4 ;;
+        hang) echo "$BASHPID" > "$2"; echo started; sleep 30 ;;
+        use) PATH="/used:$PATH"; echo used ;;
+        env) echo "$2=${!2}" ;;
+        *) echo "nvm $* in $PWD"; echo "session $$"; printf 'partial' ;;
+    esac
+}
+"""
+
+
+@pytest.fixture
+def test_socket_dir():
+    """Use a short folder for unix sockets"""
+    socket_dir = tempfile.mkdtemp(prefix="nvshim")
+    yield socket_dir
+    shutil.rmtree(socket_dir)
+
+
+@pytest.fixture
+def test_nvm_sh(tmp_path):
+    """Prepare nvm.sh with a fake nvm command"""
+    nvm_sh_path = tmp_path / "nvm.sh"
+    nvm_sh_path.write_text(NVM_SH)
+    return str(nvm_sh_path)
+
+
+@pytest.fixture
+def test_server(test_socket_dir, test_nvm_sh):
+    """Run the nvm session server for the test"""
+    server = nvm_session.NvmSessionServer(
+        os.path.join(test_socket_dir, "s.sock"), test_nvm_sh, 60
+    )
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+def _request(server, nvm_args, cwd="/"):
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    exit_code = nvm_session.request_nvm_cmd(
+        server.socket_path, cwd, nvm_args, stdout, stderr
+    )
+    return exit_code, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+
+def test_session_runs_commands_in_loaded_bash(test_server, tmp_path):
+    """Test commands share one bash with output, errors and exit codes relayed"""
+    exit_code, first, _ = _request(test_server, "ls --no-colors", str(tmp_path))
+    assert exit_code == 0
+    assert first.startswith(f"nvm ls --no-colors in {tmp_path}\n")
+    assert first.endswith("partial")
+
+    assert _request(test_server, "use 14") == (0, "used\n", "")
+    assert _request(test_server, "fail 16") == (4, "", "failed 16\n")
+    assert _request(test_server, "current")[1] == first.replace(
+        f"ls --no-colors in {tmp_path}", "current in /"
+    )
+
+
+def test_session_runs_concurrent_commands(test_server):
+    """Test concurrent commands each get their own output"""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = [*executor.map(lambda i: _request(test_server, str(i)), range(8))]
+
+    assert [result[1].splitlines()[0] for result in results] == [
+        f"nvm {index} in /" for index in range(8)
+    ]
+    assert all(result[0] == 0 for result in results)
+
+
+def test_session_stops_command_when_client_disconnects(test_server, tmp_path):
+    """Test a command is stopped when its client goes away"""
+    pid_path = tmp_path / "pid"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(test_server.socket_path)
+        connection.sendall(f"/\0hang {pid_path}\n".encode())
+        assert connection.recv(4096).endswith(b"started\n")
+
+    pid = int(pid_path.read_text())
+    started = time.monotonic()
+    with pytest.raises(ProcessLookupError):
+        while time.monotonic() - started < 5:
+            os.kill(pid, 0)
+            time.sleep(0.05)
+    assert _request(test_server, "next")[0] == 0
+
+
+def test_session_stops_when_idle(test_socket_dir, test_nvm_sh):
+    """Test the server stops and removes its socket after the idle timeout"""
+    server = nvm_session.NvmSessionServer(
+        os.path.join(test_socket_dir, "s.sock"), test_nvm_sh, 0.2
+    )
+    started = time.monotonic()
+    server.serve_forever(0.05)
+    assert time.monotonic() - started < 5
+    assert not os.path.exists(server.socket_path)
+    assert _request(server, "ls") == (None, "", "")
+
+
+def test_run_nvm_cmd_starts_and_reuses_session(
+    capfd, monkeypatch, test_socket_dir, test_nvm_sh
+):
+    """Test nvm commands start a session in the background when enabled"""
+    monkeypatch.setenv(EnvironmentVariable.NVM_SESSION.value, "1")
+    monkeypatch.setenv(EnvironmentVariable.CACHE_DIR.value, test_socket_dir)
+    socket_path = nvm_session.get_socket_path(test_nvm_sh)
+
+    assert core.run_nvm_cmd(test_nvm_sh, "ls").returncode == 0
+    assert core.run_nvm_cmd(test_nvm_sh, "ls").returncode == 0
+    with pytest.raises(SystemExit) as exc_info:
+        core.run_nvm_cmd(test_nvm_sh, "fail 16")
+
+    assert exc_info.value.code == 4
+    captured = capfd.readouterr()
+    assert len({line for line in captured.out.split() if line.isdigit()}) == 1
+    assert "failed 16" in captured.err
+    started = time.monotonic()
+    while os.path.exists(socket_path) and time.monotonic() - started < 10:
+        time.sleep(0.1)
+    assert not os.path.exists(socket_path)
+
+
+def test_get_socket_path_is_unique_to_environment(monkeypatch, test_nvm_sh):
+    """Test sessions are not shared between environments apart from the shell state"""
+    socket_path = nvm_session.get_socket_path(test_nvm_sh)
+    monkeypatch.setenv("PWD", "/elsewhere")
+    monkeypatch.setenv("SHLVL", "9")
+    assert nvm_session.get_socket_path(test_nvm_sh) == socket_path
+    monkeypatch.setenv("NVM_NODEJS_ORG_MIRROR", "https://mirror.test")
+    assert nvm_session.get_socket_path(test_nvm_sh) != socket_path
+    assert nvm_session.get_socket_path(test_nvm_sh, {}) != socket_path
+
+
+def test_run_nvm_cmd_runs_in_caller_environment(
+    capfd, monkeypatch, test_socket_dir, test_nvm_sh
+):
+    """Test nvm commands are not run in the environment of another caller's session"""
+    monkeypatch.setenv(EnvironmentVariable.NVM_SESSION.value, "1")
+    monkeypatch.setenv(EnvironmentVariable.CACHE_DIR.value, test_socket_dir)
+    socket_paths = []
+    for mirror in ("https://first.test", "https://second.test"):
+        monkeypatch.setenv("NVM_NODEJS_ORG_MIRROR", mirror)
+        socket_paths.append(nvm_session.get_socket_path(test_nvm_sh))
+        assert (
+            core.run_nvm_cmd(test_nvm_sh, "env NVM_NODEJS_ORG_MIRROR").returncode == 0
+        )
+
+    assert capfd.readouterr().out.splitlines() == [
+        "NVM_NODEJS_ORG_MIRROR=https://first.test",
+        "NVM_NODEJS_ORG_MIRROR=https://second.test",
+    ]
+    started = time.monotonic()
+    while any(map(os.path.exists, socket_paths)) and time.monotonic() - started < 10:
+        time.sleep(0.1)
+    assert not any(map(os.path.exists, socket_paths))
+
+
+def test_marked_output_relays_output_split_around_markers():
+    """Test output is relayed as read while markers split across reads are held"""
+    marked = nvm_session._MarkedOutput(  # pylint: disable=protected-access
+        1, nvm_session.FRAME_STDOUT, b"#mark#", 2
+    )
+    assert marked.feed(b"a#") == b"a"
+    assert marked.feed(b"mark#12\nb#ma") == b"b"
+    assert marked.values == [b"12"]
+    assert marked.feed(b"rk") == b""
+    assert marked.feed(b"#0\n") == b""
+    assert marked.done and marked.values == [b"12", b"0"]
@@ -0,0 +1,83 @@
+"""Test resolving node executables with reusable nvm state"""
+import os
+
+import nvshim.core.__main__ as core
+from nvshim.core.resolver import Resolver
+from nvshim.utils import version_file
+
+
+def test_resolver_resolves_installed_bin_path(test_nvm_dir, tmp_path):
+    """Test resolution of the executable for a folder with a .nvmrc file"""
+    project_dir = tmp_path / "project"
+    (project_dir / "nested").mkdir(parents=True)
+    (project_dir / ".nvmrc").write_text("default")
+    resolution = Resolver(test_nvm_dir).resolve(str(project_dir / "nested"), "npm")
+    assert resolution.rc_version == "default"
+    assert resolution.version == "14.5.0"
+    assert resolution.version_installed
+    assert resolution.nvmrc_path == str(project_dir / ".nvmrc")
+    assert resolution.bin_path == os.path.join(
+        test_nvm_dir, "versions", "node", "v14.5.0", "bin", "npm"
+    )
+
+
+def test_resolver_resolves_missing_bin_path_to_none(test_nvm_dir, tmp_path):
+    """Test resolution without an executable when not installed or not found"""
+    (tmp_path / ".nvmrc").write_text("16")
+    resolver = Resolver(test_nvm_dir)
+    resolution = resolver.resolve(str(tmp_path), "node")
+    assert resolution.version == "16" and not resolution.version_installed
+    assert resolution.bin_path is None
+    (tmp_path / ".nvmrc").write_text("14")
+    resolver.invalidate_nvmrc()
+    resolution = resolver.resolve(str(tmp_path), "yarn")
+    assert resolution.version_installed and resolution.bin_path is None
+
+
+def test_resolver_reuses_state_until_invalidated(mocker, test_nvm_dir, tmp_path):
+    """Test nvm state and .nvmrc lookups are loaded once until invalidated"""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / ".nvmrc").write_text("14")
+    lookups = []
+    resolver = Resolver(test_nvm_dir, on_nvmrc_lookup=lookups.append)
+    mocked_listing = mocker.spy(version_file, "get_dir_version_file")
+    resolver.resolve(str(tmp_path / "a"), "node")
+    resolver.resolve(str(tmp_path / "b"), "node")
+    resolver.resolve(str(tmp_path / "a"), "node")
+    assert [call[0][0] for call in mocked_listing.call_args_list] == [
+        str(tmp_path / "a"),
+        str(tmp_path),
+        str(tmp_path / "b"),
+    ]
+    assert lookups == [[str(tmp_path / "a"), str(tmp_path)], [str(tmp_path / "b")]]
+
+    (tmp_path / ".nvmrc").write_text("default")
+    assert resolver.resolve(str(tmp_path / "a"), "node").rc_version == "14"
+    resolver.invalidate()
+    assert resolver.resolve(str(tmp_path / "a"), "node").rc_version == "default"
+
+
+def test_resolver_reuses_resolved_versions_across_folders(
+    mocker, test_nvm_dir, tmp_path
+):
+    """Test each .nvmrc version is resolved once with its alias chain"""
+    for project in ("a", "b"):
+        (tmp_path / project).mkdir()
+        (tmp_path / project / ".nvmrc").write_text("default")
+    mocked_resolve_version = mocker.patch(
+        "nvshim.core.resolver.core.resolve_version",
+        wraps=core.resolve_version,
+    )
+    resolver = Resolver(test_nvm_dir)
+    resolutions = [
+        resolver.resolve(str(tmp_path / project), "node") for project in ("a", "b")
+    ]
+    assert [resolution.alias_chain for resolution in resolutions] == [
+        ("default",),
+        ("default",),
+    ]
+    assert mocked_resolve_version.call_count == 1
+    resolver.invalidate_aliases()
+    resolver.resolve(str(tmp_path / "a"), "node")
+    assert mocked_resolve_version.call_count == 2
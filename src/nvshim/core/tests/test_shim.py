@@ -1,9 +1,13 @@
 """Test node shim"""
+import os
+import subprocess
 import sys
+from typing import Set
 
 import pytest
 
 from nvshim.core.shim import main
+from nvshim.utils.environment import EnvironmentVariable
 
 
 @pytest.fixture
@@ -19,4 +23,105 @@ def test_shim_executes_with_args(mocker, test_shim_args):
     """Test that the shim passes the correct args to run the main node shim logic"""
     mocked_core_main = mocker.patch("nvshim.core.shim.core.main", autospec=True)
     main()
-    mocked_core_main.assert_called_once_with()
+    mocked_core_main.assert_called_once_with(replace_process=True)
+
+
+HEAVY_MODULES = frozenset({"argparse", "colored", "json", "semver", "subprocess"})
+
+
+def _get_imported_modules(*args: str, **kwargs) -> "Set[str]":
+    result = subprocess.run(
+        (sys.executable, "-X", "importtime", *args),
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="UTF-8",
+        **kwargs,
+    )
+    return {
+        line.split("|")[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_shim_hot_path_does_not_import_heavy_modules(
+    test_workspace_with_nvmrc, test_nvm_dir
+):
+    """Test cache miss and cache hit runs only import a minimal set of modules"""
+    startup_modules = _get_imported_modules("-c", "pass")
+    script = "; ".join(
+        (
+            "import sys",
+            "sys.argv = ['/full/path/to/shim/node', '--version']",
+            "from nvshim.core.shim import main",
+            "main()",
+        )
+    )
+    env = {
+        **os.environ,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        "PYTHONPATH": os.pathsep.join(sys.path),
+    }
+    for _ in ("cache miss", "cache hit"):
+        imported_modules = _get_imported_modules(
+            "-c", script, cwd=test_workspace_with_nvmrc, env=env
+        )
+        assert "nvshim.core.shim" in imported_modules
+        heavy_modules = {
+            name
+            for name in imported_modules - startup_modules
+            if name.split(".")[0] in HEAVY_MODULES
+        }
+        assert not heavy_modules
+
+
+@pytest.mark.parametrize(
+    "node_bin_first, expected_entries",
+    [("false", ["npm", "npx", "node"]), ("true", ["npm"])],
+)
+def test_shim_is_reentered_by_nested_node_processes_unless_node_bin_first(
+    tmp_path, test_workspace_with_nvmrc, test_nvm_dir, node_bin_first, expected_entries
+):
+    """Test node run by npm run scripts goes through the shim unless node bin is first"""
+    bin_dir = os.path.join(test_nvm_dir, "versions", "node", "v14.5.0", "bin")
+    chain = {"npm": 'npx "$@"', "npx": 'node "$@"', "node": 'echo "node $@"'}
+    for name, script in chain.items():
+        with open(os.path.join(bin_dir, name), "w", encoding="UTF-8") as bin_file:
+            bin_file.write(f"#!/bin/sh\n{script}\n")
+    shims_dir = tmp_path / "shims"
+    shims_dir.mkdir()
+    entries_path = tmp_path / "entries"
+    for name in chain:
+        shim_path = shims_dir / name
+        shim_path.write_text(
+            "\n".join(
+                (
+                    f"#!{sys.executable}",
+                    f"with open({str(entries_path)!r}, 'a') as entries:",
+                    f"    entries.write('{name}\\n')",
+                    "from nvshim.core.shim import main",
+                    "main()",
+                )
+            )
+        )
+        shim_path.chmod(0o755)
+    env = {
+        **os.environ,
+        EnvironmentVariable.NODE_BIN_FIRST.value: node_bin_first,
+        EnvironmentVariable.NVM_DIR.value: test_nvm_dir,
+        "PATH": os.pathsep.join((str(shims_dir), "/usr/bin", "/bin")),
+        "PYTHONPATH": os.pathsep.join(sys.path),
+    }
+    env.pop(EnvironmentVariable.NVM_BIN.value, None)
+    result = subprocess.run(
+        ("npm", "run", "build"),
+        check=True,
+        cwd=test_workspace_with_nvmrc,
+        env=env,
+        stdout=subprocess.PIPE,
+        encoding="UTF-8",
+    )
+
+    assert result.stdout.splitlines()[-1] == "node run build"
+    assert entries_path.read_text().splitlines() == expected_entries
@@ -1,5 +1,8 @@
 """Test nvm shim"""
+import os
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
@@ -28,3 +31,53 @@ def test_shim_nvm_executes_with_args(mocker, test_shim_args):
     mocked_core_run_nvm_cmd.assert_called_once_with(
         f"{nvm_dir}/nvm.sh", "--version --help"
     )
+
+
+def test_shim_nvm_parallel_calls_do_not_interfere(tmp_path):
+    """
+    Test concurrent nvm shim calls from one install each get their own output
+    without writing files next to the shim or in the folder they run from
+    """
+    shims_dir = tmp_path / "shims"
+    shims_dir.mkdir()
+    nvm_dir = tmp_path / "nvm"
+    nvm_dir.mkdir()
+    (nvm_dir / "nvm.sh").write_text(
+        f'nvm() {{ sleep 0.05; ls -A "{shims_dir}"; echo "nvm $*"; }}\n'
+    )
+    (tmp_path / "workspace").mkdir()
+    shim_path = shims_dir / "nvm"
+    shim_path.write_text(
+        "\n".join(
+            (
+                f"#!{sys.executable}",
+                "import sys",
+                "from nvshim.core.shim_nvm import main",
+                "sys.exit(main())",
+            )
+        )
+    )
+    shim_path.chmod(0o755)
+    env = {
+        **os.environ,
+        "NVM_DIR": str(nvm_dir),
+        "PYTHONPATH": os.pathsep.join(sys.path),
+    }
+
+    def run_nvm_shim(index: int) -> str:
+        return subprocess.run(
+            (str(shim_path), "ls", f"v{index}"),
+            check=True,
+            cwd=str(tmp_path / "workspace"),
+            encoding="UTF-8",
+            env=env,
+            stdout=subprocess.PIPE,
+        ).stdout.strip()
+
+    calls = 32
+    with ThreadPoolExecutor(max_workers=calls) as executor:
+        outputs = [*executor.map(run_nvm_shim, range(calls))]
+
+    assert outputs == [f"nvm\nnvm ls v{index}" for index in range(calls)]
+    assert os.listdir(tmp_path / "workspace") == []
+    assert os.listdir(shims_dir) == ["nvm"]
@@ -0,0 +1,118 @@
+"""Test installing node versions used across a folder tree"""
+import os
+
+import pytest
+
+from nvshim.core.cli import main as cli_main
+from nvshim.core.sync import (
+    find_nvmrc_files,
+    sync,
+)
+from nvshim.utils.constants import (
+    VERSION_FILES,
+    ErrorCode,
+)
+from nvshim.utils.environment import (
+    EnvironmentVariable,
+    process_env,
+)
+from nvshim.utils.process import clean_output
+
+
+@pytest.fixture
+def test_monorepo(tmp_path):
+    """Prepare a folder tree with .nvmrc files in packages and ignored folders"""
+    root_dir = tmp_path / "repo"
+    nvmrc_versions = {
+        ".": "default",
+        "packages/a": "14",
+        "packages/b": "16",
+        "packages/b/nested": "16.1",
+        "packages/c": "17",
+        "packages/d": "16",
+        "packages/a/node_modules/dep": "10",
+        ".git/modules/sub": "12",
+    }
+    for package_dir, version in nvmrc_versions.items():
+        (root_dir / package_dir).mkdir(parents=True, exist_ok=True)
+        (root_dir / package_dir / ".nvmrc").write_text(f"{version}\n")
+    (root_dir / "packages" / "c" / ".node-version").write_text("18\n")
+    (root_dir / "packages" / "e").mkdir()
+    (root_dir / "packages" / "e" / ".tool-versions").write_text("nodejs 16.1.0\n")
+    (root_dir / "packages" / "f").mkdir()
+    (root_dir / "packages" / "f" / ".tool-versions").write_text("python 3.11\n")
+    os.symlink(str(root_dir / "packages"), str(root_dir / "packages" / "e" / "loop"))
+    return str(root_dir)
+
+
+def test_find_nvmrc_files_skips_ignored_folders(test_monorepo):
+    """Test version file search skips node_modules, .git and symlinked folders"""
+    found = sorted(
+        os.path.relpath(path, test_monorepo)
+        for path in find_nvmrc_files(test_monorepo, VERSION_FILES)
+    )
+    assert found == [
+        ".nvmrc",
+        "packages/a/.nvmrc",
+        "packages/b/.nvmrc",
+        "packages/b/nested/.nvmrc",
+        "packages/c/.nvmrc",
+        "packages/d/.nvmrc",
+        "packages/e/.tool-versions",
+    ]
+    assert "packages/c/.node-version" in {
+        os.path.relpath(path, test_monorepo)
+        for path in find_nvmrc_files(test_monorepo, (".node-version", ".nvmrc"))
+    }
+
+
+def test_sync_installs_missing_versions_in_parallel(
+    mocker, test_monorepo, test_nvm_dir, test_mirror
+):
+    """Test distinct versions are resolved and the missing releases installed once"""
+    mocker.patch(
+        "nvshim.utils.installer.get_archive_platform", return_value="linux-x64"
+    )
+    mock_env = {
+        **os.environ,
+        EnvironmentVariable.MIRROR.value: test_mirror(["16.1.0", "16.2.0"]),
+    }
+    with process_env(mock_env):
+        summary = sync(test_monorepo, test_nvm_dir, max_workers=4)
+
+    assert len(summary.nvmrc_paths) == 7
+    assert summary.resolved == {
+        "14": "14.5.0",
+        "16": "16.2.0",
+        "16.1": "16.1.0",
+        "16.1.0": "16.1.0",
+        "17": "17",
+        "default": "14.5.0",
+    }
+    assert summary.present == ["14.5.0"]
+    assert sorted(summary.installed) == ["16.1.0", "16.2.0"]
+    assert summary.failed == ["17"]
+    assert sorted(os.listdir(os.path.join(test_nvm_dir, "versions", "node"))) == [
+        "v14.5.0",
+        "v16.1.0",
+        "v16.2.0",
+    ]
+
+
+def test_cli_sync_prints_summary(mocker, capsys, test_monorepo, test_nvm_dir):
+    """Test sync command prints summary and fails when versions are not installed"""
+    mocker.patch(
+        "nvshim.core.__main__.stream_nvm_cmd",
+        side_effect=lambda *_: (line for line in ["N/A\n"]),
+    )
+    mocker.patch("nvshim.core.__main__.run_nvm_cmd", autospec=True)
+    mock_env = {**os.environ, EnvironmentVariable.NVM_DIR.value: test_nvm_dir}
+    with process_env(mock_env), pytest.raises(SystemExit) as exc_info:
+        cli_main(["sync", test_monorepo, "--jobs", "1"])
+
+    assert exc_info.value.code == ErrorCode.VERSION_NOT_INSTALLED
+    output = clean_output(capsys.readouterr().out)
+    assert "Found 7 version files using 6 versions" in output
+    assert "Already installed: 14.5.0" in output
+    assert "Newly installed: none" in output
+    assert "Failed to install: 16, 16.1, 16.1.0, 17" in output
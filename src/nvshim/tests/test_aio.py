@@ -0,0 +1,103 @@
+"""Test resolving and running node executables from asyncio"""
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from nvshim import aio
+from nvshim.core import api
+
+
+@pytest.fixture
+def test_project(tmp_path, test_nvm_dir, monkeypatch):
+    """Prepare a project using the installed version with extra test executables"""
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / ".nvmrc").write_text("default")
+    bin_dir = os.path.join(test_nvm_dir, "versions", "node", "v14.5.0", "bin")
+    for name, script in {"fail": "exit 3", "hang": "sleep 10"}.items():
+        bin_path = os.path.join(bin_dir, name)
+        with open(bin_path, "w", encoding="UTF-8") as bin_file:
+            bin_file.write(f"#!/bin/sh\n{script}\n")
+        os.chmod(bin_path, 0o755)
+    monkeypatch.setenv("NVM_DIR", test_nvm_dir)
+    yield str(project_dir)
+    api.cache_clear()
+
+
+def test_resolve_shares_concurrent_resolutions(mocker, test_project):
+    """Test concurrent awaiters of the same folder wait for a single resolution"""
+    mocked_resolve = mocker.spy(api, "resolve")
+
+    async def resolve_all():
+        first = await asyncio.gather(*(aio.resolve(test_project) for _ in range(50)))
+        second = await aio.resolve(test_project, "npm")
+        return first, second
+
+    resolutions, npm_resolution = asyncio.run(resolve_all())
+
+    assert mocked_resolve.call_count == 2
+    assert {resolution.bin_path for resolution in resolutions} == {
+        os.path.join(os.environ["NVM_DIR"], "versions/node/v14.5.0/bin/node")
+    }
+    assert npm_resolution.bin_path.endswith("v14.5.0/bin/npm")
+    assert not aio._pending  # pylint: disable=protected-access
+
+
+def test_resolve_raises_resolution_errors(test_project):
+    """Test every concurrent awaiter gets the resolution error"""
+
+    async def resolve_all():
+        return await asyncio.gather(
+            *(aio.resolve(test_project, "yarn") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(resolve_all())
+    assert all(isinstance(error, api.ExecutableNotFoundError) for error in errors)
+
+
+def test_run_launches_resolved_executables_concurrently(test_project):
+    """Test many resolved executables run concurrently in the project folder"""
+
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                aio.run("npm", "--version", str(index), cwd=test_project, stdout=-1)
+                for index in range(20)
+            )
+        )
+
+    completed = asyncio.run(run_all())
+    assert [process.stdout.strip() for process in completed] == [
+        f"npm --version {index}" for index in range(20)
+    ]
+    assert all(process.returncode == 0 for process in completed)
+
+
+def test_run_exits_with_process_exit_code_when_checked(test_project):
+    """Test failed process exits with its exit code like the shim unless unchecked"""
+    with pytest.raises(SystemExit) as exc_info:
+        asyncio.run(aio.run("fail", cwd=test_project))
+    completed = asyncio.run(aio.run("fail", cwd=test_project, check=False))
+
+    assert exc_info.value.code == 3
+    assert isinstance(completed, subprocess.CompletedProcess)
+    assert completed.returncode == 3
+
+
+def test_run_kills_process_when_cancelled(test_project):
+    """Test cancelling the awaiting task does not leave the process running"""
+
+    async def run_and_cancel():
+        task = asyncio.ensure_future(aio.run("hang", cwd=test_project))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    started = time.monotonic()
+    asyncio.run(run_and_cancel())
+    assert time.monotonic() - started < 5
@@ -0,0 +1,104 @@
+"""Alias mapping compiled into a flat table of each alias to its terminal value"""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Callable,
+        Dict,
+        List,
+        Mapping,
+        Optional,
+        Tuple,
+        Union,
+    )
+
+    AliasTarget = Union[str, Callable[[], Optional[str]]]
+
+
+class AliasGraph:
+    """
+    Aliases followed once to the value at the end of their chain so each lookup is a
+    single table access. Aliases that reach a lazy resolver are followed on first
+    lookup so the resolver only runs when needed. A chain with a cycle ends at the
+    first alias seen twice.
+    """
+
+    def __init__(self, alias_mapping: "Mapping[str, AliasTarget]"):
+        """
+        :param alias_mapping: mapping of alias to version, alias or lazy resolver
+        """
+        self._mapping = alias_mapping
+        self._resolved: "Dict[str, Optional[str]]" = {}
+        self._terminals: "Dict[str, Optional[str]]" = {}
+        self._chains: "Dict[str, Tuple[str, ...]]" = {}
+        for alias in alias_mapping:
+            self._compile(alias, lazy=False)
+
+    def __contains__(self, alias: object) -> bool:
+        return alias in self._mapping
+
+    def _get_target(self, alias: str, lazy: bool) -> "Tuple[Optional[str], bool]":
+        """Get the alias target, running a lazy resolver at most once and only if allowed"""
+        target = self._mapping[alias]
+        if not callable(target):
+            return target, True
+        if alias not in self._resolved:
+            if not lazy:
+                return None, False
+            self._resolved[alias] = target()
+        return self._resolved[alias], True
+
+    def _compile(self, alias: str, lazy: bool) -> bool:
+        """
+        Follow the alias storing the terminal value of every alias on the way,
+        stopping at aliases whose terminal value is already known
+
+        :param alias: alias in the mapping to follow
+        :param lazy: if lazy resolvers can be run
+        :return: if the terminal value was found, False when a lazy resolver was reached
+        """
+        path: "List[str]" = []
+        positions: "Dict[str, int]" = {}
+        value: "Optional[str]" = alias
+        while value and value in self._mapping and value not in self._terminals:
+            if value in positions:
+                for cyclic_alias in path[positions[value] :]:
+                    self._terminals[cyclic_alias] = cyclic_alias
+                del path[positions[value] :]
+                break
+            positions[value] = len(path)
+            path.append(value)
+            value, resolved = self._get_target(value, lazy)
+            if not resolved:
+                return False
+        terminal = self._terminals.get(value, value) if value else value
+        for path_alias in path:
+            self._terminals[path_alias] = terminal
+        return True
+
+    def _get_chain(self, alias: str) -> "Tuple[str, ...]":
+        """Get the aliases traversed from the alias to its terminal value"""
+        chain: "List[str]" = []
+        seen = set()
+        value: "Optional[str]" = alias
+        while value and value in self._mapping and value not in seen:
+            seen.add(value)
+            chain.append(value)
+            value, _ = self._get_target(value, lazy=True)
+        return tuple(chain)
+
+    def resolve(self, alias: "Optional[str]") -> "Tuple[Optional[str], List[str]]":
+        """
+        Get the value at the end of the alias chain
+
+        :param alias: alias or value to resolve
+        :return: terminal value, which is the alias itself when not in the mapping,
+            and the aliases traversed
+        """
+        if not alias or alias not in self._mapping:
+            return alias, []
+        if alias not in self._terminals:
+            self._compile(alias, lazy=True)
+        if alias not in self._chains:
+            self._chains[alias] = self._get_chain(alias)
+        return self._terminals[alias], [*self._chains[alias]]
@@ -0,0 +1,199 @@
+"""Persistent resolution cache shared by all shim processes and in memory caches"""
+import functools
+import marshal
+import os
+from typing import TYPE_CHECKING
+
+from . import lock
+from .constants import (
+    CACHE_LOCK_TIMEOUT,
+    CACHE_MAX_ENTRIES,
+)
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Any,
+        Callable,
+        Dict,
+        List,
+        Optional,
+        Sequence,
+        Tuple,
+        TypeVar,
+    )
+
+    CacheEntry = Dict[str, object]
+    CacheEntries = Dict[str, CacheEntry]
+    CacheStamp = List[Optional[int]]
+    CachedFunction = TypeVar("CachedFunction", bound=Callable[..., Any])
+
+CACHE_FORMAT = 1
+CACHE_FILE_NAME = "resolution.cache"
+
+
+def get_cache_path(cache_dir: str) -> str:
+    """
+    Get the location of the resolution cache file
+
+    :param cache_dir: folder the cache is stored in
+    :return: cache file path
+    """
+    return os.path.join(cache_dir, CACHE_FILE_NAME)
+
+
+def get_cache_key(*parts: "Optional[str]") -> str:
+    """
+    Join the parts identifying a resolution into a single cache key
+
+    :return: null separated key string
+    """
+    return "\0".join(part or "" for part in parts)
+
+
+def get_stamp(paths: "Sequence[str]") -> "CacheStamp":
+    """
+    Get the modification times of the paths an entry depends on
+
+    :param paths: files or folders to stamp
+    :return: nanosecond modification times, None for paths that do not exist
+    """
+    stamp: "CacheStamp" = []
+    for path in paths:
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return stamp
+
+
+def load(cache_path: str) -> "CacheEntries":
+    """
+    Read all entries from the cache file, ordered from least to most recently stored
+
+    :param cache_path: path to the cache file
+    :return: cache entries or empty mapping when missing, unreadable or outdated
+    """
+    try:
+        with open(cache_path, "rb") as open_file:
+            data = marshal.load(open_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+        return {}
+    return data.get("entries") or {}
+
+
+def save(cache_path: str, entries: "CacheEntries"):
+    """
+    Atomically replace the cache file so concurrent readers never see a partial write
+
+    :param cache_path: path to the cache file
+    :param entries: cache entries to store
+    """
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "wb") as open_file:
+            marshal.dump({"format": CACHE_FORMAT, "entries": entries}, open_file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def get_entry(cache_path: str, key: str) -> "Optional[CacheEntry]":
+    """
+    Get a cache entry if none of the paths it depends on have changed since stored
+
+    :param cache_path: path to the cache file
+    :param key: cache entry key
+    :return: the cached entry or None when missing or stale
+    """
+    entries = load(cache_path)
+    entry = entries.get(key)
+    if entry is None or get_stamp(entry["paths"]) != entry["stamp"]:  # type: ignore
+        return None
+    return entry
+
+
+def set_entry(
+    cache_path: str,
+    key: str,
+    paths: "Sequence[str]",
+    max_entries: int = CACHE_MAX_ENTRIES,
+    stamp: "Optional[CacheStamp]" = None,
+    **values,
+) -> "CacheEntry":
+    """
+    Store a cache entry stamped with the current state of the paths it depends on,
+    evicting the least recently stored entries when the cache is full, writers hold
+    a lock so concurrent shims do not drop each other's entries
+
+    :param cache_path: path to the cache file
+    :param key: cache entry key
+    :param paths: files or folders whose changes invalidate the entry
+    :param max_entries: maximum number of entries kept in the cache
+    :param stamp: stamp of the paths taken before the values were read, defaults to now
+    :return: the stored entry
+    """
+    entry: "CacheEntry" = {
+        "paths": [*paths],
+        "stamp": get_stamp(paths) if stamp is None else stamp,
+        **values,
+    }
+    try:
+        with lock.file_lock(f"{cache_path}.lock", CACHE_LOCK_TIMEOUT):
+            entries = load(cache_path)
+            entries.pop(key, None)
+            entries[key] = entry
+            for stale_key in [*entries][: max(len(entries) - max_entries, 0)]:
+                del entries[stale_key]
+            save(cache_path, entries)
+    except OSError:
+        pass
+    return entry
+
+
+class MtimeCache:
+    """
+    Function wrapper caching results per arguments until the files or folders
+    the result depends on are modified, so it stays correct in long lived processes
+    """
+
+    def __init__(
+        self, func: "Callable[..., object]", get_paths: "Callable[..., Sequence[str]]"
+    ):
+        """
+        :param func: function to cache the results of
+        :param get_paths: called with the function arguments to get the paths it depends on
+        """
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._get_paths = get_paths
+        self._entries: "Dict[Tuple[object, ...], Tuple[CacheStamp, object]]" = {}
+
+    def __call__(self, *args, **kwargs):
+        key = (*args, *sorted(kwargs.items()))
+        stamp = get_stamp(self._get_paths(*args, **kwargs))
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = self._entries[key] = (stamp, self._func(*args, **kwargs))
+        return entry[1]
+
+    def cache_clear(self):
+        """Forget all cached results"""
+        self._entries.clear()
+
+
+def mtime_cache(
+    get_paths: "Callable[..., Sequence[str]]",
+) -> "Callable[[CachedFunction], CachedFunction]":
+    """
+    Decorate a function to cache its results until the paths they depend on are modified
+
+    :param get_paths: called with the function arguments to get the paths it depends on
+    :return: decorator wrapping the function in a modification time aware cache
+    """
+    return lambda func: MtimeCache(func, get_paths)  # type: ignore
@@ -16,10 +16,35 @@ class ErrorCode(IntEnum):
 
 SHIMS = frozenset({"node", "npm", "npx"})
 
+CACHE_LOCK_TIMEOUT = 1
+
+CACHE_MAX_ENTRIES = 512
+
+INSTALL_LOCK_TIMEOUT = 600
+
+LTS_ALIAS_PREFIX = "lts/"
+
+NVM_SESSION_IDLE_TIMEOUT = 60
+
+NVM_SNAPSHOT_FILE_NAME = ".nvshim.snapshot"
+
+RESOLVED_TOKEN_SEPARATOR = "\n"
+
+NVMRC = ".nvmrc"
+NODE_VERSION = ".node-version"
+TOOL_VERSIONS = ".tool-versions"
+PACKAGE_JSON = "package.json"
+
+VERSION_FILES = (NVMRC, NODE_VERSION, TOOL_VERSIONS, PACKAGE_JSON)
+
+DEFAULT_VERSION_FILES = (NVMRC, NODE_VERSION, TOOL_VERSIONS)
+
 
 class Alias(Enum):
     """nvm alias names"""
 
     DEFAULT = "default"
-    STABLE = "stable"
+    IOJS = "iojs"
+    LTS = "lts/*"
     NODE = "node"
+    STABLE = "stable"
@@ -1,19 +1,42 @@
 """Utility constants and functions for environment management"""
-import json
 import os
 from contextlib import contextmanager
 from enum import Enum
-from typing import Dict
+from typing import TYPE_CHECKING
 
-EnvDict = Dict[str, str]
+from .constants import VERSION_FILES
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Dict,
+        Optional,
+        Tuple,
+    )
+
+    EnvDict = Dict[str, str]
+
+_JSON_LITERALS = {"true": True, "false": False, "null": None}
+_JSON_START = frozenset('{["-0123456789tfn')
 
 
 class EnvironmentVariable(Enum):
     """Environment variables nvshim cares about"""
 
     AUTO_INSTALL = "NVSHIM_AUTO_INSTALL"
+    CACHE = "NVSHIM_CACHE"
+    CACHE_DIR = "NVSHIM_CACHE_DIR"
+    DAEMON_SOCKET = "NVSHIM_DAEMON_SOCKET"
+    INSTALL_LOCK_TIMEOUT = "NVSHIM_INSTALL_LOCK_TIMEOUT"
+    MIRROR = "NVSHIM_MIRROR"
+    NODE_BIN_FIRST = "NVSHIM_NODE_BIN_FIRST"
+    NVM_BIN = "NVM_BIN"
     NVM_DIR = "NVM_DIR"
+    NVM_FALLBACK = "NVSHIM_NVM_FALLBACK"
+    NVM_SESSION = "NVSHIM_NVM_SESSION"
+    RESOLVED = "NVSHIM_RESOLVED"
+    TRACE = "NVSHIM_TRACE"
     VERBOSE = "NVSHIM_VERBOSE"
+    VERSION_FILES = "NVSHIM_VERSION_FILES"
 
 
 class MissingEnvironmentVariableError(Exception):
@@ -24,15 +47,30 @@ class MissingEnvironmentVariableError(Exception):
         self.env_var = env_var
 
 
+def _parse_value(value: str) -> object:
+    """Parse value as json, only importing the parser when the value could be valid json"""
+    if value in _JSON_LITERALS:
+        return _JSON_LITERALS[value]
+    if value.isdigit() and value.isascii() and (value == "0" or value[0] != "0"):
+        return int(value)
+    if value.lstrip()[:1] not in _JSON_START:
+        return value
+
+    import json  # pylint: disable=import-outside-toplevel
+
+    try:
+        return json.loads(value)
+    except json.decoder.JSONDecodeError:
+        return value
+
+
 def _get_env_var(env_var: "EnvironmentVariable", raise_missing: bool = False) -> object:
     try:
-        return json.loads(os.environ[env_var.value])
+        return _parse_value(os.environ[env_var.value])
     except KeyError as exc:
         if raise_missing:
             raise MissingEnvironmentVariableError(env_var) from exc
         return None
-    except json.decoder.JSONDecodeError:
-        return os.environ.get(env_var.value)
 
 
 def _set_envs(values: "EnvDict"):
@@ -45,8 +83,35 @@ def process_env(env_vars: "EnvDict"):
     """Run code with specific enviroment variables that are reset afterwards"""
     prev_env_vars = {**os.environ}
     _set_envs(env_vars)
-    yield
-    _set_envs(prev_env_vars)
+    try:
+        yield
+    finally:
+        _set_envs(prev_env_vars)
+
+
+def get_node_bin_env(
+    bin_dir: "Optional[str]", env: "Optional[EnvDict]" = None
+) -> "EnvDict":
+    """
+    Put the node bin folder first on the path and set it as $NVM_BIN,
+    replacing the folder set before
+
+    :param bin_dir: the node bin folder, only removing the previous folder when empty
+    :param env: environment to copy, defaults to os.environ
+    :return: the updated copy of the environment
+    """
+    env_vars = {**(os.environ if env is None else env)}
+    previous_bin_dir = env_vars.pop(EnvironmentVariable.NVM_BIN.value, None)
+    paths = [
+        path
+        for path in env_vars.get("PATH", "").split(os.pathsep)
+        if path and path != previous_bin_dir
+    ]
+    if bin_dir:
+        paths.insert(0, bin_dir)
+        env_vars[EnvironmentVariable.NVM_BIN.value] = bin_dir
+    env_vars["PATH"] = os.pathsep.join(paths)
+    return env_vars
 
 
 def is_version_auto_install_enabled() -> bool:
@@ -54,6 +119,16 @@ def is_version_auto_install_enabled() -> bool:
     return bool(_get_env_var(EnvironmentVariable.AUTO_INSTALL))
 
 
+def is_node_bin_first_enabled() -> bool:
+    """Return if launched executables should run with their bin folder ahead of the shims"""
+    return bool(_get_env_var(EnvironmentVariable.NODE_BIN_FIRST))
+
+
+def is_nvm_fallback_enabled() -> bool:
+    """Return if aliases that cannot be resolved locally should be resolved by running nvm"""
+    return bool(_get_env_var(EnvironmentVariable.NVM_FALLBACK))
+
+
 def is_verbose_logging() -> bool:
     """Return if verbosity is set using the nvshim environment variable"""
     return bool(_get_env_var(EnvironmentVariable.VERBOSE))
@@ -62,3 +137,74 @@ def is_verbose_logging() -> bool:
 def get_nvm_dir() -> str:
     """Return the path set from the $NVM_DIR environment variable"""
     return str(_get_env_var(EnvironmentVariable.NVM_DIR, True))
+
+
+def get_install_lock_timeout(default: float) -> float:
+    """Return the seconds set from $NVSHIM_INSTALL_LOCK_TIMEOUT or the default"""
+    timeout = _get_env_var(EnvironmentVariable.INSTALL_LOCK_TIMEOUT)
+    if isinstance(timeout, (int, float)) and not isinstance(timeout, bool):
+        return float(timeout)
+    return default
+
+
+def get_nvm_session_idle_timeout(default: float) -> "Optional[float]":
+    """
+    Return the idle seconds set from $NVSHIM_NVM_SESSION, the default when set to true
+    and None when nvm commands should not use a session
+    """
+    value = _get_env_var(EnvironmentVariable.NVM_SESSION)
+    if value is True:
+        return default
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+        return float(value)
+    return None
+
+
+def get_mirror() -> "Optional[str]":
+    """Return the local node release mirror path or file url set from $NVSHIM_MIRROR"""
+    return os.environ.get(EnvironmentVariable.MIRROR.value) or None
+
+
+def get_resolved_token() -> "Optional[str]":
+    """Return the resolution passed down by a parent shim in $NVSHIM_RESOLVED"""
+    return os.environ.get(EnvironmentVariable.RESOLVED.value) or None
+
+
+def get_version_files(default: "Tuple[str, ...]") -> "Tuple[str, ...]":
+    """
+    Return the comma separated version file names set from $NVSHIM_VERSION_FILES
+    in order of precedence, skipping unsupported names, or the default when none are set
+    """
+    value = os.environ.get(EnvironmentVariable.VERSION_FILES.value) or ""
+    names = (name.strip() for name in value.split(","))
+    return tuple(name for name in names if name in VERSION_FILES) or default
+
+
+def get_trace_path() -> "Optional[str]":
+    """Return the file set from $NVSHIM_TRACE to append invocation traces to"""
+    return os.environ.get(EnvironmentVariable.TRACE.value) or None
+
+
+def is_resolution_cache_enabled() -> bool:
+    """Return if the resolution cache is enabled, which is the default when not set"""
+    value = _get_env_var(EnvironmentVariable.CACHE)
+    return value is None or bool(value)
+
+
+def get_cache_dir() -> str:
+    """Return the path set from $NVSHIM_CACHE_DIR falling back to the user cache folder"""
+    cache_dir = _get_env_var(EnvironmentVariable.CACHE_DIR)
+    if cache_dir:
+        return str(cache_dir)
+    user_cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(user_cache_dir, "nvshim")
+
+
+def get_daemon_socket_path() -> str:
+    """Return the path set from $NVSHIM_DAEMON_SOCKET falling back to the cache folder"""
+    socket_path = _get_env_var(EnvironmentVariable.DAEMON_SOCKET)
+    if socket_path:
+        return str(socket_path)
+    return os.path.join(get_cache_dir(), "daemon.sock")
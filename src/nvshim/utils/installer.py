@@ -0,0 +1,217 @@
+"""Install node versions from a local mirror of release archives without nvm"""
+import hashlib
+import os
+import platform
+import shutil
+import sys
+import tarfile
+from typing import TYPE_CHECKING
+
+from .message import (
+    print_installing_from_mirror,
+    print_unable_to_install_from_mirror,
+    print_version_not_in_mirror,
+)
+from .version_index import VersionIndex
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        BinaryIO,
+        Dict,
+        Optional,
+        Tuple,
+    )
+
+    MirrorArchives = Dict[str, Tuple[str, str]]
+
+ARCHIVE_EXTENSION = ".tar.xz"
+CHECKSUMS_FILE_NAME = "SHASUMS256.txt"
+READ_CHUNK_SIZE = 1 << 20
+
+_ARCHIVE_ARCHS = {
+    "aarch64": "arm64",
+    "amd64": "x64",
+    "arm64": "arm64",
+    "armv7l": "armv7l",
+    "ppc64le": "ppc64le",
+    "s390x": "s390x",
+    "x86_64": "x64",
+}
+
+
+class ArchiveInstallError(Exception):
+    """Error for release archive that could not be installed"""
+
+
+class _HashingReader:
+    """File reader that updates a checksum with every chunk read"""
+
+    def __init__(self, file: "BinaryIO"):
+        self.file = file
+        self.checksum = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the file updating the checksum"""
+        data = self.file.read(size)
+        self.checksum.update(data)
+        return data
+
+    def drain(self) -> str:
+        """Read the rest of the file returning the checksum of all its contents"""
+        while self.read(READ_CHUNK_SIZE):
+            pass
+        return self.checksum.hexdigest()
+
+
+def get_mirror_dir(mirror: str) -> str:
+    """
+    Get the mirror folder from a path or file url
+
+    :param mirror: local folder path or file:// url
+    :return: path to the local mirror folder
+    """
+    if not mirror.startswith("file:"):
+        return mirror
+
+    # pylint: disable=import-outside-toplevel
+    from urllib.parse import urlparse
+    from urllib.request import url2pathname
+
+    return url2pathname(urlparse(mirror).path)
+
+
+def get_archive_platform() -> "Optional[str]":
+    """
+    Get the platform suffix of node release archives for this system
+
+    :return: platform and architecture e.g. linux-x64, None when not supported
+    """
+    arch = _ARCHIVE_ARCHS.get(platform.machine().lower())
+    if not arch or sys.platform not in ("darwin", "linux"):
+        return None
+    return f"{sys.platform}-{arch}"
+
+
+def get_mirror_archives(mirror_dir: str, archive_platform: str) -> "MirrorArchives":
+    """
+    Get the release archives for a platform listed in the mirror checksums file
+
+    :param mirror_dir: path to the local mirror folder
+    :param archive_platform: platform suffix of the archives
+    :return: mapping of version to archive file name and sha256 checksum
+    """
+    archives: "MirrorArchives" = {}
+    prefix, suffix = "node-v", f"-{archive_platform}{ARCHIVE_EXTENSION}"
+    try:
+        with open(
+            os.path.join(mirror_dir, CHECKSUMS_FILE_NAME), encoding="UTF-8"
+        ) as checksums_file:
+            for line in checksums_file:
+                checksum, _, file_name = line.strip().partition("  ")
+                if file_name.startswith(prefix) and file_name.endswith(suffix):
+                    version = file_name[len(prefix) : -len(suffix)]
+                    archives[version] = (file_name, checksum.lower())
+    except OSError:
+        pass
+    return archives
+
+
+def get_mirror_release(mirror: str, version: str) -> "Optional[Tuple[str, str, str]]":
+    """
+    Get the latest release archive for this system in the mirror matching the version
+
+    :param mirror: local folder path or file:// url of the mirror
+    :param version: version number or npm style range
+    :return: release version, archive path and sha256 checksum, None when none matches
+    """
+    archive_platform = get_archive_platform()
+    if not archive_platform:
+        return None
+    mirror_dir = get_mirror_dir(mirror)
+    archives = get_mirror_archives(mirror_dir, archive_platform)
+    release_version = VersionIndex(archives).max_satisfying(version)
+    if not release_version:
+        return None
+    file_name, checksum = archives[str(release_version)]
+    return str(release_version), os.path.join(mirror_dir, file_name), checksum
+
+
+def _get_member_path(member: "tarfile.TarInfo") -> str:
+    """Strip the release folder from the archive member path rejecting unsafe paths"""
+    parts = member.name.split("/")[1:]
+    if os.path.isabs(member.name) or ".." in parts:
+        raise ArchiveInstallError(f"Unsafe archive member '{member.name}'")
+    if member.islnk():
+        link_parts = member.linkname.split("/")[1:]
+        if os.path.isabs(member.linkname) or ".." in link_parts:
+            raise ArchiveInstallError(f"Unsafe archive link '{member.linkname}'")
+        member.linkname = "/".join(link_parts)
+    elif member.issym():
+        link_path = os.path.normpath(
+            os.path.join(os.path.dirname("/".join(parts)), member.linkname)
+        )
+        if os.path.isabs(member.linkname) or link_path.startswith(".."):
+            raise ArchiveInstallError(f"Unsafe archive link '{member.linkname}'")
+    return "/".join(parts)
+
+
+def install_archive(archive_path: str, checksum: str, install_dir: str):
+    """
+    Extract a node release archive in a single streaming pass while computing
+    its checksum, publishing the install folder only once the checksum matches
+
+    :param archive_path: path to the node-vX.Y.Z-platform.tar.xz archive
+    :param checksum: expected sha256 hex digest of the archive
+    :param install_dir: folder to install the release to
+    :raises ArchiveInstallError: when the archive is unreadable, unsafe or corrupted
+    """
+    install_parent_dir, install_name = os.path.split(install_dir)
+    staging_dir = os.path.join(install_parent_dir, f".{install_name}.{os.getpid()}.tmp")
+    try:
+        with open(archive_path, "rb") as archive_file:
+            reader = _HashingReader(archive_file)
+            with tarfile.open(fileobj=reader, mode="r|xz") as archive:  # type: ignore
+                for member in archive:
+                    member_path = _get_member_path(member)
+                    if not member_path:
+                        continue
+                    member.name = member_path
+                    archive.extract(member, staging_dir, set_attrs=not member.issym())
+            actual_checksum = reader.drain()
+        if actual_checksum != checksum.lower():
+            raise ArchiveInstallError(f"Checksum mismatch for '{archive_path}'")
+        try:
+            os.rename(staging_dir, install_dir)
+        except OSError:
+            if not os.path.isdir(install_dir):
+                raise
+    except (OSError, tarfile.TarError, EOFError) as exc:
+        raise ArchiveInstallError(str(exc)) from exc
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def install_from_mirror(mirror: str, version: str, node_versions_dir: str):
+    """
+    Install the latest release matching the version from a local mirror of node archives
+
+    :param mirror: local folder path or file:// url of the mirror
+    :param version: version number to install
+    :param node_versions_dir: the path of .nvm node installations
+    """
+    release = get_mirror_release(mirror, version)
+    if not release:
+        print_version_not_in_mirror(version, mirror)
+        return
+
+    mirror_version, archive_path, checksum = release
+    file_name = os.path.basename(archive_path)
+    print_installing_from_mirror(mirror_version, file_name)
+    try:
+        install_archive(
+            archive_path,
+            checksum,
+            os.path.join(node_versions_dir, f"v{mirror_version}"),
+        )
+    except ArchiveInstallError as exc:
+        print_unable_to_install_from_mirror(file_name, exc)
@@ -0,0 +1,45 @@
+"""Inter process file locks used to coordinate concurrent shims"""
+import os
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import Iterator
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+@contextmanager
+def file_lock(lock_path: str, timeout: float) -> "Iterator[float]":
+    """
+    Hold an exclusive lock on a file for the duration of the context,
+    where locking is not supported the context is entered without a lock
+
+    :param lock_path: path of the lock file, created with its folder if missing
+    :param timeout: maximum seconds to wait for the lock
+    :return: seconds waited for the lock
+    :raises TimeoutError: when the lock is not acquired before the timeout
+    """
+    try:
+        import fcntl  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        yield 0.0
+        return
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "a", encoding="UTF-8") as lock_file:
+        started = time.monotonic()
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError as exc:
+                waited = time.monotonic() - started
+                if waited >= timeout:
+                    raise TimeoutError(lock_path) from exc
+                time.sleep(min(LOCK_POLL_INTERVAL, timeout - waited))
+        try:
+            yield time.monotonic() - started
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
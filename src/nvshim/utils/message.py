@@ -3,25 +3,25 @@ from enum import (
     Enum,
     IntEnum,
 )
-from subprocess import CalledProcessError
-from typing import Optional
-
-from colored import (
-    fg,
-    stylize,
-)
+from typing import TYPE_CHECKING
 
 from .environment import (
     EnvironmentVariable,
     is_verbose_logging,
 )
 
+if TYPE_CHECKING:  # pragma: no-cover
+    from subprocess import CalledProcessError
+    from typing import Optional
+
+    from nvshim.core.sync import SyncSummary
+
 
 class Color(Enum):
     """Message colors"""
 
-    ERROR = fg("red")
-    NOTICE = fg("yellow")
+    ERROR = "red"
+    NOTICE = "yellow"
 
 
 class MessageLevel(IntEnum):
@@ -46,7 +46,13 @@ def _print(*args, level=MessageLevel.NORMAL):
 
 
 def _stylize(text: str, color: "Color") -> str:
-    return stylize(text, color.value)
+    # pylint: disable=import-outside-toplevel
+    from colored import (
+        fg,
+        stylize,
+    )
+
+    return stylize(text, fg(color.value))
 
 
 def _print_stylized(text: str, color: "Color", level=MessageLevel.NORMAL):
@@ -97,6 +103,39 @@ def print_version_not_installed(version_alias: str, install_version: str):
     )
 
 
+def print_waited_for_install(version: str, wait_seconds: float):
+    """Print how long was spent waiting for another process installing the version"""
+    _print(
+        f"Waited {wait_seconds:.2f}s for version <{version}> to be installed",
+        level=MessageLevel.QUIET,
+    )
+
+
+def print_install_lock_timeout(version: str, timeout: float):
+    """Print notice that another process installing the version did not finish in time"""
+    _print_stylized(
+        f"Timed out after {timeout:g}s waiting for version <{version}> to be installed",
+        Color.NOTICE,
+        MessageLevel.LOUD,
+    )
+
+
+def print_installing_from_mirror(version: str, file_name: str):
+    """Print which mirror archive the version is being installed from"""
+    _print(f"Installing version <{version}> from '{file_name}'")
+
+
+def print_version_not_in_mirror(version: str, mirror: str):
+    """Print error for version with no release archive for this system in the mirror"""
+    _print_error(f"No release archive for version <{version}> found in '{mirror}'")
+
+
+def print_unable_to_install_from_mirror(file_name: str, exc: "Exception"):
+    """Print error for mirror archive that could not be installed"""
+    _print_error(f"Unable to install '{file_name}'")
+    _print(str(exc), level=MessageLevel.QUIET)
+
+
 def print_running_version(version_number: str):
     """Print which version of current nvshim"""
     _print(f"Executing shim version {version_number}", level=MessageLevel.QUIET)
@@ -117,7 +156,40 @@ def print_unable_to_run(exc: "CalledProcessError"):
     _print(str(exc), level=MessageLevel.QUIET)
 
 
-def print_unable_to_remove_nvm_shim_temp_file(exc: "Exception"):
-    """Print error for failure to delete temp nvm exec shim file"""
-    _print_error("Unable to remove temporary nvm shim file")
+def print_unable_to_exec(bin_path: str, exc: "OSError"):
+    """Print error for failure to replace the current process with executable"""
+    _print_error(f"Unable to execute '{bin_path}'")
+    _print(str(exc), level=MessageLevel.QUIET)
+
+
+def print_daemon_listening(socket_path: str, nvm_dir: str):
+    """Print where the resolver daemon is listening for shim requests"""
+    _print(f"Resolving node executables from '{nvm_dir}' on '{socket_path}'")
+
+
+def print_daemon_watcher_unavailable():
+    """Print notice that resolutions are not kept in memory without folder watching"""
+    _print_stylized(
+        "Folder watching unavailable, resolver state is reloaded on every request",
+        Color.NOTICE,
+    )
+
+
+def print_unable_to_resolve(exec_dir: str, exc: Exception):
+    """Print error for node version that cannot be used in the folder"""
+    _print_error(f"Unable to use node in '{exec_dir}'")
     _print(str(exc), level=MessageLevel.QUIET)
+
+
+def print_sync_summary(summary: "SyncSummary"):
+    """Print the versions resolved from version files and which were installed"""
+    _print(
+        f"Found {len(summary.nvmrc_paths)} version files",
+        f"using {len(summary.resolved)} versions",
+    )
+    for rc_version, version in summary.resolved.items():
+        _print(f"  {rc_version} -> {version}", level=MessageLevel.QUIET)
+    _print(f"Already installed: {', '.join(summary.present) or 'none'}")
+    _print(f"Newly installed: {', '.join(summary.installed) or 'none'}")
+    if summary.failed:
+        _print_error(f"Failed to install: {', '.join(summary.failed)}")
@@ -1,41 +1,159 @@
 """Run process utility functions"""
 import os
-import re
-import subprocess
 import sys
+from typing import TYPE_CHECKING
 
 from .constants import ErrorCode
 from .environment import (
-    EnvDict,
     EnvironmentVariable,
-    process_env,
+    is_node_bin_first_enabled,
 )
 from .message import (
     print_process_interrupted,
+    print_unable_to_exec,
     print_unable_to_run,
 )
 
+if TYPE_CHECKING:  # pragma: no-cover
+    import asyncio
+    import subprocess
+    from typing import (
+        Generator,
+        NoReturn,
+        Optional,
+        Union,
+    )
+
+    from .environment import EnvDict
+
 
 def _include_venv(env: "EnvDict"):
     path_key = "PATH"
     env_path = env.get(path_key, "")
-    return {**env, path_key: f"venv/bin/:{env_path}"}
+    shims_dir = os.path.dirname(sys.executable)
+    node_bin_dir = env.get(EnvironmentVariable.NVM_BIN.value)
+    if (
+        node_bin_dir
+        and env_path.startswith(f"{node_bin_dir}:")
+        and is_node_bin_first_enabled()
+    ):
+        env_path = env_path[len(node_bin_dir) + 1 :]
+        return {**env, path_key: f"{node_bin_dir}:{shims_dir}:{env_path}"}
+    return {**env, path_key: f"{shims_dir}:{env_path}"}
+
+
+def _build_env(env: "Optional[EnvDict]" = None) -> "EnvDict":
+    env_vars = _include_venv({**(os.environ if env is None else env)})
+    env_vars[EnvironmentVariable.AUTO_INSTALL.value] = "false"
+    return env_vars
 
 
-def run(*args, **kwargs) -> subprocess.CompletedProcess:
+def run(
+    *args, env: "Optional[EnvDict]" = None, **kwargs
+) -> "subprocess.CompletedProcess":
     """
-    Disables nvshim auto install for the duration of the process run.
+    Disables nvshim auto install for the process run.
     Wraps subprocess.run passing varargs as the first parameter and kwargs as is.
+    The process environment is built from env, defaulting to a copy of os.environ,
+    and passed explicitly so the global environment is never modified and runs are thread safe.
     Handles keyboard interrupt and called process error to end with correct sys exit error code.
     """
-    env_vars = _include_venv({**os.environ})
-    env_vars[EnvironmentVariable.AUTO_INSTALL.value] = "false"
+    return _run_with_error_handler(*args, env=_build_env(env), **kwargs)
+
+
+def stream(
+    *args,
+    env: "Optional[EnvDict]" = None,
+    encoding: "Optional[str]" = "UTF-8",
+    **kwargs,
+) -> "Generator[Union[str, bytes], None, None]":
+    """
+    Run like run with the executable given as the first vararg and kwargs passed as is,
+    yielding each output line as the process prints it instead of buffering the output.
+    Lines are decoded using encoding or yielded as raw bytes when encoding is None.
+    Closing the generator before the output ends kills the process.
+    Handles keyboard interrupt and a failed exit with the same sys exit error code as run.
+    """
+    import subprocess  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    with subprocess.Popen(
+        args,
+        env=_build_env(env),
+        encoding=encoding,
+        stdout=subprocess.PIPE,
+        **kwargs,
+    ) as child:
+        try:
+            yield from child.stdout or ()
+        except KeyboardInterrupt as interrupt_e:
+            child.kill()
+            print_process_interrupted(interrupt_e)
+            sys.exit(ErrorCode.KEYBOARD_INTERRUPT)
+        except GeneratorExit:
+            child.kill()
+            raise
+    if child.returncode:
+        print_unable_to_run(subprocess.CalledProcessError(child.returncode, args))
+        sys.exit(child.returncode)
+
+
+def spawn(*args, env: "Optional[EnvDict]" = None) -> "subprocess.Popen":
+    """
+    Start the executable given as the first vararg in a new session without waiting for it,
+    detached from the terminal and using the same environment as run.
+    """
+    import subprocess  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    return subprocess.Popen(
+        args,
+        env=_build_env(env),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def check_exit(args, returncode: int) -> "subprocess.CompletedProcess":
+    """
+    Handle the exit code of a process that was not started with run the same way run does,
+    ending with the same sys exit error code when it failed.
+    """
+    import subprocess  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    completed: "subprocess.CompletedProcess" = subprocess.CompletedProcess(
+        args, returncode
+    )
+    try:
+        completed.check_returncode()
+    except subprocess.CalledProcessError as process_e:
+        print_unable_to_run(process_e)
+        sys.exit(process_e.returncode)
+    return completed
 
-    with process_env(env_vars):
-        return _run_with_error_handler(*args, **kwargs)
 
+def exec_replace(*args, env: "Optional[EnvDict]" = None) -> "NoReturn":
+    """
+    Replace the current process with the executable given as the first vararg,
+    so signals, exit code and process group belong to the executable with no parent left behind.
+    Uses the same environment as run, falling back to it where exec does not replace the process.
+    """
+    if os.name == "nt":
+        run(*args, env=env)
+        sys.exit(0)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.execve(args[0], args, _build_env(env))
+    except OSError as exc:
+        print_unable_to_exec(args[0], exc)
+        sys.exit(ErrorCode.EXECUTABLE_NOT_FOUND)
+
+
+def _run_with_error_handler(*args, **kwargs) -> "subprocess.CompletedProcess":
+    import subprocess  # pylint: disable=import-outside-toplevel,redefined-outer-name
 
-def _run_with_error_handler(*args, **kwargs) -> subprocess.CompletedProcess:
     try:
         return subprocess.run(args, encoding="UTF-8", **kwargs, check=True)
     except KeyboardInterrupt as interrupt_e:
@@ -46,6 +164,60 @@ def _run_with_error_handler(*args, **kwargs) -> subprocess.CompletedProcess:
         sys.exit(process_e.returncode)
 
 
+async def run_async(
+    *args, env: "Optional[EnvDict]" = None, check: bool = True, **kwargs
+) -> "subprocess.CompletedProcess":
+    """
+    Asyncio counterpart of run built on asyncio.create_subprocess_exec,
+    running the executable given as the first vararg with kwargs passed as is.
+    Uses the same environment as run and the same keyboard interrupt and exit code handling,
+    unless check is false in which case the completed process is returned whatever its exit code.
+    The process is killed when the awaiting task is cancelled.
+    """
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    import asyncio
+    import subprocess
+
+    child = await asyncio.create_subprocess_exec(*args, env=_build_env(env), **kwargs)
+    try:
+        stdout, stderr = await child.communicate()
+        returncode = await child.wait()
+    except KeyboardInterrupt as interrupt_e:
+        _kill(child)
+        print_process_interrupted(interrupt_e)
+        sys.exit(ErrorCode.KEYBOARD_INTERRUPT)
+    except asyncio.CancelledError:
+        _kill(child)
+        await child.wait()
+        raise
+
+    completed = subprocess.CompletedProcess(
+        args,
+        returncode,
+        None if stdout is None else stdout.decode("UTF-8"),
+        None if stderr is None else stderr.decode("UTF-8"),
+    )
+    if check and completed.returncode:
+        print_unable_to_run(
+            subprocess.CalledProcessError(
+                completed.returncode, args, completed.stdout, completed.stderr
+            )
+        )
+        sys.exit(completed.returncode)
+    return completed
+
+
+def _kill(child: "asyncio.subprocess.Process"):
+    """Kill the child process if it is still running"""
+    if child.returncode is None:
+        try:
+            child.kill()
+        except ProcessLookupError:
+            pass
+
+
 def clean_output(output: str) -> str:
     """Removes ansi color codes from string"""
+    import re  # pylint: disable=import-outside-toplevel
+
     return re.sub(r"\x1B[@-_][0-?]*[ -/]*[@-~]", "", str(output).strip())
@@ -0,0 +1,282 @@
+"""Semantic version parsing without importing a semver library on the shim hot path"""
+from collections import namedtuple
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        List,
+        Optional,
+        Tuple,
+    )
+
+    Bound = Optional[Tuple["Version", bool]]
+    Partial = Tuple[Optional[int], Optional[int], Optional[int], Optional[str]]
+
+
+class Version(
+    namedtuple("Version", ("major", "minor", "patch", "prerelease", "build"))
+):
+    """
+    Semantic version ordered by precedence as specified by https://semver.org
+    where build metadata is ignored and prerelease versions precede their release
+    """
+
+    __slots__ = ()
+
+    def __new__(
+        cls,
+        major: int,
+        minor: int = 0,
+        patch: int = 0,
+        prerelease: "Optional[str]" = None,
+        build: "Optional[str]" = None,
+    ):
+        return super().__new__(cls, major, minor, patch, prerelease, build)
+
+    def __str__(self) -> str:
+        version = f"{self.major}.{self.minor}.{self.patch}"
+        if self.prerelease:
+            version += f"-{self.prerelease}"
+        if self.build:
+            version += f"+{self.build}"
+        return version
+
+    def sort_key(
+        self,
+    ) -> "Tuple[int, int, int, bool, Tuple[Tuple[int, int, str], ...]]":
+        """Key ordering versions by precedence"""
+        prerelease_key = tuple(
+            (0, int(part), "") if part.isdigit() else (1, 0, part)
+            for part in (self.prerelease or "").split(".")
+            if self.prerelease
+        )
+        return self.major, self.minor, self.patch, not self.prerelease, prerelease_key
+
+    def __hash__(self) -> int:
+        return hash(self.sort_key())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Version):
+            return self.sort_key() == other.sort_key()
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        if isinstance(other, Version):
+            return self.sort_key() != other.sort_key()
+        return NotImplemented
+
+    def __lt__(self, other: object) -> bool:
+        if isinstance(other, Version):
+            return self.sort_key() < other.sort_key()
+        return NotImplemented
+
+    def __le__(self, other: object) -> bool:
+        if isinstance(other, Version):
+            return self.sort_key() <= other.sort_key()
+        return NotImplemented
+
+    def __gt__(self, other: object) -> bool:
+        if isinstance(other, Version):
+            return self.sort_key() > other.sort_key()
+        return NotImplemented
+
+    def __ge__(self, other: object) -> bool:
+        if isinstance(other, Version):
+            return self.sort_key() >= other.sort_key()
+        return NotImplemented
+
+
+def _is_identifier(part: str) -> bool:
+    return bool(part) and part.replace("-", "").isalnum() and part.isascii()
+
+
+def _is_number(part: str) -> bool:
+    return part.isdigit() and part.isascii() and (part == "0" or part[0] != "0")
+
+
+def parse(version: str) -> "Optional[Version]":
+    """
+    Parse a strict semantic version string e.g. 1.0.0, 1.0.0-rc.1+build.5
+
+    :param version: version string without the leading 'v'
+    :return: parsed version or None when the string is not a valid semantic version
+    """
+    core, plus, build = version.partition("+")
+    core, dash, prerelease = core.partition("-")
+    if (dash and not prerelease) or (plus and not build):
+        return None
+    numbers = core.split(".")
+    if len(numbers) != 3 or not all(map(_is_number, numbers)):
+        return None
+    if prerelease and not all(
+        _is_identifier(part) and (not part.isdigit() or _is_number(part))
+        for part in prerelease.split(".")
+    ):
+        return None
+    if build and not all(map(_is_identifier, build.split("."))):
+        return None
+    major, minor, patch = map(int, numbers)
+    return Version(major, minor, patch, prerelease or None, build or None)
+
+
+class Interval(namedtuple("Interval", ("lower", "upper", "prerelease"))):
+    """
+    Versions between optional (version, inclusive) lower and upper bounds,
+    prerelease versions are only included when the range names one
+    """
+
+    __slots__ = ()
+
+    def __contains__(self, version: object) -> bool:
+        if not isinstance(version, Version):
+            return False
+        if version.prerelease and not self.prerelease:
+            return False
+        if self.lower:
+            lower, inclusive = self.lower
+            if version < lower or (version == lower and not inclusive):
+                return False
+        if self.upper:
+            upper, inclusive = self.upper
+            if version > upper or (version == upper and not inclusive):
+                return False
+        return True
+
+
+_OPERATORS = ("<=", ">=", "<", ">", "=", "^", "~")
+_WILDCARDS = frozenset({"x", "X", "*"})
+
+
+def _parse_partial(version: str) -> "Optional[Partial]":
+    """Parse a possibly partial version e.g. 1, 1.2, 1.x, * with missing parts as None"""
+    if version[:1] in ("v", "V"):
+        version = version[1:]
+    core, plus, build = version.partition("+")
+    core, dash, prerelease = core.partition("-")
+    if (dash and not prerelease) or (plus and not build):
+        return None
+    numbers: "List[Optional[int]]" = []
+    for part in core.split(".") if core else ["*"]:
+        if part in _WILDCARDS or None in numbers:
+            numbers.append(None)
+        elif _is_number(part):
+            numbers.append(int(part))
+        else:
+            return None
+    if len(numbers) > 3 or (prerelease and len(numbers) != 3):
+        return None
+    if None in numbers and prerelease:
+        return None
+    if prerelease and not parse(f"0.0.0-{prerelease}"):
+        return None
+    numbers.extend([None] * (3 - len(numbers)))
+    return numbers[0], numbers[1], numbers[2], prerelease or None
+
+
+def _next(major: int, minor: "Optional[int]") -> "Version":
+    return Version(major + 1) if minor is None else Version(major, minor + 1)
+
+
+def _get_bounds(operator: str, partial: "Partial") -> "Tuple[Bound, Bound]":
+    """Get the lower and upper bounds of a comparator"""
+    # pylint: disable=too-many-return-statements
+    major, minor, patch, prerelease = partial
+    if major is None:
+        return None, None
+    floor = Version(major, minor or 0, patch or 0, prerelease)
+    if operator == "^":
+        if major or minor is None:
+            upper = Version(major + 1)
+        elif minor or patch is None:
+            upper = Version(0, minor + 1)
+        else:
+            upper = Version(0, 0, patch + 1)
+        return (floor, True), (upper, False)
+    if operator == "~":
+        return (floor, True), (_next(major, minor), False)
+    if operator == ">=":
+        return (floor, True), None
+    if operator == ">":
+        return (
+            (floor, False) if patch is not None else (_next(major, minor), True)
+        ), None
+    if operator == "<":
+        return None, (floor, False)
+    if operator == "<=":
+        return None, (
+            (floor, True) if patch is not None else (_next(major, minor), False)
+        )
+    if patch is not None:
+        return (floor, True), (floor, True)
+    return (floor, True), (_next(major, minor), False)
+
+
+def _intersect(bounds: "Tuple[Bound, Bound]", lower: "Bound", upper: "Bound"):
+    """Narrow the lower and upper bounds to their intersection with other bounds"""
+    new_lower, new_upper = bounds
+    if new_lower and (
+        not lower
+        or new_lower[0] > lower[0]
+        or (new_lower[0] == lower[0] and not new_lower[1])
+    ):
+        lower = new_lower
+    if new_upper and (
+        not upper
+        or new_upper[0] < upper[0]
+        or (new_upper[0] == upper[0] and not new_upper[1])
+    ):
+        upper = new_upper
+    return lower, upper
+
+
+def _parse_comparators(comparators: str) -> "Optional[Interval]":
+    """Parse space separated comparators or a hyphen range to the interval they allow"""
+    tokens = comparators.split()
+    lower: "Bound" = None
+    upper: "Bound" = None
+    if len(tokens) == 3 and tokens[1] == "-":
+        start, end = _parse_partial(tokens[0]), _parse_partial(tokens[2])
+        if not start or not end:
+            return None
+        lower, _ = _get_bounds(">=", start)
+        _, upper = _get_bounds("<=", end)
+        return Interval(lower, upper, bool(start[3] or end[3]))
+
+    prerelease = False
+    operator = ""
+    for token in tokens:
+        token_operator = next((op for op in _OPERATORS if token.startswith(op)), "")
+        if token == token_operator and not operator:
+            operator = token
+            continue
+        if operator and token_operator:
+            return None
+        operator = operator or token_operator
+        partial = _parse_partial(token[len(token_operator) :])
+        if not partial:
+            return None
+        lower, upper = _intersect(_get_bounds(operator, partial), lower, upper)
+        prerelease = prerelease or bool(partial[3])
+        operator = ""
+    if operator:
+        return None
+    return Interval(lower, upper, prerelease)
+
+
+def parse_range(version_range: str) -> "Optional[List[Interval]]":
+    """
+    Parse a version range as used in .nvmrc files and package.json engines e.g.
+    18, 18.x, ^18.2, ~20.1, >=18 <21, 18 - 20, ^16 || ^18
+
+    :param version_range: npm style version range
+    :return: intervals any of which a version must be in, None when not a valid range
+    """
+    if not version_range.strip():
+        return None
+    intervals = []
+    for comparators in version_range.split("||"):
+        interval = _parse_comparators(comparators)
+        if interval is None:
+            return None
+        intervals.append(interval)
+    return intervals
@@ -0,0 +1,77 @@
+"""Test alias mappings compiled to the terminal value of each alias"""
+from nvshim.utils.alias_graph import AliasGraph
+
+
+def test_alias_graph_resolves_values_not_in_mapping_to_themselves():
+    """Test versions and unknown aliases are returned as is"""
+    graph = AliasGraph({"default": "14"})
+    assert graph.resolve("16.1.0") == ("16.1.0", [])
+    assert graph.resolve("") == ("", [])
+    assert "default" in graph and "16.1.0" not in graph
+
+
+def test_alias_graph_records_alias_chain():
+    """Test each alias resolves to the end of its chain with the aliases traversed"""
+    graph = AliasGraph({"default": "node", "node": "stable", "stable": "18.2.0"})
+    assert graph.resolve("default") == ("18.2.0", ["default", "node", "stable"])
+    assert graph.resolve("node") == ("18.2.0", ["node", "stable"])
+    chain = graph.resolve("stable")[1]
+    chain.append("mutated")
+    assert graph.resolve("stable") == ("18.2.0", ["stable"])
+
+
+def test_alias_graph_stops_at_cycles():
+    """Test cyclic aliases end at the first alias seen twice"""
+    graph = AliasGraph({"a": "b", "b": "c", "c": "a", "d": "b", "e": "e"})
+    assert graph.resolve("a") == ("a", ["a", "b", "c"])
+    assert graph.resolve("b") == ("b", ["b", "c", "a"])
+    assert graph.resolve("d") == ("b", ["d", "b", "c", "a"])
+    assert graph.resolve("e") == ("e", ["e"])
+
+
+def test_alias_graph_resolves_deep_chains():
+    """Test long alias chains are followed without recursion"""
+    depth = 5000
+    mapping = {f"alias-{i}": f"alias-{i + 1}" for i in range(depth)}
+    mapping[f"alias-{depth}"] = "20.1.0"
+    graph = AliasGraph(mapping)
+    version, chain = graph.resolve("alias-0")
+    assert version == "20.1.0"
+    assert chain == [f"alias-{i}" for i in range(depth + 1)]
+    assert graph.resolve(f"alias-{depth - 1}") == (
+        "20.1.0",
+        [f"alias-{depth - 1}", f"alias-{depth}"],
+    )
+
+
+def test_alias_graph_runs_lazy_resolvers_once_when_needed():
+    """Test lazy resolvers only run when an alias chain reaches them"""
+    calls = []
+
+    def resolve_stable():
+        calls.append("stable")
+        return "lts/iron"
+
+    def resolve_iojs() -> None:
+        calls.append("iojs")
+
+    graph = AliasGraph(
+        {
+            "default": "node",
+            "node": "stable",
+            "stable": resolve_stable,
+            "iojs": resolve_iojs,
+            "lts/iron": "20.1.0",
+            "legacy": "14",
+        }
+    )
+    assert graph.resolve("legacy") == ("14", ["legacy"])
+    assert not calls
+    assert graph.resolve("default") == (
+        "20.1.0",
+        ["default", "node", "stable", "lts/iron"],
+    )
+    assert graph.resolve("node") == ("20.1.0", ["node", "stable", "lts/iron"])
+    assert graph.resolve("iojs") == (None, ["iojs"])
+    assert graph.resolve("iojs") == (None, ["iojs"])
+    assert calls == ["stable", "iojs"]
@@ -0,0 +1,120 @@
+"""Test persistent resolution cache"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from nvshim.utils import cache
+
+
+def test_cache_returns_nothing_when_missing(test_cache_dir):
+    """Test getting entry from a cache that has not been written"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    assert cache.get_entry(cache_path, "key") is None
+
+
+def test_cache_returns_entry_while_paths_unchanged(test_cache_dir, tmp_path):
+    """Test cache entry round trip when dependencies are unchanged"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    dependency = str(tmp_path / "dependency")
+    missing = str(tmp_path / "missing")
+    with open(dependency, "w", encoding="UTF-8") as open_file:
+        open_file.write("14")
+    cache.set_entry(cache_path, "key", [dependency, missing], bin_path="/bin/node")
+    entry = cache.get_entry(cache_path, "key")
+    assert entry and entry["bin_path"] == "/bin/node"
+    assert sorted(os.listdir(test_cache_dir)) == [
+        cache.CACHE_FILE_NAME,
+        f"{cache.CACHE_FILE_NAME}.lock",
+    ]
+
+
+def test_cache_invalidates_entry_when_paths_change(test_cache_dir, tmp_path):
+    """Test cache entry is stale after a dependency is modified or created"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    dependency = str(tmp_path / "dependency")
+    with open(dependency, "w", encoding="UTF-8") as open_file:
+        open_file.write("14")
+    cache.set_entry(cache_path, "modified", [dependency], bin_path=None)
+    cache.set_entry(cache_path, "created", [str(tmp_path / "new")], bin_path=None)
+    stat = os.stat(dependency)
+    os.utime(dependency, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    (tmp_path / "new").mkdir()
+    assert cache.get_entry(cache_path, "modified") is None
+    assert cache.get_entry(cache_path, "created") is None
+
+
+def test_cache_evicts_least_recently_stored(test_cache_dir):
+    """Test cache is bounded and keeps the most recently stored entries"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    for key in ("a", "b", "c"):
+        cache.set_entry(cache_path, key, [], max_entries=3, bin_path=key)
+    cache.set_entry(cache_path, "a", [], max_entries=3, bin_path="a")
+    cache.set_entry(cache_path, "d", [], max_entries=3, bin_path="d")
+    assert [*cache.load(cache_path)] == ["c", "a", "d"]
+
+
+def test_cache_hit_does_not_write(test_cache_dir, mocker):
+    """Test reading an entry leaves the cache file untouched"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    for key in ("a", "b"):
+        cache.set_entry(cache_path, key, [], bin_path=key)
+    mocked_save = mocker.spy(cache, "save")
+    assert cache.get_entry(cache_path, "a")
+    mocked_save.assert_not_called()
+    assert [*cache.load(cache_path)] == ["a", "b"]
+
+
+def test_cache_concurrent_writes_keep_all_entries(test_cache_dir):
+    """Test entries stored at the same time by different writers are all kept"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    keys = [f"key{index}" for index in range(16)]
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        for key in keys:
+            executor.submit(cache.set_entry, cache_path, key, [], bin_path=key)
+    assert sorted(cache.load(cache_path)) == sorted(keys)
+
+
+def test_cache_ignores_corrupted_file(test_cache_dir):
+    """Test unreadable cache file is treated as empty and replaced on write"""
+    cache_path = cache.get_cache_path(test_cache_dir)
+    os.makedirs(test_cache_dir)
+    with open(cache_path, "wb") as open_file:
+        open_file.write(b"\x00corrupted")
+    assert cache.get_entry(cache_path, "key") is None
+    cache.set_entry(cache_path, "key", [], bin_path=None)
+    assert [*cache.load(cache_path)] == ["key"]
+
+
+def test_cache_write_failure_is_ignored(tmp_path):
+    """Test failing to write the cache does not raise or leave temp files"""
+    not_a_dir = tmp_path / "not_a_dir"
+    not_a_dir.write_text("")
+    cache_path = str(not_a_dir / cache.CACHE_FILE_NAME)
+    cache.set_entry(cache_path, "key", [], bin_path=None)
+    assert cache.load(cache_path) == {}
+    assert os.listdir(tmp_path) == ["not_a_dir"]
+
+
+def test_mtime_cache_reuses_result_until_dependency_modified(tmp_path):
+    """Test cached results are recomputed only when a dependency changes"""
+    dependency = tmp_path / "alias"
+    dependency.write_text("14")
+    calls = []
+
+    @cache.mtime_cache(lambda path, **_: [path])
+    def read(path: str, *, suffix: str = "") -> str:
+        calls.append(path)
+        return Path(path).read_text(encoding="UTF-8") + suffix
+
+    assert read(str(dependency)) == "14"
+    assert read(str(dependency)) == "14"
+    assert read(str(dependency), suffix=".x") == "14.x"
+    assert len(calls) == 2
+
+    dependency.write_text("16")
+    stat = dependency.stat()
+    os.utime(str(dependency), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert read(str(dependency)) == "16"
+    read.cache_clear()  # type: ignore
+    assert read(str(dependency)) == "16"
+    assert len(calls) == 4
@@ -0,0 +1,96 @@
+"""Test environment util functions"""
+import pytest
+
+from nvshim.utils import environment
+from nvshim.utils.environment import (
+    EnvironmentVariable,
+    process_env,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("true", True),
+        ("false", False),
+        ("null", None),
+        ("0", 0),
+        ("1", 1),
+        ("007", "007"),
+        ("1.5", 1.5),
+        ('"quoted"', "quoted"),
+        ("[1]", [1]),
+        ("/home/.nvm", "/home/.nvm"),
+        ("tr", "tr"),
+    ],
+)
+def test_env_var_values_are_parsed_as_json(value, expected):
+    """Test environment variable values are json parsed falling back to raw value"""
+    with process_env({EnvironmentVariable.NVM_DIR.value: value}):
+        parsed = environment._get_env_var(  # pylint: disable=protected-access
+            EnvironmentVariable.NVM_DIR
+        )
+        assert parsed == expected
+
+
+def test_process_env_restores_environment_on_error():
+    """Test environment is reset when the wrapped code raises"""
+    with pytest.raises(ValueError), process_env({}):
+        raise ValueError()
+
+    assert environment.os.environ
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("false", None), ("0", None), ("true", 60.0), ("2.5", 2.5)],
+)
+def test_get_nvm_session_idle_timeout(monkeypatch, value, expected):
+    """Test nvm sessions are opt in with a default or given idle timeout"""
+    if value is None:
+        monkeypatch.delenv(EnvironmentVariable.NVM_SESSION.value, raising=False)
+    else:
+        monkeypatch.setenv(EnvironmentVariable.NVM_SESSION.value, value)
+    assert environment.get_nvm_session_idle_timeout(60) == expected
+
+
+@pytest.mark.parametrize(
+    "bin_dir, env, expected",
+    [
+        ("/v2/bin", {"PATH": "/usr/bin"}, {"PATH": "/v2/bin:/usr/bin"}),
+        (
+            "/v2/bin",
+            {"PATH": "/v1/bin:/shims::/usr/bin", "NVM_BIN": "/v1/bin"},
+            {"PATH": "/v2/bin:/shims:/usr/bin"},
+        ),
+        (
+            None,
+            {"PATH": "/v1/bin:/usr/bin", "NVM_BIN": "/v1/bin"},
+            {"PATH": "/usr/bin"},
+        ),
+    ],
+)
+def test_get_node_bin_env_replaces_previous_bin_dir(bin_dir, env, expected):
+    """Test node bin folder is put first on the path in place of the previous one"""
+    if bin_dir:
+        expected = {**expected, EnvironmentVariable.NVM_BIN.value: bin_dir}
+    assert environment.get_node_bin_env(bin_dir, env) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, (".nvmrc",)),
+        ("", (".nvmrc",)),
+        ("package.json, .nvmrc", ("package.json", ".nvmrc")),
+        (".node-version,unknown,,.tool-versions", (".node-version", ".tool-versions")),
+        ("unknown", (".nvmrc",)),
+    ],
+)
+def test_get_version_files(monkeypatch, value, expected):
+    """Test version file names are read in order skipping unsupported names"""
+    if value is None:
+        monkeypatch.delenv(EnvironmentVariable.VERSION_FILES.value, raising=False)
+    else:
+        monkeypatch.setenv(EnvironmentVariable.VERSION_FILES.value, value)
+    assert environment.get_version_files((".nvmrc",)) == expected
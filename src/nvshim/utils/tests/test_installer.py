@@ -0,0 +1,101 @@
+"""Test installing node versions from a local mirror"""
+import os
+
+import pytest
+
+from nvshim.utils import installer
+
+
+def test_get_mirror_dir_from_path_or_file_url(tmp_path):
+    """Test mirror location can be given as a local path or file url"""
+    assert installer.get_mirror_dir(str(tmp_path)) == str(tmp_path)
+    assert installer.get_mirror_dir(tmp_path.as_uri()) == str(tmp_path)
+
+
+def test_get_archive_platform(mocker):
+    """Test release archive platform names for supported systems"""
+    mocker.patch("nvshim.utils.installer.sys.platform", "linux")
+    mocker.patch("nvshim.utils.installer.platform.machine", return_value="x86_64")
+    assert installer.get_archive_platform() == "linux-x64"
+    mocker.patch("nvshim.utils.installer.sys.platform", "win32")
+    assert installer.get_archive_platform() is None
+
+
+def test_get_mirror_archives_lists_platform_archives(tmp_path, test_mirror):
+    """Test only archives for the platform are listed from the checksums file"""
+    mirror_dir = test_mirror(["16.1.0", "16.2.0"])
+    archives = installer.get_mirror_archives(mirror_dir, "linux-x64")
+    assert sorted(archives) == ["16.1.0", "16.2.0"]
+    assert archives["16.1.0"][0] == "node-v16.1.0-linux-x64.tar.xz"
+    assert not installer.get_mirror_archives(str(tmp_path / "missing"), "linux-x64")
+
+
+def test_get_mirror_release_matches_latest_release(mocker, test_mirror):
+    """Test the latest archive matching the version is the release to install"""
+    mocker.patch(
+        "nvshim.utils.installer.get_archive_platform", return_value="linux-x64"
+    )
+    mirror_dir = test_mirror(["16.1.0", "16.2.0", "17.0.0"])
+    release = installer.get_mirror_release(mirror_dir, "16")
+    assert release and release[:2] == (
+        "16.2.0",
+        os.path.join(mirror_dir, "node-v16.2.0-linux-x64.tar.xz"),
+    )
+    assert installer.get_mirror_release(mirror_dir, "18") is None
+
+
+def test_install_archive_extracts_release(tmp_path, test_mirror):
+    """Test archive is extracted without the release folder and published"""
+    members = [
+        ("bin/node", b"#!/bin/sh\n"),
+        ("lib/node_modules/npm/bin/npm-cli.js", b"#!/bin/sh\n"),
+        ("bin/npm", "../lib/node_modules/npm/bin/npm-cli.js"),
+    ]
+    mirror_dir = test_mirror(["16.1.0"], members=members)
+    file_name, checksum = installer.get_mirror_archives(mirror_dir, "linux-x64")[
+        "16.1.0"
+    ]
+    install_dir = tmp_path / "versions" / "node" / "v16.1.0"
+    installer.install_archive(
+        os.path.join(mirror_dir, file_name), checksum, str(install_dir)
+    )
+    assert os.access(str(install_dir / "bin" / "node"), os.X_OK)
+    assert os.readlink(str(install_dir / "bin" / "npm")).endswith("npm-cli.js")
+    assert os.path.exists(str(install_dir / "bin" / "npm"))
+    assert os.listdir(str(install_dir.parent)) == ["v16.1.0"]
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        [("../escape", b"")],
+        [("bin/node", "../../../escape")],
+        [("bin/node", "/etc/passwd")],
+    ],
+)
+def test_install_archive_rejects_unsafe_members(tmp_path, test_mirror, members):
+    """Test archive members writing outside the install folder are rejected"""
+    mirror_dir = test_mirror(["16.1.0"], members=members)
+    file_name, checksum = installer.get_mirror_archives(mirror_dir, "linux-x64")[
+        "16.1.0"
+    ]
+    install_dir = tmp_path / "versions" / "v16.1.0"
+    with pytest.raises(installer.ArchiveInstallError):
+        installer.install_archive(
+            os.path.join(mirror_dir, file_name), checksum, str(install_dir)
+        )
+    assert sorted(os.listdir(str(tmp_path))) == ["mirror"]
+
+
+def test_install_archive_rejects_checksum_mismatch(tmp_path, test_mirror):
+    """Test corrupted archive is not published"""
+    mirror_dir = test_mirror(["16.1.0"], corrupt=["16.1.0"])
+    file_name, checksum = installer.get_mirror_archives(mirror_dir, "linux-x64")[
+        "16.1.0"
+    ]
+    install_dir = tmp_path / "versions" / "v16.1.0"
+    with pytest.raises(installer.ArchiveInstallError, match="Checksum mismatch"):
+        installer.install_archive(
+            os.path.join(mirror_dir, file_name), checksum, str(install_dir)
+        )
+    assert os.listdir(str(install_dir.parent)) == []
@@ -0,0 +1,44 @@
+"""Test inter process file locks"""
+import os
+import threading
+
+import pytest
+
+from nvshim.utils.lock import file_lock
+
+
+def test_file_lock_creates_lock_file(tmp_path):
+    """Test lock is acquired without waiting when not held"""
+    lock_path = str(tmp_path / "locks" / "test.lock")
+    with file_lock(lock_path, timeout=1) as wait_seconds:
+        assert os.path.exists(lock_path)
+    assert wait_seconds < 1
+
+
+def test_file_lock_waits_for_holder_to_release(tmp_path):
+    """Test lock waits until the holder releases and reports the wait"""
+    lock_path = str(tmp_path / "test.lock")
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with file_lock(lock_path, timeout=1):
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    threading.Timer(0.2, release.set).start()
+    with file_lock(lock_path, timeout=5) as wait_seconds:
+        assert release.is_set()
+    holder.join()
+    assert wait_seconds >= 0.2
+
+
+def test_file_lock_times_out(tmp_path):
+    """Test lock raises when not acquired before the timeout"""
+    lock_path = str(tmp_path / "test.lock")
+    with file_lock(lock_path, timeout=1), pytest.raises(TimeoutError):
+        with file_lock(lock_path, timeout=0.1):
+            pass
@@ -1,12 +1,18 @@
 """Test process util functions"""
+import os
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from nvshim.utils import (
     constants,
+    environment,
     process,
 )
+from nvshim.utils.environment import EnvironmentVariable
 
 
 def test_process_run_completes_successfully():
@@ -33,7 +39,131 @@ def test_process_run_handles_exception_interrupt(mocker, capsys, snapshot):
     mocked_sys_exit = mocker.patch("sys.exit")
     args = ("bash", "-c", "echo 1")
     process.run(*args)
-    mocked_process_run.assert_called_once_with(args, check=True, encoding="UTF-8")
+    mocked_process_run.assert_called_once_with(
+        args, check=True, encoding="UTF-8", env=mocker.ANY
+    )
     mocked_sys_exit.assert_called_once_with(constants.ErrorCode.KEYBOARD_INTERRUPT)
     captured = capsys.readouterr()
     snapshot.assert_match(process.clean_output(captured.out))
+
+
+def test_process_stream_yields_lines_as_printed():
+    """Test stream yields decoded or raw lines and kills the process when closed"""
+    lines = process.stream("sh", "-c", "echo first; echo second; sleep 10")
+    started = time.monotonic()
+    assert [next(lines), next(lines)] == ["first\n", "second\n"]
+    lines.close()
+    assert time.monotonic() - started < 5
+    assert [*process.stream("printf", "a\\nb", encoding=None)] == [b"a\n", b"b"]
+
+
+def test_process_stream_handles_exception_system_exit():
+    """Test stream exits with the process exit code once the output is consumed"""
+    lines = process.stream("sh", "-c", "echo partial; exit 3")
+    assert next(lines) == "partial\n"
+    with pytest.raises(SystemExit) as exc_info:
+        next(lines)
+
+    assert exc_info.value.code == 3
+
+
+def test_process_run_uses_given_environment_without_mutating_global(monkeypatch):
+    """Test run passes an explicit environment built from env to the process"""
+    monkeypatch.setenv("NVSHIM_TEST", "global")
+    monkeypatch.delenv(EnvironmentVariable.AUTO_INSTALL.value, raising=False)
+    output = process.run(
+        "bash",
+        "-c",
+        'echo "$NVSHIM_TEST $NVSHIM_AUTO_INSTALL"',
+        env={"NVSHIM_TEST": "local", "PATH": os.environ["PATH"]},
+        stdout=subprocess.PIPE,
+    ).stdout.strip()
+    assert output == "local false"
+    assert os.environ["NVSHIM_TEST"] == "global"
+    assert EnvironmentVariable.AUTO_INSTALL.value not in os.environ
+
+
+def test_process_run_is_thread_safe_with_different_environments():
+    """Test concurrent runs each see only their own environment"""
+    runs = 64
+
+    def run_with_env(index: int) -> str:
+        env = {**os.environ, "NVSHIM_TEST": str(index)}
+        return process.run(
+            "sh", "-c", 'echo "$NVSHIM_TEST"', env=env, stdout=subprocess.PIPE
+        ).stdout.strip()
+
+    environ_before = {**os.environ}
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        outputs = [*executor.map(run_with_env, range(runs))]
+
+    assert outputs == [str(index) for index in range(runs)]
+    assert {**os.environ} == environ_before
+
+
+def test_process_exec_replace_uses_run_environment(mocker):
+    """Test exec replace passes the binary, args and built environment to execve"""
+    mocked_execve = mocker.patch("nvshim.utils.process.os.execve", autospec=True)
+    process.exec_replace("/bin/node", "--version")
+    bin_path, args, env = mocked_execve.call_args[0]
+    assert (bin_path, args) == ("/bin/node", ("/bin/node", "--version"))
+    assert env[EnvironmentVariable.AUTO_INSTALL.value] == "false"
+    assert env["PATH"].startswith(f"{os.path.dirname(sys.executable)}:")
+
+
+@pytest.mark.parametrize(
+    "node_bin_first, expected_path",
+    [
+        ("false", "{shims_dir}:/v1/bin:/usr/bin"),
+        ("true", "/v1/bin:{shims_dir}:/usr/bin"),
+    ],
+)
+def test_process_exec_replace_keeps_node_bin_dir_first_when_enabled(
+    mocker, node_bin_first, expected_path
+):
+    """Test node bin folder stays ahead of the shims folder on the path only when enabled"""
+    mocked_execve = mocker.patch("nvshim.utils.process.os.execve", autospec=True)
+    env = {EnvironmentVariable.NVM_BIN.value: "/v1/bin", "PATH": "/v1/bin:/usr/bin"}
+    with environment.process_env(
+        {**os.environ, EnvironmentVariable.NODE_BIN_FIRST.value: node_bin_first}
+    ):
+        process.exec_replace("/v1/bin/node", env=env)
+    assert mocked_execve.call_args[0][2]["PATH"] == expected_path.format(
+        shims_dir=os.path.dirname(sys.executable)
+    )
+
+
+def test_process_exec_replace_handles_exec_failure(mocker, capsys):
+    """Test exec replace exits with correct error code when exec fails"""
+    mocker.patch(
+        "nvshim.utils.process.os.execve",
+        autospec=True,
+        side_effect=FileNotFoundError("No such file or directory"),
+    )
+    with pytest.raises(SystemExit) as exc_info:
+        process.exec_replace("/missing/node")
+
+    assert exc_info.value.code == constants.ErrorCode.EXECUTABLE_NOT_FOUND
+    assert "Unable to execute '/missing/node'" in capsys.readouterr().out
+
+
+def test_process_exec_replace_falls_back_to_run_on_windows(mocker):
+    """Test exec replace runs as sub process where exec is not supported"""
+    mocker.patch("nvshim.utils.process.os.name", "nt")
+    mocked_run = mocker.patch("nvshim.utils.process.run", autospec=True)
+    with pytest.raises(SystemExit) as exc_info:
+        process.exec_replace("node.exe", "--version")
+
+    mocked_run.assert_called_once_with("node.exe", "--version", env=None)
+    assert exc_info.value.code == 0
+
+
+def test_process_exec_replace_exits_with_process_code():
+    """Test exec replaced process exit code is returned without translation"""
+    script = "from nvshim.utils import process; process.exec_replace('/bin/sh', '-c', 'exit 7')"
+    completed = subprocess.run(
+        (sys.executable, "-c", script),
+        check=False,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    assert completed.returncode == 7
@@ -0,0 +1,96 @@
+"""Test semantic version parsing"""
+import pytest
+
+from nvshim.utils.semver import (
+    Version,
+    parse,
+    parse_range,
+)
+
+
+@pytest.mark.parametrize(
+    "version",
+    [
+        "0.0.0",
+        "14.5.0",
+        "1.0.0-alpha",
+        "1.0.0-0.3.7",
+        "1.0.0-x.7.z.92",
+        "1.0.0+20130313144700",
+        "1.0.0-beta+exp.sha.5114f85",
+    ],
+)
+def test_parse_round_trips_valid_versions(version):
+    """Test valid semantic versions are parsed and formatted back unchanged"""
+    parsed = parse(version)
+    assert parsed is not None
+    assert str(parsed) == version
+
+
+@pytest.mark.parametrize(
+    "version",
+    ["", "1", "1.0", "v1.0.0", "01.0.0", "1.0.0-", "1.0.0+", "1.0.0-01", "1.a.0"],
+)
+def test_parse_rejects_invalid_versions(version):
+    """Test invalid semantic versions are not parsed"""
+    assert parse(version) is None
+
+
+def test_version_ordering_follows_semver_precedence():
+    """Test prerelease and build metadata precedence rules"""
+    ordered = [
+        "1.0.0-alpha",
+        "1.0.0-alpha.1",
+        "1.0.0-alpha.beta",
+        "1.0.0-beta",
+        "1.0.0-beta.2",
+        "1.0.0-beta.11",
+        "1.0.0-rc.1",
+        "1.0.0",
+        "1.0.1",
+        "1.10.0",
+        "2.0.0",
+    ]
+    assert [str(v) for v in sorted(map(parse, reversed(ordered)))] == ordered
+    assert parse("1.0.0+build.1") == Version(1, 0, 0)
+    assert len({Version(1, 0, 0, build="a"), Version(1, 0, 0)}) == 1
+    assert max(Version(14, 5, 0), Version(9, 11, 2)) == Version(14, 5, 0)
+
+
+@pytest.mark.parametrize(
+    "version_range,included,excluded",
+    [
+        ("18", ["18.0.0", "18.20.8"], ["17.9.9", "19.0.0"]),
+        ("v18.2", ["18.2.0", "18.2.9"], ["18.3.0"]),
+        ("18.x", ["18.0.0", "18.99.0"], ["19.0.0"]),
+        ("18.2.0", ["18.2.0"], ["18.2.1"]),
+        ("^18.2", ["18.2.0", "18.20.8"], ["18.1.9", "19.0.0"]),
+        ("^0.2.3", ["0.2.3", "0.2.9"], ["0.3.0"]),
+        ("^0.0.3", ["0.0.3"], ["0.0.4"]),
+        ("~20.1", ["20.1.0", "20.1.9"], ["20.2.0"]),
+        ("~1", ["1.0.0", "1.9.0"], ["2.0.0"]),
+        (">=18 <21", ["18.0.0", "20.19.5"], ["17.9.0", "21.0.0"]),
+        (">= 18 < 21", ["18.0.0"], ["21.0.0"]),
+        (">16.1 <=18", ["16.2.0", "18.9.0"], ["16.1.9", "19.0.0"]),
+        ("16 - 18.2", ["16.0.0", "18.2.9"], ["15.9.9", "18.3.0"]),
+        ("^16 || ^20", ["16.1.0", "20.0.0"], ["18.0.0"]),
+        ("*", ["0.0.1", "22.0.0"], ["22.0.0-rc.1"]),
+        ("18.0.0-rc.1", ["18.0.0-rc.1"], ["18.0.0"]),
+    ],
+)
+def test_parse_range_matches_versions(version_range, included, excluded):
+    """Test npm style ranges include and exclude the expected versions"""
+    intervals = parse_range(version_range)
+    assert intervals
+    for version in included:
+        assert any(parse(version) in interval for interval in intervals), version
+    for version in excluded:
+        assert not any(parse(version) in interval for interval in intervals), version
+
+
+@pytest.mark.parametrize(
+    "version_range", ["", "default", "lts/*", "node", ">=", "1.2.3.4", "18 - ", "^^1"]
+)
+def test_parse_range_rejects_aliases_and_invalid_ranges(version_range):
+    """Test aliases and malformed ranges are not parsed as ranges"""
+    assert parse_range(version_range) is None
@@ -0,0 +1,48 @@
+"""Test invocation traces written as json lines"""
+import json
+
+from nvshim.utils import trace
+
+
+def test_trace_does_nothing_when_disabled(tmp_path):
+    """Test no trace is kept or written without a trace file"""
+    trace.start(None)
+    trace.mark("nvmrc")
+    trace.record(version="14.5.0")
+    trace.record_subprocess("nvm version")
+    trace.flush()
+
+    assert not trace.is_enabled()
+    assert not list(tmp_path.iterdir())
+
+
+def test_trace_appends_json_line_per_invocation(tmp_path):
+    """Test each traced invocation is appended as a line with its phase timings"""
+    trace_path = tmp_path / "trace.jsonl"
+    for version in ("14.5.0", "16.1.0"):
+        trace.start(str(trace_path))
+        assert trace.is_enabled()
+        trace.mark("nvmrc")
+        trace.mark("resolve")
+        trace.mark("nvmrc")
+        trace.record(version=version, alias_chain=["default"])
+        trace.record_subprocess("nvm version")
+        trace.flush()
+        trace.flush()
+
+    traces = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [entry["version"] for entry in traces] == ["14.5.0", "16.1.0"]
+    for entry in traces:
+        assert sorted(entry["phases"]) == ["nvmrc", "resolve"]
+        assert entry["total"] >= sum(entry["phases"].values()) >= 0
+        assert entry["alias_chain"] == ["default"]
+        assert entry["subprocesses"] == ["nvm version"]
+    assert not trace.is_enabled()
+
+
+def test_trace_ignores_unwritable_trace_file(tmp_path):
+    """Test failing to write the trace does not fail the invocation"""
+    trace.start(str(tmp_path / "missing" / "trace.jsonl"))
+    trace.flush()
+
+    assert not (tmp_path / "missing").exists()
@@ -0,0 +1,26 @@
+"""Test unix socket servers"""
+import os
+import shutil
+import socket
+import tempfile
+
+from nvshim.utils import unix_socket
+
+
+def test_listen_replaces_stale_socket_and_close_removes_it():
+    """Test a stale socket file is replaced and removed once the server is closed"""
+    socket_dir = tempfile.mkdtemp(prefix="nvshim")
+    socket_path = os.path.join(socket_dir, "sockets", "s.sock")
+    try:
+        os.makedirs(os.path.dirname(socket_path))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(socket_path)
+        assert os.path.exists(socket_path)
+
+        server = unix_socket.listen(socket_path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socket_path)
+        unix_socket.close(server, socket_path)
+        assert not os.path.exists(socket_path)
+    finally:
+        shutil.rmtree(socket_dir)
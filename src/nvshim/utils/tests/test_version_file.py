@@ -0,0 +1,132 @@
+"""Test project version file discovery"""
+import os
+
+import pytest
+
+from nvshim.utils import version_file
+from nvshim.utils.constants import (
+    DEFAULT_VERSION_FILES,
+    VERSION_FILES,
+)
+
+DEEP_DIR_LEVELS = 40
+
+
+@pytest.fixture
+def test_deep_dir(tmp_path):
+    """Prepare a deeply nested folder with a .nvmrc file at the top"""
+    (tmp_path / ".nvmrc").write_text("v14.5.0\n")
+    deep_dir = tmp_path.joinpath(*(f"level{level}" for level in range(DEEP_DIR_LEVELS)))
+    deep_dir.mkdir(parents=True)
+    for level in range(0, DEEP_DIR_LEVELS, 5):
+        (deep_dir.parents[level] / "README.md").write_text("readme")
+    yield str(deep_dir)
+
+
+@pytest.mark.parametrize(
+    "file_name, content, expected",
+    [
+        (".nvmrc", "v14.5.0\nignored\n", "v14.5.0"),
+        (".node-version", "18.17.0\n", "18.17.0"),
+        (".tool-versions", "python 3.11\nnodejs 18.17.0 16.0.0 # pinned\n", "18.17.0"),
+        (".tool-versions", "# comment\n\nnode lts/iron\n", "lts/iron"),
+        (".tool-versions", "python 3.11\n", None),
+        ("package.json", '{"engines": {"node": " >=18 <21 "}}', ">=18 <21"),
+        ("package.json", '{"name": "project", "version": "1.0.0"}', None),
+        ("package.json", '{"engines": {"npm": ">=9"}}', None),
+        ("package.json", '{"engines": ["node"]}', None),
+        ("package.json", '["engines"]', None),
+        ("package.json", '{"engines": ', None),
+    ],
+)
+def test_read_gets_node_version_from_version_file(
+    tmp_path, file_name, content, expected
+):
+    """Test node version is read from each supported version file format"""
+    file_path = tmp_path / file_name
+    file_path.write_text(content)
+    assert version_file.read(str(file_path)) == expected
+
+
+def test_read_returns_none_for_missing_file(tmp_path):
+    """Test missing version files do not set a version"""
+    assert version_file.read(str(tmp_path / ".nvmrc")) is None
+
+
+def test_get_dir_version_file_uses_precedence_and_skips_files_without_version(
+    tmp_path,
+):
+    """Test version file listed first in precedence that sets a version is used"""
+    (tmp_path / ".tool-versions").write_text("python 3.11\n")
+    (tmp_path / ".node-version").write_text("18.17.0\n")
+    (tmp_path / "package.json").write_text('{"engines": {"node": ">=18"}}')
+    (tmp_path / ".nvmrc").mkdir()
+    dir_path = str(tmp_path)
+
+    assert version_file.get_dir_version_file(dir_path, DEFAULT_VERSION_FILES) == str(
+        tmp_path / ".node-version"
+    )
+    assert version_file.get_dir_version_file(
+        dir_path, (".tool-versions", "package.json", ".node-version")
+    ) == str(tmp_path / "package.json")
+    assert version_file.get_dir_version_file(dir_path, (".nvmrc",)) is None
+    assert (
+        version_file.get_dir_version_file(str(tmp_path / "missing"), VERSION_FILES)
+        is None
+    )
+
+
+def test_find_uses_nearest_folder_with_version_file(tmp_path):
+    """Test nearest folder wins over version files with higher precedence further up"""
+    nested_dir = tmp_path / "packages" / "app"
+    nested_dir.mkdir(parents=True)
+    (tmp_path / ".nvmrc").write_text("14")
+    (nested_dir / "package.json").write_text('{"name": "app"}')
+    (tmp_path / "packages" / ".node-version").write_text("16")
+
+    assert version_file.find(str(nested_dir), VERSION_FILES) == str(
+        tmp_path / "packages" / ".node-version"
+    )
+    assert version_file.find(str(nested_dir), (".nvmrc",)) == str(tmp_path / ".nvmrc")
+    assert version_file.find(str(nested_dir / "missing"), (".nvmrc",)) == str(
+        tmp_path / ".nvmrc"
+    )
+
+
+def test_find_checks_each_folder_once_without_resolving_paths(
+    mocker, tmp_path, test_deep_dir
+):
+    """Test a deep lookup only stats the version file names of each folder once"""
+    mocked_calls = {
+        name: mocker.spy(module, name)
+        for module, name in (
+            (os, "scandir"),
+            (os, "stat"),
+            (os, "lstat"),
+            (os.path, "exists"),
+            (os.path, "realpath"),
+        )
+    }
+    nvmrc_path = version_file.find(test_deep_dir, VERSION_FILES)
+
+    assert nvmrc_path == str(tmp_path / ".nvmrc")
+    call_counts = {name: mocked.call_count for name, mocked in mocked_calls.items()}
+    assert call_counts == {
+        "scandir": 0,
+        "stat": DEEP_DIR_LEVELS * len(VERSION_FILES) + 1,
+        "lstat": 0,
+        "exists": 0,
+        "realpath": 0,
+    }
+
+
+def test_find_checks_every_folder_up_to_root_when_none_found(mocker, test_deep_dir):
+    """Test lookup without any version file checks each folder up to the root once"""
+    mocked_stat = mocker.spy(os, "stat")
+    assert version_file.find(test_deep_dir, (".node-version",)) is None
+    checked_dirs = [os.path.dirname(call[0][0]) for call in mocked_stat.call_args_list]
+    assert checked_dirs[0] == test_deep_dir
+    assert checked_dirs[-1] == os.path.abspath(os.sep)
+    assert (
+        len(checked_dirs) == len(set(checked_dirs)) == test_deep_dir.count(os.sep) + 1
+    )
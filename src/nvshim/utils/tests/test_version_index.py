@@ -0,0 +1,65 @@
+"""Test sorted version index range queries"""
+from nvshim.utils.semver import Version
+from nvshim.utils.version_index import VersionIndex
+
+VERSIONS = (
+    "v16.20.2",
+    "v18.2.0",
+    "v18.20.8",
+    "v20.1.0",
+    "v20.1.9",
+    "v20.19.5",
+    "v22.0.0-rc.1",
+    "v22.20.0",
+    "system",
+    "None",
+)
+
+
+def test_version_index_skips_invalid_versions_and_sorts():
+    """Test index holds only valid versions in precedence order"""
+    index = VersionIndex(VERSIONS)
+    assert len(index) == 8
+    assert [str(version) for version in index][:2] == ["16.20.2", "18.2.0"]
+    assert [*index][-2:] == [Version(22, 0, 0, "rc.1"), Version(22, 20, 0)]
+
+
+def test_version_index_from_sorted_versions_answers_same_queries(mocker):
+    """Test index of already sorted versions matches the index built from strings"""
+    index = VersionIndex(VERSIONS)
+    mocked_parse = mocker.patch("nvshim.utils.version_index.semver.parse")
+    sorted_index = VersionIndex.from_sorted(Version(*version) for version in index)
+    mocked_parse.assert_not_called()
+    assert [*sorted_index] == [*index]
+    for version_range in ("18", "^18.2", "22.0.0-rc.1", ">=18 <21", "17"):
+        assert sorted_index.max_satisfying(version_range) == index.max_satisfying(
+            version_range
+        )
+
+
+def test_version_index_max_satisfying():
+    """Test highest installed version is found for versions and ranges"""
+    index = VersionIndex(VERSIONS)
+    assert index.max_satisfying("18") == Version(18, 20, 8)
+    assert index.max_satisfying("v18.2.0") == Version(18, 2, 0)
+    assert index.max_satisfying("^18.2") == Version(18, 20, 8)
+    assert index.max_satisfying("~20.1") == Version(20, 1, 9)
+    assert index.max_satisfying(">=18 <21") == Version(20, 19, 5)
+    assert index.max_satisfying("18.x || 16") == Version(18, 20, 8)
+    assert index.max_satisfying("*") == Version(22, 20, 0)
+    assert index.max_satisfying("22.0.0-rc.1") == Version(22, 0, 0, "rc.1")
+    assert index.max_satisfying("17") is None
+    assert index.max_satisfying("default") is None
+
+
+def test_version_index_satisfying():
+    """Test all installed versions in a range are listed in order"""
+    index = VersionIndex(VERSIONS)
+    assert index.satisfying("^20 || 16") == [
+        Version(16, 20, 2),
+        Version(20, 1, 0),
+        Version(20, 1, 9),
+        Version(20, 19, 5),
+    ]
+    assert index.satisfying(">22") == []
+    assert VersionIndex([]).satisfying("*") == []
@@ -0,0 +1,105 @@
+"""Per invocation timing of the shim phases appended as json lines to a trace file"""
+import os
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Dict,
+        List,
+        Optional,
+    )
+
+
+class Trace:
+    """
+    Timings and details of a shim invocation, every method does nothing
+    unless tracing was started with a trace file
+    """
+
+    def __init__(self) -> None:
+        self.path: "Optional[str]" = None
+        self.fields: "Dict[str, object]" = {}
+        self.phases: "Dict[str, float]" = {}
+        self.subprocesses: "List[str]" = []
+        self.started = 0.0
+        self.last_mark = 0.0
+
+    def start(self, trace_path: "Optional[str]"):
+        """
+        Start tracing the invocation
+
+        :param trace_path: file to append the trace to, None to disable tracing
+        """
+        self.path = trace_path
+        if not trace_path:
+            return
+        self.phases = {}
+        self.subprocesses = []
+        self.fields = {
+            "time": time.time(),
+            "pid": os.getpid(),
+            "cwd": os.getcwd(),
+            "phases": self.phases,
+            "subprocesses": self.subprocesses,
+        }
+        self.started = self.last_mark = time.monotonic()
+
+    def is_enabled(self) -> bool:
+        """Return if the invocation is being traced"""
+        return bool(self.path)
+
+    def mark(self, phase: str):
+        """
+        Add the milliseconds since the previous mark to the phase
+
+        :param phase: name of the phase that just ended
+        """
+        if not self.path:
+            return
+        now = time.monotonic()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self.last_mark) * 1e3
+        self.last_mark = now
+
+    def record(self, **fields: object):
+        """
+        Set fields of the trace
+
+        :param fields: json serialisable values to record
+        """
+        if self.path:
+            self.fields.update(fields)
+
+    def record_subprocess(self, command: str):
+        """
+        Record a subprocess spawned while resolving
+
+        :param command: description of the command run
+        """
+        if self.path:
+            self.subprocesses.append(command)
+
+    def flush(self):
+        """Append the trace as a single json line and stop tracing, ignoring write errors"""
+        trace_path, self.path = self.path, None
+        if not trace_path:
+            return
+        self.fields["total"] = (time.monotonic() - self.started) * 1e3
+
+        import json  # pylint: disable=import-outside-toplevel
+
+        line = json.dumps(self.fields, default=str, separators=(",", ":"))
+        try:
+            with open(trace_path, "a", encoding="UTF-8") as trace_file:
+                trace_file.write(f"{line}\n")
+        except OSError:
+            pass
+
+
+_trace = Trace()
+start = _trace.start
+is_enabled = _trace.is_enabled
+mark = _trace.mark
+record = _trace.record
+record_subprocess = _trace.record_subprocess
+flush = _trace.flush
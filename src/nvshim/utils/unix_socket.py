@@ -0,0 +1,35 @@
+"""Unix socket servers shared by the background nvshim processes"""
+import os
+import socket
+
+LISTEN_BACKLOG = 128
+
+
+def listen(socket_path: str) -> "socket.socket":
+    """
+    Listen on the unix socket, replacing a stale socket file left at the path
+
+    :param socket_path: path of the unix socket, created with its folder if missing
+    :return: the listening server socket
+    """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    server.bind(socket_path)
+    server.listen(LISTEN_BACKLOG)
+    return server
+
+
+def close(server: "socket.socket", socket_path: str):
+    """
+    Stop listening and remove the socket file
+
+    :param server: the listening server socket
+    :param socket_path: path of the unix socket
+    """
+    server.close()
+    try:
+        os.remove(socket_path)
+    except OSError:
+        pass
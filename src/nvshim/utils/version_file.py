@@ -0,0 +1,127 @@
+"""Discovery of the project files setting the node version e.g. .nvmrc, package.json"""
+import os
+from typing import TYPE_CHECKING
+
+from .constants import (
+    PACKAGE_JSON,
+    TOOL_VERSIONS,
+)
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Mapping,
+        Optional,
+        Sequence,
+    )
+
+TOOL_VERSIONS_NODE_PLUGINS = frozenset({"nodejs", "node"})
+
+
+def _read_first_line(file_path: str) -> str:
+    with open(file_path, encoding="UTF-8") as open_file:
+        return open_file.readline().strip()
+
+
+def _read_tool_versions(file_path: str) -> "Optional[str]":
+    """Get the first node version of the nodejs line in an asdf .tool-versions file"""
+    with open(file_path, encoding="UTF-8") as open_file:
+        for line in open_file:
+            words = line.partition("#")[0].split()
+            if len(words) > 1 and words[0] in TOOL_VERSIONS_NODE_PLUGINS:
+                return words[1]
+    return None
+
+
+def _read_package_json(file_path: str) -> "Optional[str]":
+    """
+    Get the node engines range of a package.json file,
+    only importing the json parser when the file mentions engines
+    """
+    with open(file_path, encoding="UTF-8") as open_file:
+        content = open_file.read()
+    if '"engines"' not in content:
+        return None
+
+    import json  # pylint: disable=import-outside-toplevel
+
+    try:
+        engines = json.loads(content).get("engines")
+    except (AttributeError, ValueError):
+        return None
+    node_range = engines.get("node") if isinstance(engines, dict) else None
+    if not isinstance(node_range, str):
+        return None
+    return node_range.strip() or None
+
+
+def read(file_path: str) -> "Optional[str]":
+    """
+    Read the node version or range set by a version file
+
+    :param file_path: path to a .nvmrc, .node-version, .tool-versions or package.json file
+    :return: the version, None when the file does not set a node version
+    """
+    try:
+        file_name = os.path.basename(file_path)
+        if file_name == TOOL_VERSIONS:
+            return _read_tool_versions(file_path)
+        if file_name == PACKAGE_JSON:
+            return _read_package_json(file_path)
+        return _read_first_line(file_path)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _sets_version(file_name: str, file_path: str) -> bool:
+    """Check a found version file is not a .tool-versions or package.json without a version"""
+    return file_name not in (TOOL_VERSIONS, PACKAGE_JSON) or bool(read(file_path))
+
+
+def select(found: "Mapping[str, str]", file_names: "Sequence[str]") -> "Optional[str]":
+    """
+    Select the version file used in a folder from the version files found in it,
+    skipping .tool-versions and package.json files that do not set a node version
+
+    :param found: mapping of the version file names found in the folder to their paths
+    :param file_names: version file names in order of precedence
+    :return: path to the first version file setting a version or None when there is none
+    """
+    for file_name in file_names:
+        file_path = found.get(file_name)
+        if file_path and _sets_version(file_name, file_path):
+            return file_path
+    return None
+
+
+def get_dir_version_file(dir_path: str, file_names: "Sequence[str]") -> "Optional[str]":
+    """
+    Get the version file in a folder checking each name in order of precedence,
+    skipping .tool-versions and package.json files that do not set a node version
+
+    :param dir_path: the folder to look in
+    :param file_names: version file names in order of precedence
+    :return: path to the first version file found or None when there is none
+    """
+    for file_name in file_names:
+        file_path = os.path.join(dir_path, file_name)
+        if os.path.isfile(file_path) and _sets_version(file_name, file_path):
+            return file_path
+    return None
+
+
+def find(exec_dir: str, file_names: "Sequence[str]") -> "Optional[str]":
+    """
+    Get the nearest version file going up the folder tree, checking each folder once
+    and getting parent folders from the path instead of resolving them on disk
+
+    :param exec_dir: the folder to start search from
+    :param file_names: version file names in order of precedence within a folder
+    :return: path to the first version file found or None when there is none
+    """
+    current_dir = os.path.abspath(exec_dir)
+    while True:
+        file_path = get_dir_version_file(current_dir, file_names)
+        parent_dir = os.path.dirname(current_dir)
+        if file_path or parent_dir == current_dir:
+            return file_path
+        current_dir = parent_dir
@@ -0,0 +1,108 @@
+"""Sorted index of versions answering range queries with binary search"""
+from bisect import (
+    bisect_left,
+    bisect_right,
+)
+from typing import TYPE_CHECKING
+
+from . import semver
+
+if TYPE_CHECKING:  # pragma: no-cover
+    from typing import (
+        Iterable,
+        Iterator,
+        List,
+        Optional,
+        Tuple,
+    )
+
+
+class VersionIndex:
+    """
+    Versions parsed and sorted once so each range query is answered by bisecting
+    the sorted precedence keys instead of parsing and filtering every version
+    """
+
+    def __init__(self, versions: "Iterable[str]"):
+        """
+        :param versions: version strings with or without the leading 'v', invalid ones are skipped
+        """
+        parsed = (
+            semver.parse(version[1:] if version[:1] == "v" else version)
+            for version in versions
+        )
+        self._set_versions(
+            sorted(
+                {version for version in parsed if version}, key=semver.Version.sort_key
+            )
+        )
+
+    @classmethod
+    def from_sorted(cls, versions: "Iterable[semver.Version]") -> "VersionIndex":
+        """
+        Index versions that are already parsed, deduplicated and sorted by precedence
+
+        :param versions: sorted unique versions e.g. loaded from a previously built index
+        :return: version index without parsing or sorting again
+        """
+        index = cls.__new__(cls)
+        index._set_versions([*versions])
+        return index
+
+    def _set_versions(self, versions: "List[semver.Version]"):
+        self._versions = versions
+        self._releases = [
+            version for version in self._versions if not version.prerelease
+        ]
+        self._version_keys = [version.sort_key() for version in self._versions]
+        self._release_keys = [version.sort_key() for version in self._releases]
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __iter__(self) -> "Iterator[semver.Version]":
+        return iter(self._versions)
+
+    def _get_slice(
+        self, interval: "semver.Interval"
+    ) -> "Tuple[List[semver.Version], int, int]":
+        """Get the sorted versions and index range of the versions in the interval"""
+        if interval.prerelease:
+            versions, keys = self._versions, self._version_keys
+        else:
+            versions, keys = self._releases, self._release_keys
+        start, end = 0, len(keys)
+        if interval.lower:
+            lower, inclusive = interval.lower
+            start = (bisect_left if inclusive else bisect_right)(keys, lower.sort_key())
+        if interval.upper:
+            upper, inclusive = interval.upper
+            end = (bisect_right if inclusive else bisect_left)(keys, upper.sort_key())
+        return versions, start, end
+
+    def max_satisfying(self, version_range: str) -> "Optional[semver.Version]":
+        """
+        Get the highest version in the range
+
+        :param version_range: version or npm style range e.g. 18, ^18.2, >=18 <21
+        :return: highest matching version or None when none match or the range is invalid
+        """
+        best: "Optional[semver.Version]" = None
+        for interval in semver.parse_range(version_range) or []:
+            versions, start, end = self._get_slice(interval)
+            if end > start and (best is None or versions[end - 1] > best):
+                best = versions[end - 1]
+        return best
+
+    def satisfying(self, version_range: str) -> "List[semver.Version]":
+        """
+        Get all versions in the range
+
+        :param version_range: version or npm style range e.g. 18, ^18.2, >=18 <21
+        :return: sorted matching versions
+        """
+        matches = set()
+        for interval in semver.parse_range(version_range) or []:
+            versions, start, end = self._get_slice(interval)
+            matches.update(versions[start:end])
+        return sorted(matches, key=semver.Version.sort_key)